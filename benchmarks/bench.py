@@ -0,0 +1,348 @@
+"""渲染管线性能测试
+
+在本地 `file://` 页面上以不同并发数运行各渲染接口,
+统计延迟分位数、每秒图片数与浏览器进程树的峰值常驻内存,
+可以保存为基线 JSON 并与之比较以发现性能回退。
+
+Examples:
+    $ python -m benchmarks.bench --concurrency 1,4,8 --save baseline.json
+    $ python -m benchmarks.bench --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+from collections.abc import Awaitable, Sequence
+from dataclasses import asdict, dataclass
+import json
+import math
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Optional
+
+TEMPLATES_PATH = Path(__file__).parent.parent / "tests" / "templates"
+
+MD_PLAIN = "\n\n".join(
+    f"## 第 {i} 节\n\n这是一段普通的 **markdown** 文本, 包含 *强调* 与 [链接](#)。\n\n"
+    "- 列表项一\n- 列表项二\n- 列表项三"
+    for i in range(10)
+)
+MD_CODE = "\n\n".join(
+    f"```python\ndef fib_{i}(n: int) -> int:\n"
+    "    a, b = 0, 1\n"
+    "    for _ in range(n):\n"
+    "        a, b = b, a + b\n"
+    "    return a\n```"
+    for i in range(20)
+)
+MD_MATH = "\n\n".join(
+    f"$$\\sum_{{k=1}}^{{{i + 2}}} \\frac{{1}}{{k^2}} = \\int_0^1 x^{{{i}}}\\,dx$$\n\n"
+    f"行内公式 $e^{{i\\pi}} + {i} = {i - 1}$"
+    for i in range(20)
+)
+CAPTURE_HTML = """<!DOCTYPE html>
+<html>
+<body>
+  <div id="card" style="width: 400px; padding: 16px; font-size: 20px">
+    {items}
+  </div>
+</body>
+</html>
+"""
+
+SCENARIOS = ("text", "md_plain", "md_code", "md_math", "template", "capture_element")
+
+Scenario = Callable[[], Awaitable[bytes]]
+
+
+@dataclass
+class BenchResult:
+    """单个场景在某一并发数下的测试结果。"""
+
+    scenario: str
+    concurrency: int
+    iterations: int
+    errors: int
+    p50: float
+    p95: float
+    p99: float
+    images_per_sec: float
+    peak_rss: Optional[int]
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """按最近秩法计算分位数。
+
+    Args:
+        samples (Sequence[float]): 样本。
+        q (float): 分位数, 取值 0 到 1。
+
+    Returns:
+        float: 对应的样本值, 样本为空时返回 0。
+    """
+    if not samples:
+        return 0
+    ordered = sorted(samples)
+    rank = max(math.ceil(q * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def compare(
+    results: Sequence[BenchResult],
+    baseline: Sequence[BenchResult],
+    threshold: float,
+) -> list[str]:
+    """与基线比较, 返回性能回退的描述。
+
+    p95 延迟增加或每秒图片数降低超过`threshold`比例时视为回退。
+
+    Args:
+        results (Sequence[BenchResult]): 本次结果。
+        baseline (Sequence[BenchResult]): 基线结果。
+        threshold (float): 允许的波动比例。
+
+    Returns:
+        List[str]: 回退描述, 没有回退时为空列表。
+    """
+    base = {(item.scenario, item.concurrency): item for item in baseline}
+    regressions: list[str] = []
+    for result in results:
+        if (old := base.get((result.scenario, result.concurrency))) is None:
+            continue
+        name = f"{result.scenario}@{result.concurrency}"
+        if old.p95 and result.p95 > old.p95 * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {old.p95 * 1000:.1f}ms -> {result.p95 * 1000:.1f}ms"
+            )
+        if result.images_per_sec < old.images_per_sec * (1 - threshold):
+            regressions.append(
+                f"{name}: images/sec {old.images_per_sec:.2f} -> "
+                f"{result.images_per_sec:.2f}"
+            )
+    return regressions
+
+
+def load_results(path: Path) -> list[BenchResult]:
+    """读取保存的结果 JSON。"""
+    return [BenchResult(**item) for item in json.loads(path.read_text("utf-8"))]
+
+
+def save_results(path: Path, results: Sequence[BenchResult]) -> None:
+    """将结果保存为 JSON。"""
+    path.write_text(
+        json.dumps([asdict(item) for item in results], indent=2), encoding="utf-8"
+    )
+
+
+def _tree_rss(pids: Sequence[int]) -> Optional[int]:
+    from nonebot_plugin_htmlrender.process import get_process_tree_rss
+
+    samples = [rss for pid in pids if (rss := get_process_tree_rss(pid)) is not None]
+    return sum(samples) if samples else None
+
+
+def build_scenarios(workdir: Path) -> dict[str, Scenario]:
+    """构建所有测试场景。
+
+    Args:
+        workdir (Path): 存放`capture_element`测试页面的临时目录。
+
+    Returns:
+        Dict[str, Scenario]: 场景名到渲染函数的映射。
+    """
+    from nonebot_plugin_htmlrender import (
+        capture_element,
+        md_to_pic,
+        template_to_pic,
+        text_to_pic,
+    )
+
+    page = workdir / "capture.html"
+    page.write_text(
+        CAPTURE_HTML.format(items="".join(f"<p>第 {i} 行</p>" for i in range(20))),
+        encoding="utf-8",
+    )
+
+    return {
+        "text": lambda: text_to_pic("性能测试\n" * 20),
+        "md_plain": lambda: md_to_pic(MD_PLAIN),
+        "md_code": lambda: md_to_pic(MD_CODE),
+        "md_math": lambda: md_to_pic(MD_MATH),
+        "template": lambda: template_to_pic(
+            template_path=str(TEMPLATES_PATH),
+            template_name="text.html",
+            templates={"text_list": [str(i) for i in range(20)]},
+            pages={"viewport": {"width": 600, "height": 300}},
+        ),
+        "capture_element": lambda: capture_element(page.as_uri(), "#card"),
+    }
+
+
+async def run_scenario(
+    name: str, func: Scenario, concurrency: int, iterations: int
+) -> BenchResult:
+    """以固定并发数运行一个场景。
+
+    Args:
+        name (str): 场景名。
+        func (Scenario): 渲染函数。
+        concurrency (int): 并发数。
+        iterations (int): 总渲染次数。
+
+    Returns:
+        BenchResult: 测试结果。
+    """
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(iterations))
+    peak_rss: Optional[int] = None
+    done = asyncio.Event()
+
+    async def _worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                await func()
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    async def _sample_rss() -> None:
+        from nonebot_plugin_htmlrender.browser import get_browser_pids
+
+        nonlocal peak_rss
+        while not done.is_set():
+            rss = await asyncio.to_thread(_tree_rss, get_browser_pids())
+            if rss is not None:
+                peak_rss = max(peak_rss or 0, rss)
+            try:
+                await asyncio.wait_for(done.wait(), 0.1)
+            except asyncio.TimeoutError:
+                pass
+
+    sampler = asyncio.create_task(_sample_rss())
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await sampler
+
+    return BenchResult(
+        scenario=name,
+        concurrency=concurrency,
+        iterations=iterations,
+        errors=errors,
+        p50=percentile(latencies, 0.5),
+        p95=percentile(latencies, 0.95),
+        p99=percentile(latencies, 0.99),
+        images_per_sec=len(latencies) / elapsed if elapsed else 0,
+        peak_rss=peak_rss,
+    )
+
+
+def _echo(line: str = "") -> None:
+    print(line)  # noqa: T201
+
+
+def _report(results: Sequence[BenchResult]) -> None:
+    _echo(
+        f"{'scenario':<16}{'conc':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'img/s':>9}{'errors':>8}{'peak RSS MiB':>14}"
+    )
+    for item in results:
+        rss = f"{item.peak_rss / 1024 / 1024:.1f}" if item.peak_rss else "-"
+        _echo(
+            f"{item.scenario:<16}{item.concurrency:>5}{item.p50 * 1000:>10.1f}"
+            f"{item.p95 * 1000:>10.1f}{item.p99 * 1000:>10.1f}"
+            f"{item.images_per_sec:>9.2f}{item.errors:>8}{rss:>14}"
+        )
+
+
+async def run(args: argparse.Namespace) -> int:
+    import nonebot
+
+    # 场景的输入每次都相同, 关闭合并、渲染结果缓存与 markdown 转换缓存,
+    # 确保测到的是完整渲染管线
+    config: dict[str, Any] = {
+        "htmlrender_coalesce": False,
+        "htmlrender_render_cache": False,
+        "htmlrender_markdown_cache_size": 0,
+    }
+    config.update(item.split("=", 1) for item in args.config)
+    nonebot.init(**config)
+    nonebot.require("nonebot_plugin_htmlrender")
+
+    from nonebot_plugin_htmlrender import shutdown_htmlrender, startup_htmlrender
+
+    await startup_htmlrender()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            scenarios = build_scenarios(Path(workdir))
+            selected = args.scenarios or list(scenarios)
+            results: list[BenchResult] = []
+            for name in selected:
+                for _ in range(args.warmup):
+                    await scenarios[name]()
+                results.extend(
+                    [
+                        await run_scenario(
+                            name, scenarios[name], concurrency, args.iterations
+                        )
+                        for concurrency in args.concurrency
+                    ]
+                )
+    finally:
+        await shutdown_htmlrender()
+
+    _report(results)
+    if args.save:
+        save_results(args.save, results)
+    if args.compare:
+        regressions = compare(results, load_results(args.compare), args.threshold)
+        if regressions:
+            _echo()
+            _echo("Regressions:")
+            for line in regressions:
+                _echo(f"  {line}")
+            return 1
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="htmlrender benchmark")
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: value.split(","),
+        help=f"要运行的场景, 逗号分隔, 可选 {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(item) for item in value.split(",")],
+        default=[1, 4, 8],
+        help="并发数, 逗号分隔",
+    )
+    parser.add_argument("--iterations", type=int, default=50, help="每组渲染次数")
+    parser.add_argument("--warmup", type=int, default=3, help="每个场景的预热次数")
+    parser.add_argument("--save", type=Path, help="将结果保存为基线 JSON")
+    parser.add_argument("--compare", type=Path, help="与基线 JSON 比较")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="判定为回退的波动比例"
+    )
+    parser.add_argument(
+        "--config",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="传递给 nonebot.init 的配置, 如 htmlrender_page_pool_size=8",
+    )
+    args = parser.parse_args(argv)
+    if unknown := set(args.scenarios or ()) - set(SCENARIOS):
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
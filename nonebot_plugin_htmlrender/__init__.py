@@ -5,20 +5,35 @@ require("nonebot_plugin_localstore")
 from nonebot.log import logger
 from nonebot.plugin import PluginMetadata
 
+from nonebot_plugin_htmlrender.batch import html_to_pics, md_to_pics, template_to_pics
+from nonebot_plugin_htmlrender.blocking import BlockPolicy
 from nonebot_plugin_htmlrender.browser import (
+    BrowserCrashedError,
     get_new_page,
+    get_pooled_page,
     shutdown_htmlrender,
     startup_htmlrender,
 )
+from nonebot_plugin_htmlrender.cache import RenderCacheStats, render_cache
 from nonebot_plugin_htmlrender.config import Config, plugin_config
 from nonebot_plugin_htmlrender.data_source import (
     capture_element,
+    capture_elements,
     html_to_pic,
     md_to_pic,
     template_to_html,
     template_to_pic,
     text_to_pic,
 )
+from nonebot_plugin_htmlrender.executor import shutdown_executors, start_executors
+from nonebot_plugin_htmlrender.http_cache import HttpCacheStats, http_cache
+from nonebot_plugin_htmlrender.limiter import (
+    RenderLimiterStats,
+    RenderOverloadError,
+    render_limiter,
+)
+from nonebot_plugin_htmlrender.live import LiveTemplate
+from nonebot_plugin_htmlrender.metrics import RenderMetrics, render_metrics
 from nonebot_plugin_htmlrender.utils import _clear_playwright_env_vars
 
 __plugin_meta__ = PluginMetadata(
@@ -37,6 +52,8 @@ driver = nonebot.get_driver()
 @driver.on_startup
 async def init(**kwargs):
     logger.info("HTMLRender Starting...")
+    # 进程池需要在浏览器启动并创建线程之前 fork
+    start_executors()
     await startup_htmlrender(**kwargs)
     logger.opt(colors=True).info(
         f"HTMLRender Started with <cyan>{plugin_config.htmlrender_browser}</cyan>."
@@ -47,18 +64,36 @@ async def init(**kwargs):
 async def shutdown():
     logger.info("HTMLRender Shutting down...")
     await shutdown_htmlrender()
+    shutdown_executors()
     _clear_playwright_env_vars()
     logger.info("HTMLRender Shut down.")
 
 
 __all__ = [
+    "BlockPolicy",
+    "BrowserCrashedError",
+    "HttpCacheStats",
+    "LiveTemplate",
+    "RenderCacheStats",
+    "RenderLimiterStats",
+    "RenderMetrics",
+    "RenderOverloadError",
     "capture_element",
+    "capture_elements",
     "get_new_page",
+    "get_pooled_page",
     "html_to_pic",
+    "html_to_pics",
+    "http_cache",
     "md_to_pic",
+    "md_to_pics",
+    "render_cache",
+    "render_limiter",
+    "render_metrics",
     "shutdown_htmlrender",
     "startup_htmlrender",
     "template_to_html",
     "template_to_pic",
+    "template_to_pics",
     "text_to_pic",
 ]
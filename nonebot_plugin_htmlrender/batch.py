@@ -0,0 +1,126 @@
+import asyncio
+from collections.abc import Awaitable, Sequence
+from typing import Any, Callable, Union
+
+from nonebot.log import logger
+
+from nonebot_plugin_htmlrender.data_source import (
+    html_to_pic,
+    md_to_pic,
+    template_to_pic,
+)
+
+BatchResult = list[Union[bytes, Exception]]
+
+
+async def _render_batch(
+    func: Callable[..., Awaitable[bytes]],
+    jobs: Sequence[dict[str, Any]],
+    concurrency: int,
+) -> BatchResult:
+    """以固定数量的 worker 依次渲染任务, 同一 worker 会复用页面池中的页面。"""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    results: dict[int, Union[bytes, Exception]] = {}
+    pending = iter(enumerate(jobs))
+
+    async def _worker() -> None:
+        for index, job in pending:
+            try:
+                results[index] = await func(**job)
+            except Exception as e:
+                logger.opt(exception=e).warning(f"Batch item {index} failed")
+                results[index] = e
+
+    await asyncio.gather(*(_worker() for _ in range(min(concurrency, len(jobs)))))
+    return [results[index] for index in range(len(jobs))]
+
+
+async def html_to_pics(
+    jobs: Sequence[Union[str, dict[str, Any]]],
+    concurrency: int = 4,
+    **kwargs,
+) -> BatchResult:
+    """批量 html 转图片
+
+    Args:
+        jobs (Sequence[Union[str, Dict[str, Any]]]): 任务列表, 元素为 html 文本,
+            或传递给`html_to_pic`的参数字典(会覆盖公共参数)
+        concurrency (int, optional): 同时渲染的页面数, 默认为 4
+        **kwargs: 所有任务共用的`html_to_pic`参数
+
+    Returns:
+        List[Union[bytes, Exception]]: 与输入顺序一致的结果,
+            渲染失败的任务对应位置为异常对象
+    """
+    return await _render_batch(
+        html_to_pic,
+        [
+            {**kwargs, "html": job} if isinstance(job, str) else {**kwargs, **job}
+            for job in jobs
+        ],
+        concurrency,
+    )
+
+
+async def md_to_pics(
+    jobs: Sequence[Union[str, dict[str, Any]]],
+    concurrency: int = 4,
+    **kwargs,
+) -> BatchResult:
+    """批量 markdown 转图片
+
+    Args:
+        jobs (Sequence[Union[str, Dict[str, Any]]]): 任务列表, 元素为 markdown 文本,
+            或传递给`md_to_pic`的参数字典(会覆盖公共参数)
+        concurrency (int, optional): 同时渲染的页面数, 默认为 4
+        **kwargs: 所有任务共用的`md_to_pic`参数
+
+    Returns:
+        List[Union[bytes, Exception]]: 与输入顺序一致的结果,
+            渲染失败的任务对应位置为异常对象
+    """
+    return await _render_batch(
+        md_to_pic,
+        [
+            {**kwargs, "md": job} if isinstance(job, str) else {**kwargs, **job}
+            for job in jobs
+        ],
+        concurrency,
+    )
+
+
+async def template_to_pics(
+    template_path: str,
+    template_name: str,
+    templates: Sequence[dict[Any, Any]],
+    concurrency: int = 4,
+    **kwargs,
+) -> BatchResult:
+    """使用同一个 jinja2 模板批量生成图片
+
+    Args:
+        template_path (str): 模板路径
+        template_name (str): 模板名
+        templates (Sequence[Dict[Any, Any]]): 每张图片的模板内参数
+        concurrency (int, optional): 同时渲染的页面数, 默认为 4
+        **kwargs: 所有任务共用的`template_to_pic`参数
+
+    Returns:
+        List[Union[bytes, Exception]]: 与输入顺序一致的结果,
+            渲染失败的任务对应位置为异常对象
+    """
+    return await _render_batch(
+        template_to_pic,
+        [
+            {
+                **kwargs,
+                "template_path": template_path,
+                "template_name": template_name,
+                "templates": item,
+            }
+            for item in templates
+        ],
+        concurrency,
+    )
@@ -0,0 +1,147 @@
+from dataclasses import asdict, dataclass
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Any, Optional
+
+from nonebot.log import logger
+
+from nonebot_plugin_htmlrender.config import plugin_config
+from nonebot_plugin_htmlrender.consts import RESOURCE_TYPES
+from nonebot_plugin_htmlrender.metrics import render_metrics
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Request, Route
+
+
+def split_list(value: Optional[str]) -> tuple[str, ...]:
+    """拆分逗号分隔的配置项, 忽略空白项。"""
+    if not value:
+        return ()
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+@dataclass(frozen=True)
+class BlockPolicy:
+    """页面请求拦截策略。
+
+    页面主框架的导航请求永远不会被拦截。
+
+    Examples:
+        >>> policy = BlockPolicy(
+        ...     resource_types=("media", "font"),
+        ...     url_patterns=("*://*.doubleclick.net/*",),
+        ...     max_response_size=2 * 1024 * 1024,
+        ... )
+        >>> pic = await capture_element(url, "#main", block_policy=policy)
+    """
+
+    resource_types: tuple[str, ...] = ()
+    """拦截的资源类型, 如 "image"、"media"、"font"、"script"。"""
+    url_patterns: tuple[str, ...] = ()
+    """拦截的 URL 通配符(fnmatch 风格, 区分大小写)。"""
+    max_response_size: int = 0
+    """http(s) 响应体的大小上限(字节), 超过时丢弃该响应, 为 0 时不限制。"""
+
+    def __post_init__(self) -> None:
+        if invalid := set(self.resource_types) - set(RESOURCE_TYPES):
+            raise ValueError(
+                f"Invalid resource types {sorted(invalid)}. "
+                f"Must be one of {RESOURCE_TYPES}"
+            )
+
+    @classmethod
+    def from_config(cls) -> "BlockPolicy":
+        """从插件配置创建全局策略。"""
+        return cls(
+            resource_types=split_list(plugin_config.htmlrender_block_resource_types),
+            url_patterns=split_list(plugin_config.htmlrender_block_urls),
+            max_response_size=plugin_config.htmlrender_max_response_size,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """策略是否会拦截任何请求。"""
+        return bool(
+            self.resource_types or self.url_patterns or self.max_response_size > 0
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """转换为可 JSON 序列化的字典, 用于生成缓存键。"""
+        return asdict(self)
+
+    def blocks(self, request: "Request") -> bool:
+        """请求是否应当在发出前被拦截。"""
+        if request.is_navigation_request() and request.frame.parent_frame is None:
+            return False
+        return request.resource_type in self.resource_types or any(
+            fnmatchcase(request.url, pattern) for pattern in self.url_patterns
+        )
+
+    def exceeds(self, url: str, size: int) -> bool:
+        """响应体大小是否超过上限, 超过时记录为被拦截的请求。"""
+        if self.max_response_size <= 0 or size <= self.max_response_size:
+            return False
+        logger.debug(
+            f"Blocked response of {size} bytes exceeding "
+            f"{self.max_response_size}: {url}"
+        )
+        render_metrics.blocked_requests += 1
+        return True
+
+    async def apply(self, page: "Page", check_size: bool = True) -> None:
+        """在页面上注册拦截路由, 策略为空时不注册。
+
+        路由会关闭页面的 HTTP 缓存, 因此仅在需要时注册。
+
+        Args:
+            page (Page): 页面对象。
+            check_size (bool): 是否由该路由请求并检查响应大小。
+                页面已注册远程资源缓存路由时应为 False, 交由缓存路由检查,
+                否则该路由自行请求会绕过缓存。
+        """
+        if self.resource_types or self.url_patterns:
+            handler = self._handle if check_size else self._filter
+        elif check_size and self.max_response_size > 0:
+            handler = self._handle
+        else:
+            return
+        await page.route("**/*", handler)
+
+    async def _filter(self, route: "Route") -> None:
+        if self.blocks(route.request):
+            render_metrics.blocked_requests += 1
+            await route.abort("blockedbyclient")
+            return
+        await route.fallback()
+
+    async def _handle(self, route: "Route") -> None:
+        request = route.request
+        if self.blocks(request):
+            render_metrics.blocked_requests += 1
+            await route.abort("blockedbyclient")
+            return
+
+        if self.max_response_size <= 0 or not request.url.startswith(
+            ("http://", "https://")
+        ):
+            await route.fallback()
+            return
+
+        try:
+            response = await route.fetch()
+            size = int(response.headers.get("content-length") or 0) or len(
+                await response.body()
+            )
+        except Exception as e:
+            # 未处理的路由会让页面一直等待到超时
+            logger.debug(f"Failed to fetch {request.url}: {e}")
+            await route.abort("failed")
+            return
+        if self.exceeds(request.url, size):
+            await route.abort("blockedbyclient")
+            return
+        await route.fulfill(response=response)
+
+
+def resolve_block_policy(policy: Optional[BlockPolicy]) -> BlockPolicy:
+    """单次调用未指定策略时使用配置中的全局策略。"""
+    return BlockPolicy.from_config() if policy is None else policy
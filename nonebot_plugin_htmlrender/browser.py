@@ -1,32 +1,102 @@
-from collections.abc import AsyncIterator
-from contextlib import AsyncExitStack, asynccontextmanager
-from typing import Optional
+import asyncio
+from asyncio import Lock
+from collections.abc import AsyncIterator, Iterator
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager, suppress
+from dataclasses import dataclass, field
+import os
+import time
+from typing import TYPE_CHECKING, Any, Optional
+from weakref import WeakKeyDictionary
 
 from nonebot.log import logger
-from playwright.async_api import (
-    Browser,
-    BrowserType,
-    Page,
-    Playwright,
-    async_playwright,
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_fixed,
 )
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_fixed
 
 from nonebot_plugin_htmlrender.config import plugin_config
 from nonebot_plugin_htmlrender.install import install_browser
+from nonebot_plugin_htmlrender.limiter import render_limiter
+from nonebot_plugin_htmlrender.metrics import render_metrics
+from nonebot_plugin_htmlrender.pool import PagePool
+from nonebot_plugin_htmlrender.process import (
+    find_new_root_pid,
+    get_descendant_pids,
+    get_process_tree_rss,
+)
 from nonebot_plugin_htmlrender.utils import (
     _prepare_playwright_env_vars,
     clean_playwright_cache,
+    clear_env_verified,
+    is_env_verified,
+    mark_env_verified,
     proxy_settings,
     suppress_and_log,
     with_lock,
 )
 
-_browser: Optional[Browser] = None
-_playwright: Optional[Playwright] = None
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserType, Page, Playwright
+
+_browser: Optional["Browser"] = None
+_playwright: Optional["Playwright"] = None
+_relaunch_lock = Lock()
+# 启动浏览器时通过比较前后的子进程查找其进程号, 多个启动同时进行时无法区分
+_launch_lock = Lock()
+# 除主浏览器 `_browser` 外的分片浏览器, 键为分片序号
+_shards: dict[int, "Browser"] = {}
+_shard_load: dict[int, int] = {}
+_shard_locks: dict[int, Lock] = {}
+_launch_kwargs: dict[str, Any] = {}
+_closing = False
+_background_tasks: set[asyncio.Task] = set()
+RSS_CHECK_INTERVAL = 10
+DRAIN_TIMEOUT = 60
+
+
+@dataclass
+class _BrowserStats:
+    """本地启动的浏览器的运行统计, 用于判断是否需要回收。"""
+
+    pid: Optional[int] = None
+    started: float = field(default_factory=time.monotonic)
+    renders: int = 0
+    active: int = 0
+    rss_checked: float = 0
+    recycling: bool = False
+    idle: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def __post_init__(self) -> None:
+        self.idle.set()
+
+
+_browser_stats: "WeakKeyDictionary[Browser, _BrowserStats]" = WeakKeyDictionary()
+_page_pool = PagePool(
+    size=plugin_config.htmlrender_page_pool_size,
+    max_uses=plugin_config.htmlrender_page_pool_max_uses,
+    max_idle=plugin_config.htmlrender_page_pool_max_idle,
+)
+
+
+class BrowserCrashedError(RuntimeError):
+    """渲染过程中页面崩溃或浏览器断开时抛出。"""
+
+
+retry_on_crash = retry(
+    retry=retry_if_exception_type(BrowserCrashedError),
+    stop=stop_after_attempt(2 if plugin_config.htmlrender_watchdog else 1),
+    reraise=True,
+    before_sleep=lambda retry_state: logger.warning(
+        "Render aborted by a browser crash, retrying on a fresh page..."
+    ),
+)
+"""渲染是幂等的, 因崩溃失败时在新页面上重试一次。"""
 
 
-async def _launch(browser_type: str, **kwargs) -> Browser:
+async def _launch(browser_type: str, **kwargs) -> "Browser":
     """
     启动浏览器实例。
 
@@ -37,18 +107,32 @@ async def _launch(browser_type: str, **kwargs) -> Browser:
     Returns:
         Browser: 启动的浏览器实例。
     """
-    _browser_cls: BrowserType = getattr(_playwright, browser_type)
+    _browser_cls: "BrowserType" = getattr(_playwright, browser_type)
     logger.opt(colors=True).debug(
         f"<cyan>{browser_type.capitalize()}</cyan> launching with kwargs: {kwargs}"
     )
     logger.opt(colors=True).debug(
         f"Looking for Browser in path: <blue>{_browser_cls.executable_path}</blue>"
     )
-    return await _browser_cls.launch(**kwargs)
+    async with _launch_lock:
+        before = get_descendant_pids(os.getpid())
+        browser = await _browser_cls.launch(**kwargs)
+        pid = find_new_root_pid(before)
+    if pid is None and plugin_config.htmlrender_recycle_rss > 0:
+        logger.warning(
+            "Could not determine the browser process id, "
+            "RSS based recycling is disabled for this browser."
+        )
+    elif pid is None:
+        logger.debug("Could not determine the browser process id.")
+    _browser_stats[browser] = _BrowserStats(pid=pid)
+    return browser
 
 
 @asynccontextmanager
-async def get_new_page(device_scale_factor: float = 2, **kwargs) -> AsyncIterator[Page]:
+async def get_new_page(
+    device_scale_factor: float = 2, **kwargs
+) -> AsyncIterator["Page"]:
     """
     获取一个新的页面的上下文管理器, 这里的 page 默认使用设备缩放因子为 2。
 
@@ -58,18 +142,123 @@ async def get_new_page(device_scale_factor: float = 2, **kwargs) -> AsyncIterato
 
     Yields:
         Page: 页面对象。
+
+    Raises:
+        RenderOverloadError: 达到并发上限且排队已满或等待超时。
     """
-    ctx = await get_browser()
-    page = await ctx.new_page(device_scale_factor=device_scale_factor, **kwargs)
-    async with page:
-        yield page
+    async with render_limiter.slot(), _lease_browser() as ctx:
+        page = await ctx.new_page(device_scale_factor=device_scale_factor, **kwargs)
+        async with page:
+            with render_metrics.track_page(), _crash_guard(page, ctx):
+                yield page
 
 
-@with_lock
-async def get_browser(**kwargs) -> Browser:
+@asynccontextmanager
+async def get_pooled_page(
+    device_scale_factor: float = 2, **kwargs
+) -> AsyncIterator["Page"]:
+    """
+    从页面池中获取一个可复用页面的上下文管理器, 退出时页面会被重置并放回池中。
+
+    与`get_new_page`不同, 页面及其浏览器上下文可能被之前的渲染使用过,
+    不应在其中保存 cookie 等状态。
+
+    Args:
+        device_scale_factor (float): 设备缩放因子。
+        **kwargs: 传递给`browser.new_context`的关键字参数。
+
+    Yields:
+        Page: 页面对象。
+
+    Raises:
+        RenderOverloadError: 达到并发上限且排队已满或等待超时。
+    """
+    async with render_limiter.slot(), _lease_browser() as browser:
+        async with _page_pool.acquire(browser, device_scale_factor, **kwargs) as page:
+            with render_metrics.track_page(), _crash_guard(page, browser):
+                yield page
+
+
+def _spawn(coro) -> None:
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _close_crashed_page(page: "Page") -> None:
+    with suppress(Exception):
+        await page.close()
+
+
+@contextmanager
+def _crash_guard(page: "Page", browser: "Browser") -> Iterator[None]:
+    """页面崩溃时立即关闭页面, 使进行中的操作快速失败而不是等待超时,
+    并将崩溃或浏览器断开导致的异常转换为`BrowserCrashedError`。"""
+    crashed = False
+
+    def _on_crash(_: "Page") -> None:
+        nonlocal crashed
+        crashed = True
+        logger.warning("Page crashed, aborting in-flight render.")
+        _spawn(_close_crashed_page(page))
+
+    page.on("crash", _on_crash)
+    try:
+        yield
+    except Exception as e:
+        if crashed or not browser.is_connected():
+            raise BrowserCrashedError("Browser crashed during rendering") from e
+        raise
+    finally:
+        page.remove_listener("crash", _on_crash)
+
+
+def _watch_browser(browser: "Browser") -> "Browser":
+    """监听浏览器断开事件, 断开后在后台重启。"""
+    if plugin_config.htmlrender_watchdog:
+        browser.on("disconnected", _on_disconnected)
+    return browser
+
+
+def _on_disconnected(browser: "Browser") -> None:
+    if _closing:
+        return
+    index = _shard_index(browser)
+    if index is None:
+        return
+    logger.warning(f"Browser shard {index} disconnected, relaunching in background...")
+    _spawn(_relaunch_in_background(index))
+
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=1, max=30),
+    reraise=True,
+    before_sleep=lambda retry_state: logger.warning(
+        f"Relaunch attempt {retry_state.attempt_number} failed, retrying..."
+    ),
+)
+async def _relaunch_shard(index: int) -> "Browser":
+    return await _get_shard(index)
+
+
+async def _relaunch_in_background(index: int) -> None:
+    try:
+        await _relaunch_shard(index)
+    except Exception as e:
+        logger.opt(exception=e).error(
+            f"Failed to relaunch browser shard {index}, "
+            "it will be retried on next render."
+        )
+
+
+async def get_browser(**kwargs) -> "Browser":
     """
     获取浏览器实例。
 
+    浏览器已连接时直接返回, 不经过任何锁; 仅在浏览器断开时重新启动,
+    并发调用会等待同一次重启完成。
+
     Args:
         **kwargs: 传递给`playwright.launch`的关键字参数。
 
@@ -79,14 +268,223 @@ async def get_browser(**kwargs) -> Browser:
     if _browser and _browser.is_connected():
         return _browser
 
-    return await startup_htmlrender(**kwargs)
+    async with _relaunch_lock:
+        if _browser and _browser.is_connected():
+            return _browser
+        if _browser is not None:
+            render_metrics.browser_restarts += 1
+            logger.warning("Browser disconnected, relaunching...")
+            if _playwright is not None:
+                # Playwright 仍在运行时只重启主浏览器, 不影响其他分片与页面池
+                try:
+                    return await _start_shard(0)
+                except Exception as e:
+                    logger.opt(exception=e).warning(
+                        "Failed to relaunch browser, restarting Playwright..."
+                    )
+        return await startup_htmlrender(**kwargs)
+
+
+def get_browser_pids() -> list[int]:
+    """
+    获取本地启动的浏览器的进程号, 远程连接或无法确定进程号的浏览器不包含在内。
+
+    Returns:
+        List[int]: 浏览器根进程号。
+    """
+    return [stats.pid for stats in _browser_stats.values() if stats.pid is not None]
+
+
+def _split_endpoints(endpoints: Optional[str]) -> list[str]:
+    return [endpoint.strip() for endpoint in (endpoints or "").split(",") if endpoint]
+
+
+def _is_cdp() -> bool:
+    return bool(
+        plugin_config.htmlrender_browser == "chromium"
+        and plugin_config.htmlrender_connect_over_cdp
+    )
+
+
+def _remote_endpoints() -> list[str]:
+    if _is_cdp():
+        return _split_endpoints(plugin_config.htmlrender_connect_over_cdp)
+    return _split_endpoints(plugin_config.htmlrender_connect)
+
+
+def _shard_count() -> int:
+    """浏览器分片数, 连接远程浏览器时为端点数量。"""
+    if endpoints := _remote_endpoints():
+        return len(endpoints)
+    return max(plugin_config.htmlrender_browser_count, 1)
+
+
+async def _start_shard(index: int) -> "Browser":
+    """使用启动时的参数启动或连接序号为`index`的分片浏览器, 0 为主浏览器。"""
+    global _browser
+    endpoints = _remote_endpoints()
+    kwargs = dict(_launch_kwargs)
+    if endpoints and _is_cdp():
+        browser = await _connect_via_cdp(endpoint=endpoints[index], **kwargs)
+    elif endpoints:
+        browser = await _connect(
+            plugin_config.htmlrender_browser, endpoint=endpoints[index], **kwargs
+        )
+    else:
+        browser = await _launch(plugin_config.htmlrender_browser, **kwargs)
+    _watch_browser(browser)
+    if index == 0:
+        _browser = browser
+    else:
+        _shards[index] = browser
+    logger.debug(f"Browser shard {index} started")
+    return browser
+
+
+async def _get_shard(index: int) -> "Browser":
+    """获取分片浏览器, 分片断开时只重启该分片。"""
+    if index == 0:
+        return await get_browser()
+
+    browser = _shards.get(index)
+    if browser and browser.is_connected():
+        return browser
+
+    async with _shard_locks.setdefault(index, Lock()):
+        browser = _shards.get(index)
+        if browser and browser.is_connected():
+            return browser
+        if browser is not None:
+            render_metrics.browser_restarts += 1
+            logger.warning(f"Browser shard {index} disconnected, relaunching...")
+        if _playwright is None:
+            await get_browser()
+            # 冷启动时 startup_htmlrender 已经启动了全部分片
+            browser = _shards.get(index)
+            if browser and browser.is_connected():
+                return browser
+        return await _start_shard(index)
+
+
+def _shard_index(browser: "Browser") -> Optional[int]:
+    if browser is _browser:
+        return 0
+    return next((i for i, b in _shards.items() if b is browser), None)
+
 
+@asynccontextmanager
+async def _lease_browser(
+    prefer: Optional["Browser"] = None,
+) -> AsyncIterator["Browser"]:
+    """选择当前打开页面最少的浏览器分片, 归还时检查是否需要回收该浏览器。
 
-async def _connect_via_cdp(**kwargs) -> Browser:
+    Args:
+        prefer (Browser, optional): 优先使用的浏览器, 仍是某个分片的当前浏览器时
+            使用该分片, 用于复用绑定在该浏览器上的页面。
+    """
+    count = _shard_count()
+    index = None if prefer is None else _shard_index(prefer)
+    if index is None or index >= count:
+        index = min(range(count), key=lambda i: _shard_load.get(i, 0))
+    _shard_load[index] = _shard_load.get(index, 0) + 1
+    try:
+        browser = await _get_shard(index)
+        stats = _browser_stats.get(browser)
+        if stats is None:
+            yield browser
+            return
+
+        stats.active += 1
+        stats.idle.clear()
+        try:
+            yield browser
+        finally:
+            stats.active -= 1
+            if not stats.active:
+                stats.idle.set()
+            stats.renders += 1
+            _check_recycle(index, browser, stats)
+    finally:
+        _shard_load[index] -= 1
+
+
+def _check_recycle(index: int, browser: "Browser", stats: _BrowserStats) -> None:
+    if stats.recycling:
+        return
+
+    reason = None
+    max_renders = plugin_config.htmlrender_recycle_renders
+    max_hours = plugin_config.htmlrender_recycle_hours
+    if max_renders > 0 and stats.renders >= max_renders:
+        reason = f"served {stats.renders} renders"
+    elif max_hours > 0 and time.monotonic() - stats.started >= max_hours * 3600:
+        reason = f"running for over {max_hours} hours"
+    elif (
+        plugin_config.htmlrender_recycle_rss > 0
+        and stats.pid is not None
+        and time.monotonic() - stats.rss_checked >= RSS_CHECK_INTERVAL
+    ):
+        stats.rss_checked = time.monotonic()
+        _spawn(_check_rss(index, browser, stats))
+        return
+
+    if reason is not None:
+        stats.recycling = True
+        _spawn(_recycle_browser(index, browser, reason))
+
+
+async def _check_rss(index: int, browser: "Browser", stats: _BrowserStats) -> None:
+    assert stats.pid is not None
+    rss = await asyncio.to_thread(get_process_tree_rss, stats.pid)
+    if (
+        rss is not None
+        and rss > plugin_config.htmlrender_recycle_rss
+        and not stats.recycling
+    ):
+        stats.recycling = True
+        await _recycle_browser(index, browser, f"RSS reached {rss} bytes")
+
+
+async def _recycle_browser(index: int, old: "Browser", reason: str) -> None:
+    """启动替代的浏览器, 新的渲染立即使用替代浏览器,
+    旧浏览器在进行中的渲染完成后关闭。"""
+    global _browser
+
+    logger.info(f"Recycling browser shard {index}: {reason}")
+    lock = _relaunch_lock if index == 0 else _shard_locks.setdefault(index, Lock())
+    async with lock:
+        current = _browser if index == 0 else _shards.get(index)
+        if current is not old:
+            return
+        try:
+            new = await _launch(plugin_config.htmlrender_browser, **_launch_kwargs)
+        except Exception as e:
+            logger.opt(exception=e).error(
+                f"Failed to launch a replacement for browser shard {index}, "
+                "keeping the current one."
+            )
+            return
+        _watch_browser(new)
+        if index == 0:
+            _browser = new
+        else:
+            _shards[index] = new
+    render_metrics.browser_recycles += 1
+
+    if (stats := _browser_stats.get(old)) is not None:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stats.idle.wait(), DRAIN_TIMEOUT)
+    await _page_pool.evict(old)
+    await _close_browser(old)
+    logger.info(f"Browser shard {index} recycled")
+
+
+async def _connect_via_cdp(endpoint: Optional[str] = None, **kwargs) -> "Browser":
     """
     通过 CDP 连接 Chromium 浏览器。
 
     Args:
+        endpoint (Optional[str]): CDP 端点地址, 默认为配置中的第一个端点。
         **kwargs: 传递给`chromium.connect_over_cdp`的关键字参数。
 
     Returns:
@@ -95,22 +493,26 @@ async def _connect_via_cdp(**kwargs) -> Browser:
     Raises:
         RuntimeError: 如果 Playwright 未初始化。
     """
-    kwargs["endpoint_url"] = plugin_config.htmlrender_connect_over_cdp
-    logger.info(
-        f"Connecting to Chromium via CDP ({plugin_config.htmlrender_connect_over_cdp})"
+    endpoint = (
+        endpoint or _split_endpoints(plugin_config.htmlrender_connect_over_cdp)[0]
     )
+    kwargs["endpoint_url"] = endpoint
+    logger.info(f"Connecting to Chromium via CDP ({endpoint})")
     if _playwright is not None:
         return await _playwright.chromium.connect_over_cdp(**kwargs)
     else:
         raise RuntimeError("Playwright is not initialized")
 
 
-async def _connect(browser_type: str, **kwargs) -> Browser:
+async def _connect(
+    browser_type: str, endpoint: Optional[str] = None, **kwargs
+) -> "Browser":
     """
     通过 Playwright 协议连接浏览器。
 
     Args:
         browser_type (str): 浏览器类型。
+        endpoint (Optional[str]): WebSocket 端点地址, 默认为配置中的第一个端点。
         **kwargs: 传递给`playwright.connect`的关键字参数。
 
     Returns:
@@ -119,11 +521,11 @@ async def _connect(browser_type: str, **kwargs) -> Browser:
     Raises:
         RuntimeError: 如果 Playwright 未初始化。
     """
-    _browser_cls: BrowserType = getattr(_playwright, browser_type)
-    kwargs["ws_endpoint"] = plugin_config.htmlrender_connect
+    _browser_cls: "BrowserType" = getattr(_playwright, browser_type)
+    endpoint = endpoint or _split_endpoints(plugin_config.htmlrender_connect)[0]
+    kwargs["ws_endpoint"] = endpoint
     logger.info(
-        f"Connecting to {browser_type.capitalize()} via "
-        f"WebSocket endpoint: {plugin_config.htmlrender_connect}"
+        f"Connecting to {browser_type.capitalize()} via WebSocket endpoint: {endpoint}"
     )
     if _playwright is not None:
         return await _browser_cls.connect(**kwargs)
@@ -154,8 +556,43 @@ async def _check_env_with_install_retry(**kwargs):
         raise
 
 
+async def _launch_local(**kwargs) -> "Browser":
+    """
+    启动本地安装的浏览器, 环境已验证过时跳过环境检查与安装直接启动。
+
+    Args:
+        **kwargs: 传递给`playwright.launch`的关键字参数。
+
+    Returns:
+        Browser: 启动的浏览器实例。
+    """
+    if plugin_config.htmlrender_ci_mode:
+        return await _check_env_with_install_retry(**kwargs)
+
+    browser_type = plugin_config.htmlrender_browser
+    executable_path = getattr(_playwright, browser_type).executable_path
+    if is_env_verified(executable_path):
+        try:
+            browser = await _launch(browser_type, **kwargs)
+        except Exception as e:
+            logger.opt(exception=e).warning(
+                "Failed to launch the verified browser, checking environment..."
+            )
+            clear_env_verified()
+        else:
+            logger.debug("Browser environment already verified, skipped checks")
+            return browser
+
+    clean_playwright_cache()
+    browser = await _check_env_with_install_retry(**kwargs)
+    mark_env_verified(
+        getattr(_playwright, browser_type).executable_path, browser.version
+    )
+    return browser
+
+
 @with_lock
-async def startup_htmlrender(**kwargs) -> Browser:
+async def startup_htmlrender(**kwargs) -> "Browser":
     """
     启动 Playwright 浏览器实例。
 
@@ -165,21 +602,20 @@ async def startup_htmlrender(**kwargs) -> Browser:
     Returns:
         Browser: 启动的浏览器实例。
     """
-    global _browser, _playwright
+    from playwright.async_api import async_playwright
+
+    global _browser, _playwright, _launch_kwargs
 
     await shutdown_htmlrender()
 
     if not plugin_config.htmlrender_ci_mode:
-        clean_playwright_cache()
         _prepare_playwright_env_vars()
 
     _playwright = await async_playwright().start()
     logger.debug("Playwright started")
 
-    if (
-        plugin_config.htmlrender_browser == "chromium"
-        and plugin_config.htmlrender_connect_over_cdp
-    ):
+    _launch_kwargs = dict(kwargs)
+    if _is_cdp():
         _browser = await _connect_via_cdp(**kwargs)
     elif plugin_config.htmlrender_connect:
         _browser = await _connect(plugin_config.htmlrender_browser, **kwargs)
@@ -195,6 +631,9 @@ async def startup_htmlrender(**kwargs) -> Browser:
 
         if plugin_config.htmlrender_browser_executable_path:
             kwargs["executable_path"] = plugin_config.htmlrender_browser_executable_path
+        _launch_kwargs = dict(kwargs)
+
+        if plugin_config.htmlrender_browser_executable_path:
             try:
                 _browser = await _launch(plugin_config.htmlrender_browser, **kwargs)
             except Exception as e:
@@ -203,24 +642,47 @@ async def startup_htmlrender(**kwargs) -> Browser:
                     f" '{plugin_config.htmlrender_browser_executable_path}': {e}"
                 ) from e
         else:
-            _browser = await _check_env_with_install_retry(**kwargs)
+            _browser = await _launch_local(**kwargs)
+
+    _watch_browser(_browser)
+    for index in range(1, _shard_count()):
+        try:
+            await _start_shard(index)
+        except Exception as e:
+            logger.opt(exception=e).warning(
+                f"Failed to start browser shard {index}, "
+                "it will be retried on first use."
+            )
+
+    if plugin_config.htmlrender_page_pool_warmup > 0:
+        await _page_pool.warmup(
+            _browser,
+            plugin_config.htmlrender_page_pool_warmup,
+            viewport={"width": 500, "height": 10},
+        )
 
     return _browser
 
 
 async def shutdown_htmlrender() -> None:
+    global _closing
     is_remote = bool(
         plugin_config.htmlrender_connect or plugin_config.htmlrender_connect_over_cdp
     )
-    async with AsyncExitStack() as stack:
-        await _schedule_browser_shutdown(stack, is_remote=is_remote)
-        await _schedule_playwright_shutdown(stack)
-    _clear_globals()
+    _closing = True
+    try:
+        await _page_pool.close()
+        async with AsyncExitStack() as stack:
+            await _schedule_browser_shutdown(stack, is_remote=is_remote)
+            await _schedule_playwright_shutdown(stack)
+        _clear_globals()
+    finally:
+        _closing = False
 
 
 async def _schedule_browser_shutdown(stack: AsyncExitStack, *, is_remote: bool) -> None:
     global _browser
-    if not _browser:
+    if not _browser and not _shards:
         return
 
     should_close = (not is_remote) and plugin_config.htmlrender_shutdown_browser_on_exit
@@ -230,19 +692,21 @@ async def _schedule_browser_shutdown(stack: AsyncExitStack, *, is_remote: bool)
         )
         return
 
-    browser = _browser
-    if not browser.is_connected():
-        logger.info("Browser was already disconnected.")
-        return
+    for browser in (_browser, *_shards.values()):
+        if browser is None:
+            continue
+        if not browser.is_connected():
+            logger.info("Browser was already disconnected.")
+            continue
 
-    logger.debug("Disconnecting browser...")
+        logger.debug("Disconnecting browser...")
+        stack.push_async_callback(_close_browser, browser)
 
-    async def _close_browser():
-        with suppress_and_log():
-            await browser.close()
-            logger.info("Disconnected browser.")
 
-    stack.push_async_callback(_close_browser)
+async def _close_browser(browser: "Browser") -> None:
+    with suppress_and_log():
+        await browser.close()
+        logger.info("Disconnected browser.")
 
 
 async def _schedule_playwright_shutdown(stack: AsyncExitStack) -> None:
@@ -265,9 +729,10 @@ def _clear_globals() -> None:
     global _browser, _playwright
     _browser = None
     _playwright = None
+    _shards.clear()
 
 
-async def check_playwright_env(**kwargs) -> Browser:
+async def check_playwright_env(**kwargs) -> "Browser":
     """
     检查Playwright环境，复用_launch方法避免逻辑重复。
 
@@ -277,11 +742,15 @@ async def check_playwright_env(**kwargs) -> Browser:
     Raises:
         RuntimeError: 如果Playwright环境设置不正确。
     """
+    from playwright.async_api import async_playwright
+
     logger.info("Checking Playwright environment...")
     global _browser, _playwright
 
     try:
-        _playwright = await async_playwright().start()
+        # startup_htmlrender 已启动的 Playwright 可以直接复用
+        if _playwright is None:
+            _playwright = await async_playwright().start()
         _browser = await _launch(plugin_config.htmlrender_browser, **kwargs)
         logger.success("Playwright environment is set up correctly.")
         return _browser
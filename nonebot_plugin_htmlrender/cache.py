@@ -0,0 +1,243 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any, Optional
+
+import aiofiles
+from nonebot.log import logger
+
+from nonebot_plugin_htmlrender.config import plugin_config
+
+# 磁盘缓存每写入多少次扫描一次目录以清理过期条目
+PRUNE_INTERVAL = 100
+
+
+@dataclass
+class RenderCacheStats:
+    """渲染结果缓存的统计信息。"""
+
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    memory_items: int = 0
+    memory_bytes: int = 0
+
+
+class DiskPruner:
+    """按有效时间与总大小清理磁盘缓存目录。
+
+    写入时只累加估计的目录大小, 估计值超过上限或写入次数达到
+    `PRUNE_INTERVAL`时才扫描目录, 过期条目在读取时也会被删除。
+    """
+
+    def __init__(self, path: Path, ttl: float, max_bytes: int) -> None:
+        """初始化清理器。
+
+        Args:
+            path (Path): 缓存目录。
+            ttl (float): 缓存有效时间(秒)。
+            max_bytes (int): 缓存目录最大字节数。
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._writes = 0
+        self._size: Optional[int] = None
+
+    async def record_write(self, size: int) -> None:
+        """记录一次写入, 必要时在线程中清理目录。
+
+        Args:
+            size (int): 写入的字节数。
+        """
+        self._writes += 1
+        if self._size is not None:
+            self._size += size
+        if (
+            self._size is None
+            or self._size > self.max_bytes
+            or self._writes >= PRUNE_INTERVAL
+        ):
+            await asyncio.to_thread(self.prune)
+
+    def prune(self) -> None:
+        """删除过期条目, 并从最旧的条目开始删除直到总大小不超过上限。"""
+        now = time.time()
+        entries: list[tuple[float, int, str]] = []
+        for entry in os.scandir(self.path):
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime > self.ttl:
+                os.remove(entry.path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+        self._size = total
+        self._writes = 0
+
+
+class RenderCache:
+    """以渲染参数哈希为键的渲染结果缓存。
+
+    包含一个按字节数限制大小的内存 LRU 层和一个可选的磁盘层,
+    命中时直接返回图片数据而不使用浏览器。
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        ttl: float,
+        max_memory_bytes: int,
+        disk_path: Optional[Path] = None,
+        max_disk_bytes: int = 0,
+    ) -> None:
+        """初始化渲染结果缓存。
+
+        Args:
+            enabled (bool): 是否启用缓存。
+            ttl (float): 缓存有效时间(秒)。
+            max_memory_bytes (int): 内存层最大字节数。
+            disk_path (Optional[Path]): 磁盘层目录, 为 None 时不使用磁盘层。
+            max_disk_bytes (int): 磁盘层最大字节数。
+        """
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_path = disk_path
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._memory_bytes = 0
+        self._stats = RenderCacheStats()
+        self._pruner = (
+            DiskPruner(disk_path, ttl, max_disk_bytes)
+            if disk_path is not None
+            else None
+        )
+
+    @property
+    def stats(self) -> RenderCacheStats:
+        """当前的缓存统计信息。"""
+        self._stats.memory_items = len(self._memory)
+        self._stats.memory_bytes = self._memory_bytes
+        return self._stats
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """根据渲染参数生成缓存键。"""
+        payload = json.dumps(parts, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """获取缓存的渲染结果。
+
+        Args:
+            key (str): 缓存键。
+
+        Returns:
+            Optional[bytes]: 命中时返回图片数据, 否则返回 None。
+        """
+        now = time.time()
+        if (cached := self._memory.get(key)) is not None:
+            created, data = cached
+            if now - created <= self.ttl:
+                self._memory.move_to_end(key)
+                self._stats.hits += 1
+                self._stats.memory_hits += 1
+                return data
+            self._evict(key)
+
+        if (cached := await self._disk_get(key, now)) is not None:
+            # 以文件的修改时间作为创建时间, 提升到内存层不会延长有效期
+            created, data = cached
+            self._stats.hits += 1
+            self._stats.disk_hits += 1
+            self._memory_set(key, data, created)
+            return data
+
+        self._stats.misses += 1
+        return None
+
+    async def set(self, key: str, data: bytes) -> None:
+        """写入渲染结果。
+
+        Args:
+            key (str): 缓存键。
+            data (bytes): 图片数据。
+        """
+        now = time.time()
+        self._memory_set(key, data, now)
+        if self.disk_path is not None and len(data) <= self.max_disk_bytes:
+            try:
+                await self._disk_set(key, data)
+            except OSError as e:
+                logger.warning(f"Failed to write render cache to disk: {e}")
+
+    def clear(self) -> None:
+        """清空内存层与统计信息, 磁盘层会在过期后自然失效。"""
+        self._memory.clear()
+        self._memory_bytes = 0
+        self._stats = RenderCacheStats()
+
+    def _memory_set(self, key: str, data: bytes, created: float) -> None:
+        self._evict(key)
+        if len(data) > self.max_memory_bytes:
+            return
+        self._memory[key] = (created, data)
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_memory_bytes:
+            self._evict(next(iter(self._memory)))
+
+    def _evict(self, key: str) -> None:
+        if (cached := self._memory.pop(key, None)) is not None:
+            self._memory_bytes -= len(cached[1])
+
+    async def _disk_get(self, key: str, now: float) -> Optional[tuple[float, bytes]]:
+        if self.disk_path is None:
+            return None
+
+        path = self.disk_path / key
+        try:
+            created = os.stat(path).st_mtime
+            if now - created > self.ttl:
+                os.remove(path)
+                return None
+            async with aiofiles.open(path, "rb") as f:
+                return created, await f.read()
+        except OSError:
+            return None
+
+    async def _disk_set(self, key: str, data: bytes) -> None:
+        assert self.disk_path is not None
+        self.disk_path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.disk_path / f"{key}.tmp"
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(data)
+        os.replace(tmp_path, self.disk_path / key)
+        assert self._pruner is not None
+        await self._pruner.record_write(len(data))
+
+
+render_cache = RenderCache(
+    enabled=plugin_config.htmlrender_render_cache,
+    ttl=plugin_config.htmlrender_render_cache_ttl,
+    max_memory_bytes=plugin_config.htmlrender_render_cache_memory_size,
+    disk_path=(
+        plugin_config.htmlrender_cache_path / "render"
+        if plugin_config.htmlrender_render_cache_disk
+        else None
+    ),
+    max_disk_bytes=plugin_config.htmlrender_render_cache_disk_size,
+)
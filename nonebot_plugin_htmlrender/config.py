@@ -7,7 +7,14 @@ from nonebot.log import logger
 import nonebot_plugin_localstore as store
 from pydantic import BaseModel, Field
 
-from nonebot_plugin_htmlrender.consts import BROWSER_CHANNEL_TYPES, BROWSER_ENGINE_TYPES
+from nonebot_plugin_htmlrender.consts import (
+    BROWSER_CHANNEL_TYPES,
+    BROWSER_ENGINE_TYPES,
+    OFFLOAD_MODES,
+    RESOURCE_TYPES,
+    TEXT_ENGINES,
+    WAIT_UNTIL_TYPES,
+)
 
 plugin_cache_dir: Path = store.get_plugin_cache_dir()
 plugin_config_dir: Path = store.get_plugin_config_dir()
@@ -60,14 +67,144 @@ class Config(BaseModel):
         default=None, description="Playwright浏览器可执行文件的路径。"
     )
     htmlrender_connect_over_cdp: Optional[str] = Field(
-        default=None, description="通过 CDP 连接Playwright浏览器的端点地址。"
+        default=None,
+        description="通过 CDP 连接Playwright浏览器的端点地址，多个地址用逗号分隔。",
     )
     htmlrender_connect: Optional[str] = Field(
-        default=None, description="通过Playwright协议连接Playwright浏览器的端点地址。"
+        default=None,
+        description="通过Playwright协议连接Playwright浏览器的端点地址，"
+        "多个地址用逗号分隔。",
     )
     htmlrender_browser_args: Optional[str] = Field(
         default=None, description="Playwright 浏览器启动参数。"
     )
+    htmlrender_browser_count: int = Field(
+        default=1,
+        description="启动的浏览器实例数，渲染会分派到打开页面最少的实例。"
+        "连接远程浏览器时由逗号分隔的端点数量决定。",
+    )
+    htmlrender_watchdog: bool = Field(
+        default=True,
+        description="是否在浏览器断开后立即在后台重启，"
+        "并在渲染因页面崩溃或浏览器断开失败时重试一次。",
+    )
+    htmlrender_recycle_renders: int = Field(
+        default=0, description="浏览器完成多少次渲染后回收重启，为 0 时不限制。"
+    )
+    htmlrender_recycle_hours: float = Field(
+        default=0, description="浏览器运行多少小时后回收重启，为 0 时不限制。"
+    )
+    htmlrender_recycle_rss: int = Field(
+        default=0,
+        description="浏览器进程树常驻内存超过多少字节后回收重启，为 0 时不限制。"
+        "仅支持 Linux。",
+    )
+    htmlrender_page_pool_size: int = Field(
+        default=4, description="页面池最多保留的空闲页面数，为 0 时禁用页面池。"
+    )
+    htmlrender_page_pool_warmup: int = Field(
+        default=0, description="浏览器启动后预先创建的页面数。"
+    )
+    htmlrender_page_pool_max_uses: int = Field(
+        default=100, description="页面池中单个页面最多被复用的次数。"
+    )
+    htmlrender_page_pool_max_idle: float = Field(
+        default=300, description="页面池中空闲页面的最长保留时间（秒）。"
+    )
+    htmlrender_template_env_cache_size: int = Field(
+        default=32, description="缓存的 jinja2 模板环境数量上限。"
+    )
+    htmlrender_template_bytecode_cache: bool = Field(
+        default=False,
+        description="将 jinja2 编译后的模板字节码缓存到 `htmlrender_cache_path`。",
+    )
+    htmlrender_asset_cache_size: int = Field(
+        default=8 * 1024 * 1024,
+        description="用户 css 文件内存缓存的总大小上限（字符数）。",
+    )
+    htmlrender_render_cache: bool = Field(
+        default=False,
+        description="启用渲染结果缓存，相同的 html 与截图参数直接返回缓存的图片。",
+    )
+    htmlrender_render_cache_ttl: float = Field(
+        default=3600, description="渲染结果缓存的有效时间（秒）。"
+    )
+    htmlrender_render_cache_memory_size: int = Field(
+        default=64 * 1024 * 1024, description="渲染结果内存缓存的大小上限（字节）。"
+    )
+    htmlrender_render_cache_disk: bool = Field(
+        default=False,
+        description="将渲染结果同时缓存到 `htmlrender_cache_path` 下的磁盘目录。",
+    )
+    htmlrender_render_cache_disk_size: int = Field(
+        default=256 * 1024 * 1024, description="渲染结果磁盘缓存的大小上限（字节）。"
+    )
+    htmlrender_http_cache: bool = Field(
+        default=False,
+        description="将 html_to_pic 页面中引用的远程资源缓存到 "
+        "`htmlrender_cache_path` 下的磁盘目录，浏览器重启后依然有效。",
+    )
+    htmlrender_http_cache_ttl: float = Field(
+        default=86400, description="远程资源缓存的有效时间（秒）。"
+    )
+    htmlrender_http_cache_size: int = Field(
+        default=256 * 1024 * 1024, description="远程资源缓存的大小上限（字节）。"
+    )
+    htmlrender_http_cache_max_item_size: int = Field(
+        default=16 * 1024 * 1024,
+        description="单个远程资源的大小上限（字节），超过时不缓存。",
+    )
+    htmlrender_coalesce: bool = Field(
+        default=True,
+        description="是否合并参数完全相同的并发渲染，只渲染一次并共享结果。",
+    )
+    htmlrender_block_resource_types: Optional[str] = Field(
+        default=None,
+        description="html_to_pic 与 capture_element 默认拦截的资源类型，"
+        "多个类型用逗号分隔，如 'media,font'。",
+    )
+    htmlrender_block_urls: Optional[str] = Field(
+        default=None,
+        description="html_to_pic 与 capture_element 默认拦截的 URL 通配符，"
+        "多个通配符用逗号分隔。",
+    )
+    htmlrender_max_response_size: int = Field(
+        default=0,
+        description="html_to_pic 与 capture_element 允许的 http(s) 响应体大小上限"
+        "（字节），为 0 时不限制。",
+    )
+    htmlrender_max_concurrency: int = Field(
+        default=0, description="同时打开的渲染页面数上限，为 0 时不限制。"
+    )
+    htmlrender_max_queue: int = Field(
+        default=100, description="达到并发上限后最多排队等待的渲染数。"
+    )
+    htmlrender_queue_timeout: float = Field(
+        default=30, description="渲染排队的最长等待时间（秒）。"
+    )
+    htmlrender_wait_until: str = Field(
+        default="networkidle",
+        description="html_to_pic 设置页面内容后的默认就绪等待策略。",
+    )
+    htmlrender_markdown_cache_size: int = Field(
+        default=128, description="缓存的 markdown 转换结果数量，为 0 时不缓存。"
+    )
+    htmlrender_offload: str = Field(
+        default="none",
+        description="jinja2 渲染与 markdown 转换的执行方式，"
+        "可选 'none'、'thread'、'process'。",
+    )
+    htmlrender_offload_workers: int = Field(
+        default=2, description="执行 jinja2 渲染与 markdown 转换的线程或进程数。"
+    )
+    htmlrender_text_engine: str = Field(
+        default="browser",
+        description="未指定 css 的纯文本 text_to_pic 的渲染引擎，"
+        "可选 'browser'、'pillow'，使用 pillow 时需要安装 Pillow。",
+    )
+    htmlrender_text_font: Optional[str] = Field(
+        default=None, description="pillow 引擎使用的字体文件路径。"
+    )
 
     @model_validator(mode="after")
     @classmethod
@@ -99,6 +236,63 @@ class Config(BaseModel):
             )
         return data
 
+    @model_validator(mode="after")
+    @classmethod
+    def check_wait_until(cls, data: Any) -> Any:
+        wait_until = (
+            data.get("htmlrender_wait_until", "networkidle")
+            if isinstance(data, dict)
+            else getattr(data, "htmlrender_wait_until", "networkidle")
+        )
+
+        if wait_until not in WAIT_UNTIL_TYPES:
+            raise ValueError(
+                f"Invalid wait_until type. Must be one of {WAIT_UNTIL_TYPES}"
+            )
+        return data
+
+    @model_validator(mode="after")
+    @classmethod
+    def check_offload(cls, data: Any) -> Any:
+        offload = (
+            data.get("htmlrender_offload", "none")
+            if isinstance(data, dict)
+            else getattr(data, "htmlrender_offload", "none")
+        )
+
+        if offload not in OFFLOAD_MODES:
+            raise ValueError(f"Invalid offload mode. Must be one of {OFFLOAD_MODES}")
+        return data
+
+    @model_validator(mode="after")
+    @classmethod
+    def check_text_engine(cls, data: Any) -> Any:
+        text_engine = (
+            data.get("htmlrender_text_engine", "browser")
+            if isinstance(data, dict)
+            else getattr(data, "htmlrender_text_engine", "browser")
+        )
+
+        if text_engine not in TEXT_ENGINES:
+            raise ValueError(f"Invalid text engine. Must be one of {TEXT_ENGINES}")
+        return data
+
+    @model_validator(mode="after")
+    @classmethod
+    def check_block_resource_types(cls, data: Any) -> Any:
+        resource_types = (
+            data.get("htmlrender_block_resource_types")
+            if isinstance(data, dict)
+            else getattr(data, "htmlrender_block_resource_types", None)
+        )
+
+        for resource_type in (resource_types or "").split(","):
+            if resource_type.strip() and resource_type.strip() not in RESOURCE_TYPES:
+                raise ValueError(
+                    f"Invalid resource type. Must be one of {RESOURCE_TYPES}"
+                )
+        return data
+
 
 global_config = get_driver().config
 plugin_config = get_plugin_config(Config)
@@ -36,3 +36,25 @@ BROWSER_CHANNEL_TYPES = [
     "firefox",
     "webkit",
 ]
+# html_to_pic 设置页面内容后的就绪等待策略, "fonts" 表示在 load 后等待字体加载完成
+WAIT_UNTIL_TYPES = ["load", "domcontentloaded", "networkidle", "fonts"]
+# 生成 html 阶段的执行方式
+OFFLOAD_MODES = ["none", "thread", "process"]
+# text_to_pic 的渲染引擎
+TEXT_ENGINES = ["browser", "pillow"]
+# 可被请求拦截策略拦截的 Playwright 资源类型
+RESOURCE_TYPES = [
+    "document",
+    "stylesheet",
+    "image",
+    "media",
+    "font",
+    "script",
+    "texttrack",
+    "xhr",
+    "fetch",
+    "eventsource",
+    "websocket",
+    "manifest",
+    "other",
+]
@@ -1,23 +1,191 @@
+import asyncio
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+import hashlib
+from html import escape
+import json
+import os
 from os import getcwd
 from pathlib import Path
-from typing import Any, Literal, Optional, Union
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Literal, Optional, Union
+from urllib.parse import urlparse
+from urllib.request import url2pathname
 
 import aiofiles
-import jinja2
-import markdown
 from nonebot.log import logger
 
-from nonebot_plugin_htmlrender.browser import get_new_page
+from nonebot_plugin_htmlrender.blocking import BlockPolicy, resolve_block_policy
+from nonebot_plugin_htmlrender.browser import (
+    BrowserCrashedError,
+    _crash_guard,
+    _lease_browser,
+    _spawn,
+    get_new_page,
+    get_pooled_page,
+    retry_on_crash,
+)
+from nonebot_plugin_htmlrender.cache import render_cache
+from nonebot_plugin_htmlrender.config import plugin_config
+from nonebot_plugin_htmlrender.executor import run_offloaded
+from nonebot_plugin_htmlrender.http_cache import http_cache
+from nonebot_plugin_htmlrender.limiter import render_limiter
+from nonebot_plugin_htmlrender.metrics import render_metrics
+from nonebot_plugin_htmlrender.pool import BLANK_PAGE_URL
+from nonebot_plugin_htmlrender.raster import can_rasterize, rasterize_text
+from nonebot_plugin_htmlrender.utils import SingleFlight, suppress_and_log
+
+if TYPE_CHECKING:
+    import jinja2
+    import markdown
+    from playwright.async_api import Browser, ConsoleMessage, Page
 
 TEMPLATES_PATH = str(Path(__file__).parent / "templates")
-
-env = jinja2.Environment(
-    extensions=["jinja2.ext.loopcontrols"],
-    loader=jinja2.FileSystemLoader(TEMPLATES_PATH),
-    enable_async=True,
+WaitUntil = Literal["load", "domcontentloaded", "networkidle", "fonts"]
+_BASE_TAG_RE = re.compile(r"<base[\s>]", re.IGNORECASE)
+_HEAD_TAG_RE = re.compile(r"<head(?:\s[^>]*)?>", re.IGNORECASE)
+_HTML_TAG_RE = re.compile(r"<html(?:\s[^>]*)?>", re.IGNORECASE)
+_DOCTYPE_RE = re.compile(r"<!doctype[^>]*>", re.IGNORECASE)
+KATEX_URL = (Path(TEMPLATES_PATH) / "katex").as_uri()
+# KaTeX 资源通过 file:// 链接由浏览器直接读取, 不再内联进每次渲染的 html
+KATEX_EXTRA = (
+    f'<link rel="stylesheet" href="{KATEX_URL}/katex.min.b64_fonts.css">'
+    f'<script defer src="{KATEX_URL}/katex.min.js"></script>'
+    f'<script defer src="{KATEX_URL}/mhchem.min.js"></script>'
+    f'<script defer src="{KATEX_URL}/mathtex-script-type.min.js"></script>'
 )
 
+# 一次往返测量元素(或 body 下所有可见元素)在页面中的外接矩形
+MEASURE_CLIP_JS = """
+(selector) => {
+  const elements = selector
+    ? [document.querySelector(selector)]
+    : Array.from(document.body.children);
+  let left = Infinity, top = Infinity, right = -Infinity, bottom = -Infinity;
+  for (const element of elements) {
+    if (!element) continue;
+    const rect = element.getBoundingClientRect();
+    if (!rect.width && !rect.height) continue;
+    left = Math.min(left, rect.left);
+    top = Math.min(top, rect.top);
+    right = Math.max(right, rect.right);
+    bottom = Math.max(bottom, rect.bottom);
+  }
+  if (left === Infinity) return null;
+  const x = Math.floor(left + window.scrollX);
+  const y = Math.floor(top + window.scrollY);
+  return {
+    x, y,
+    width: Math.ceil(right + window.scrollX) - x,
+    height: Math.ceil(bottom + window.scrollY) - y,
+  };
+}
+"""
+
+_tpl_cache: dict[str, str] = {}
+_inflight_renders: SingleFlight[bytes] = SingleFlight()
+_css_cache: OrderedDict[str, tuple[int, str]] = OrderedDict()
+_css_cache_size = 0
+
+MARKDOWN_EXTENSIONS = [
+    "pymdownx.tasklist",
+    "tables",
+    "fenced_code",
+    "codehilite",
+    "mdx_math",
+    "pymdownx.tilde",
+]
+MARKDOWN_EXTENSION_CONFIGS = {"mdx_math": {"enable_dollar_delimiter": True}}
+_md_local = threading.local()
+_md_cache: OrderedDict[str, str] = OrderedDict()
+
+_TemplateEnvKey = tuple[str, tuple[tuple[str, int], ...]]
+_template_envs: OrderedDict[_TemplateEnvKey, "jinja2.Environment"] = OrderedDict()
+
+
+def __getattr__(name: str) -> Any:
+    # jinja2 在首次使用时才导入, 兼容直接访问模块属性 `env` 的代码
+    if name == "env":
+        return get_default_env()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=1)
+def get_default_env() -> "jinja2.Environment":
+    """获取插件内置模板的 jinja2 环境, 首次调用时创建。
+
+    Returns:
+        jinja2.Environment: 模板环境
+    """
+    import jinja2
+
+    return jinja2.Environment(
+        extensions=["jinja2.ext.loopcontrols"],
+        loader=jinja2.FileSystemLoader(TEMPLATES_PATH),
+        enable_async=True,
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_bytecode_cache() -> Optional["jinja2.BytecodeCache"]:
+    if not plugin_config.htmlrender_template_bytecode_cache:
+        return None
+
+    import jinja2
+
+    cache_dir = plugin_config.htmlrender_cache_path / "jinja2"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return jinja2.FileSystemBytecodeCache(str(cache_dir))
+
+
+def get_template_env(
+    template_path: str, filters: Optional[dict[str, Any]] = None
+) -> "jinja2.Environment":
+    """获取模板路径对应的 jinja2 环境, 相同路径与过滤器会复用同一个环境。
+
+    复用环境可以保留 jinja2 的模板缓存, 模板文件修改后会根据 mtime 自动重新加载。
+
+    Args:
+        template_path (str): 模板路径
+        filters (Optional[Dict[str, Any]]): 自定义过滤器
+
+    Returns:
+        jinja2.Environment: 模板环境
+    """
+    filters = filters or {}
+    key = (
+        str(template_path),
+        tuple(sorted((name, id(func)) for name, func in filters.items())),
+    )
+    if (template_env := _template_envs.get(key)) is not None:
+        _template_envs.move_to_end(key)
+        return template_env
+
+    import jinja2
+
+    template_env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_path),
+        enable_async=True,
+        auto_reload=True,
+        bytecode_cache=_get_bytecode_cache(),
+    )
+    for filter_name, filter_func in filters.items():
+        template_env.filters[filter_name] = filter_func
+        logger.debug(f"Custom filter loaded: {filter_name}")
+
+    _template_envs[key] = template_env
+    max_size = max(plugin_config.htmlrender_template_env_cache_size, 1)
+    while len(_template_envs) > max_size:
+        _template_envs.popitem(last=False)
+    return template_env
+
 
+@render_metrics.timed("text_to_pic")
 async def text_to_pic(
     text: str,
     css_path: str = "",
@@ -26,6 +194,7 @@ async def text_to_pic(
     quality: Union[int, None] = None,
     device_scale_factor: float = 2,
     screenshot_timeout: Optional[float] = 30_000,
+    selector: Optional[str] = None,
 ) -> bytes:
     """多行文本转图片
 
@@ -37,26 +206,49 @@ async def text_to_pic(
         type (Literal["jpeg", "png"]): 图片类型, 默认 png
         quality (int, optional): 图片质量 0-100 当为`png`时无效
         device_scale_factor: 缩放比例,类型为float,值越大越清晰
+        selector (str, optional): 只截取匹配的元素, 如 "#main" 可去除页面边距
 
     Returns:
         bytes: 图片, 可直接发送
     """
-    template = env.get_template("text.html")
+    if (
+        plugin_config.htmlrender_text_engine == "pillow"
+        and not css_path
+        and not selector
+        and can_rasterize(text)
+    ):
+        with render_metrics.timer("rasterize"):
+            image = await run_offloaded(
+                rasterize_text,
+                text,
+                width,
+                type,
+                quality,
+                device_scale_factor,
+                picklable=True,
+            )
+        if image is not None:
+            return image
+
+    template = get_default_env().get_template("text.html")
+    css = await read_css(css_path) if css_path else await read_tpl("text.css")
+    with render_metrics.timer("jinja"):
+        html = await render_template(template, text=text, css=css)
 
     return await html_to_pic(
         template_path=f"file://{css_path or TEMPLATES_PATH}",
-        html=await template.render_async(
-            text=text,
-            css=await read_file(css_path) if css_path else await read_tpl("text.css"),
-        ),
+        html=html,
         viewport={"width": width, "height": 10},
         type=type,
         quality=quality,
         device_scale_factor=device_scale_factor,
         screenshot_timeout=screenshot_timeout,
+        wait_until="load",
+        selector=selector,
     )
 
 
+@render_metrics.timed("md_to_pic")
 async def md_to_pic(
     md: str = "",
     md_path: str = "",
@@ -66,6 +258,7 @@ async def md_to_pic(
     quality: Union[int, None] = None,
     device_scale_factor: float = 2,
     screenshot_timeout: Optional[float] = 30_000,
+    selector: Optional[str] = None,
 ) -> bytes:
     """markdown 转 图片
 
@@ -78,62 +271,107 @@ async def md_to_pic(
         type (Literal["jpeg", "png"]): 图片类型, 默认 png
         quality (int, optional): 图片质量 0-100 当为`png`时无效
         device_scale_factor: 缩放比例,类型为float,值越大越清晰
+        selector (str, optional): 只截取匹配的元素, 如 ".markdown-body"
 
     Returns:
         bytes: 图片, 可直接发送
     """
-    template = env.get_template("markdown.html")
+    template = get_default_env().get_template("markdown.html")
     if not md:
         if md_path:
             md = await read_file(md_path)
         else:
             raise Exception("md or md_path must be provided")
     logger.debug(md)
-    md = markdown.markdown(
-        md,
-        extensions=[
-            "pymdownx.tasklist",
-            "tables",
-            "fenced_code",
-            "codehilite",
-            "mdx_math",
-            "pymdownx.tilde",
-        ],
-        extension_configs={"mdx_math": {"enable_dollar_delimiter": True}},
-    )
+    with render_metrics.timer("markdown"):
+        md = await convert_markdown(md)
 
     logger.debug(md)
-    extra = ""
-    if "math/tex" in md:
-        katex_css = await read_tpl("katex/katex.min.b64_fonts.css")
-        katex_js = await read_tpl("katex/katex.min.js")
-        mhchem_js = await read_tpl("katex/mhchem.min.js")
-        mathtex_js = await read_tpl("katex/mathtex-script-type.min.js")
-        extra = (
-            f'<style type="text/css">{katex_css}</style>'
-            f"<script defer>{katex_js}</script>"
-            f"<script defer>{mhchem_js}</script>"
-            f"<script defer>{mathtex_js}</script>"
-        )
+    extra = KATEX_EXTRA if "math/tex" in md else ""
 
     if css_path:
-        css = await read_file(css_path)
+        css = await read_css(css_path)
     else:
         css = await read_tpl("github-markdown-light.css") + await read_tpl(
             "pygments-default.css",
         )
 
+    with render_metrics.timer("jinja"):
+        html = await render_template(template, md=md, css=css, extra=extra)
+
     return await html_to_pic(
         template_path=f"file://{css_path or TEMPLATES_PATH}",
-        html=await template.render_async(md=md, css=css, extra=extra),
+        html=html,
         viewport={"width": width, "height": 10},
         type=type,
         quality=quality,
         device_scale_factor=device_scale_factor,
         screenshot_timeout=screenshot_timeout,
+        wait_until="load",
+        selector=selector,
     )
 
 
+async def render_template(template: "jinja2.Template", **kwargs) -> str:
+    """渲染 jinja2 模板
+
+    开启 `htmlrender_offload` 时在线程池中渲染, 避免大模板阻塞事件循环。
+    模板与自定义过滤器无法跨进程传递, 进程池模式下同样使用线程池。
+
+    Args:
+        template (jinja2.Template): 模板
+        **kwargs: 模板内容
+
+    Returns:
+        str: html
+    """
+    if plugin_config.htmlrender_offload == "none":
+        return await template.render_async(**kwargs)
+    return await run_offloaded(partial(template.render, **kwargs))
+
+
+def _get_markdown_converter() -> "markdown.Markdown":
+    # markdown.Markdown 实例不是线程安全的, 每个线程各自持有一个
+    if (converter := getattr(_md_local, "converter", None)) is None:
+        import markdown
+
+        converter = _md_local.converter = markdown.Markdown(
+            extensions=MARKDOWN_EXTENSIONS,
+            extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+        )
+    return converter
+
+
+def _convert_markdown(md: str) -> str:
+    return _get_markdown_converter().reset().convert(md)
+
+
+async def convert_markdown(md: str) -> str:
+    """将 markdown 转换为 html
+
+    复用同一个 markdown 转换器, 并按内容哈希缓存转换结果,
+    重复的文档会跳过解析与代码高亮。
+    开启 `htmlrender_offload` 时转换在线程池或进程池中进行。
+
+    Args:
+        md (str): markdown 格式文本
+
+    Returns:
+        str: html
+    """
+    key = hashlib.sha256(md.encode()).hexdigest()
+    if (html := _md_cache.get(key)) is not None:
+        _md_cache.move_to_end(key)
+        return html
+
+    html = await run_offloaded(_convert_markdown, md, picklable=True)
+    if plugin_config.htmlrender_markdown_cache_size > 0:
+        _md_cache[key] = html
+        while len(_md_cache) > plugin_config.htmlrender_markdown_cache_size:
+            _md_cache.popitem(last=False)
+    return html
+
+
 # async def read_md(md_path: str) -> str:
 #     async with aiofiles.open(str(Path(md_path).resolve()), mode="r") as f:
 #         md = await f.read()
@@ -146,9 +384,34 @@ async def read_file(path: str) -> str:
 
 
 async def read_tpl(path: str) -> str:
-    return await read_file(f"{TEMPLATES_PATH}/{path}")
-
-
+    """读取内置模板资源, 内置资源不会变化, 首次读取后缓存在内存中。"""
+    if (content := _tpl_cache.get(path)) is None:
+        content = _tpl_cache[path] = await read_file(f"{TEMPLATES_PATH}/{path}")
+    return content
+
+
+async def read_css(path: str) -> str:
+    """读取用户 css 文件, 按路径与修改时间缓存, 缓存总大小受配置限制。"""
+    global _css_cache_size
+
+    mtime = os.stat(path).st_mtime_ns
+    if (cached := _css_cache.get(path)) is not None and cached[0] == mtime:
+        _css_cache.move_to_end(path)
+        return cached[1]
+
+    content = await read_file(path)
+    if (old := _css_cache.pop(path, None)) is not None:
+        _css_cache_size -= len(old[1])
+    if len(content) <= plugin_config.htmlrender_asset_cache_size:
+        _css_cache[path] = (mtime, content)
+        _css_cache_size += len(content)
+        while _css_cache_size > plugin_config.htmlrender_asset_cache_size:
+            _, (_, evicted) = _css_cache.popitem(last=False)
+            _css_cache_size -= len(evicted)
+    return content
+
+
+@render_metrics.timed("template_to_html")
 async def template_to_html(
     template_path: str,
     template_name: str,
@@ -166,21 +429,30 @@ async def template_to_html(
         str: html
     """
 
-    template_env = jinja2.Environment(
-        loader=jinja2.FileSystemLoader(template_path),
-        enable_async=True,
-    )
+    with render_metrics.timer("jinja"):
+        template = get_template_env(template_path, filters).get_template(template_name)
+        return await render_template(template, **kwargs)
 
-    if filters:
-        for filter_name, filter_func in filters.items():
-            template_env.filters[filter_name] = filter_func
-            logger.debug(f"Custom filter loaded: {filter_name}")
 
-    template = template_env.get_template(template_name)
+def _with_base_url(html: str, template_path: str) -> str:
+    """在 html 中插入指向模板路径的 <base>, 使相对路径不依赖页面当前地址。"""
+    if _BASE_TAG_RE.search(html):
+        return html
 
-    return await template.render_async(**kwargs)
+    base_url = template_path
+    if not base_url.endswith("/") and os.path.isdir(
+        url2pathname(urlparse(template_path).path)
+    ):
+        base_url += "/"
+    base_tag = f'<base href="{escape(base_url, quote=True)}">'
 
+    for pattern in (_HEAD_TAG_RE, _HTML_TAG_RE, _DOCTYPE_RE):
+        if match := pattern.search(html):
+            return f"{html[: match.end()]}{base_tag}{html[match.end() :]}"
+    return base_tag + html
 
+
+@render_metrics.timed("html_to_pic")
 async def html_to_pic(
     html: str,
     wait: int = 0,
@@ -190,6 +462,11 @@ async def html_to_pic(
     device_scale_factor: float = 2,
     screenshot_timeout: Optional[float] = 30_000,
     full_page: Optional[bool] = True,
+    wait_until: Optional[WaitUntil] = None,
+    ready_predicate: Optional[str] = None,
+    selector: Optional[str] = None,
+    auto_clip: bool = False,
+    block_policy: Optional[BlockPolicy] = None,
     **kwargs,
 ) -> bytes:
     """html转图片
@@ -202,6 +479,15 @@ async def html_to_pic(
         type (Literal["jpeg", "png"]): 图片类型, 默认 png
         quality (int, optional): 图片质量 0-100 当为`png`时无效
         device_scale_factor: 缩放比例,类型为float,值越大越清晰
+        wait_until (WaitUntil, optional): 页面就绪等待策略, 可选 "load"、
+            "domcontentloaded"、"networkidle" 或 "fonts"(load 后等待字体加载完成),
+            默认使用配置项 `htmlrender_wait_until`
+        ready_predicate (str, optional): 额外等待直到返回真值的 JS 表达式或函数
+        selector (str, optional): 只截取匹配该 CSS 选择器的元素, 如 "#main"
+        auto_clip (bool, optional): 自动测量 body 内容区域并只截取该区域,
+            去除四周的空白, 找不到可见内容时截取整个页面
+        block_policy (BlockPolicy, optional): 请求拦截策略,
+            默认使用配置项中的全局策略, 传入`BlockPolicy()`可禁用拦截
         **kwargs: 传入 page 的参数
 
     Returns:
@@ -210,19 +496,144 @@ async def html_to_pic(
     # logger.debug(f"html:\n{html}")
     if "file:" not in template_path:
         raise Exception("template_path should be file:///path/to/template")
-    async with get_new_page(device_scale_factor, **kwargs) as page:
-        page.on("console", lambda msg: logger.debug(f"[Browser Console]: {msg.text}"))
-        await page.goto(template_path)
-        await page.set_content(html, wait_until="networkidle")
-        await page.wait_for_timeout(wait)
-        return await page.screenshot(
+
+    wait_until = wait_until or plugin_config.htmlrender_wait_until
+    block_policy = resolve_block_policy(block_policy)
+    coalesce = plugin_config.htmlrender_coalesce
+    if not render_cache.enabled and not coalesce:
+        return await _render_html(
+            html,
+            wait=wait,
+            template_path=template_path,
+            type=type,
+            quality=quality,
+            device_scale_factor=device_scale_factor,
+            screenshot_timeout=screenshot_timeout,
             full_page=full_page,
+            wait_until=wait_until,
+            ready_predicate=ready_predicate,
+            selector=selector,
+            auto_clip=auto_clip,
+            block_policy=block_policy,
+            **kwargs,
+        )
+
+    key = render_cache.make_key(
+        html=html,
+        wait=wait,
+        template_path=template_path,
+        type=type,
+        quality=quality,
+        device_scale_factor=device_scale_factor,
+        full_page=full_page,
+        wait_until=wait_until,
+        ready_predicate=ready_predicate,
+        selector=selector,
+        auto_clip=auto_clip,
+        block_policy=block_policy.to_dict(),
+        page=kwargs,
+    )
+    if render_cache.enabled and (cached := await render_cache.get(key)) is not None:
+        return cached
+
+    async def _render() -> bytes:
+        image = await _render_html(
+            html,
+            wait=wait,
+            template_path=template_path,
             type=type,
             quality=quality,
-            timeout=screenshot_timeout,
+            device_scale_factor=device_scale_factor,
+            screenshot_timeout=screenshot_timeout,
+            full_page=full_page,
+            wait_until=wait_until,
+            ready_predicate=ready_predicate,
+            selector=selector,
+            auto_clip=auto_clip,
+            block_policy=block_policy,
+            **kwargs,
         )
+        if render_cache.enabled:
+            await render_cache.set(key, image)
+        return image
 
+    if not coalesce:
+        return await _render()
+    return await _inflight_renders.do(key, _render, on_shared=_count_coalesced)
 
+
+def _count_coalesced() -> None:
+    render_metrics.coalesced_renders += 1
+
+
+@retry_on_crash
+async def _render_html(
+    html: str,
+    wait: int,
+    template_path: str,
+    type: Literal["jpeg", "png"],
+    quality: Union[int, None],
+    device_scale_factor: float,
+    screenshot_timeout: Optional[float],
+    full_page: Optional[bool],
+    wait_until: str,
+    ready_predicate: Optional[str],
+    selector: Optional[str] = None,
+    auto_clip: bool = False,
+    block_policy: Optional[BlockPolicy] = None,
+    **kwargs,
+) -> bytes:
+    start = time.perf_counter()
+    async with get_pooled_page(device_scale_factor, **kwargs) as page:
+        render_metrics.observe("page", time.perf_counter() - start)
+        with _logging_console(page):
+            # 后注册的路由先执行, 被拦截的请求不会读取缓存;
+            # 拦截路由放行的请求由缓存路由请求并检查响应大小
+            cached = await http_cache.apply(page, block_policy)
+            if block_policy is not None:
+                await block_policy.apply(page, check_size=not cached)
+            # 页面池归还时已导航到 file:// 源的空白文档, 通过 <base> 指定模板路径即可,
+            # 无需再次导航; 其他页面的 window 可能残留脚本状态, 必须导航
+            if page.url != BLANK_PAGE_URL:
+                with render_metrics.timer("navigate"):
+                    await page.goto(template_path)
+            with render_metrics.timer("set_content"):
+                await page.set_content(
+                    _with_base_url(html, template_path),
+                    wait_until="load" if wait_until == "fonts" else wait_until,
+                )
+            with render_metrics.timer("ready"):
+                if wait_until == "fonts":
+                    await page.evaluate("document.fonts.ready.then(() => true)")
+                if ready_predicate:
+                    await page.wait_for_function(ready_predicate)
+                await page.wait_for_timeout(wait)
+            clip = None
+            if selector or auto_clip:
+                with render_metrics.timer("measure"):
+                    clip = await page.evaluate(MEASURE_CLIP_JS, selector)
+                if clip is None and selector:
+                    raise ValueError(f"No visible element matches selector: {selector}")
+            with render_metrics.timer("screenshot"):
+                if clip is not None:
+                    # 非 full_page 截图的 clip 会被裁剪到视口内, 需要与 full_page
+                    # 一起使用才能按整个文档裁剪
+                    return await page.screenshot(
+                        full_page=True,
+                        clip=clip,
+                        type=type,
+                        quality=quality,
+                        timeout=screenshot_timeout,
+                    )
+                return await page.screenshot(
+                    full_page=full_page,
+                    type=type,
+                    quality=quality,
+                    timeout=screenshot_timeout,
+                )
+
+
+@render_metrics.timed("template_to_pic")
 async def template_to_pic(
     template_path: str,
     template_name: str,
@@ -234,6 +645,7 @@ async def template_to_pic(
     quality: Union[int, None] = None,
     device_scale_factor: float = 2,
     screenshot_timeout: Optional[float] = 30_000,
+    selector: Optional[str] = None,
 ) -> bytes:
     """使用jinja2模板引擎通过html生成图片
 
@@ -249,6 +661,7 @@ async def template_to_pic(
         type (Literal["jpeg", "png"]): 图片类型, 默认 png
         quality (int, optional): 图片质量 0-100 当为`png`时无效
         device_scale_factor: 缩放比例,类型为float,值越大越清晰
+        selector (str, optional): 只截取匹配该 CSS 选择器的元素
     Returns:
         bytes: 图片 可直接发送
     """
@@ -258,36 +671,50 @@ async def template_to_pic(
             "base_url": f"file://{getcwd()}",
         }
 
-    template_env = jinja2.Environment(
-        loader=jinja2.FileSystemLoader(template_path),
-        enable_async=True,
-    )
-
-    if filters:
-        for filter_name, filter_func in filters.items():
-            template_env.filters[filter_name] = filter_func
-            logger.debug(f"Custom filter loaded: {filter_name}")
-
-    template = template_env.get_template(template_name)
+    with render_metrics.timer("jinja"):
+        template = get_template_env(template_path, filters).get_template(template_name)
+        html = await render_template(template, **templates)
 
     return await html_to_pic(
         template_path=f"file://{template_path}",
-        html=await template.render_async(**templates),
+        html=html,
         wait=wait,
         type=type,
         quality=quality,
         device_scale_factor=device_scale_factor,
         screenshot_timeout=screenshot_timeout,
+        selector=selector,
         **pages,
     )
 
 
+@dataclass
+class _WarmPage:
+    """`capture_elements`保持导航完成状态的页面。"""
+
+    browser: "Browser"
+    page: "Page"
+    timer: Optional[asyncio.TimerHandle] = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    navigated: bool = False
+
+    @property
+    def alive(self) -> bool:
+        return self.browser.is_connected() and not self.page.is_closed()
+
+
+_warm_pages: dict[str, _WarmPage] = {}
+
+
+@render_metrics.timed("capture_element")
 async def capture_element(
     url: str,
     element: str,
     page_kwargs: Optional[dict] = None,
     goto_kwargs: Optional[dict] = None,
     screenshot_kwargs: Optional[dict] = None,
+    keep_warm: float = 0,
+    block_policy: Optional[BlockPolicy] = None,
 ) -> bytes:
     """捕获网页中指定元素的截图, 通过CSS选择器或XPath表达式指定元素。
 
@@ -297,20 +724,190 @@ async def capture_element(
         page_kwargs: 传递给get_new_page的参数
         goto_kwargs: 传递给page.goto方法的额外参数
         screenshot_kwargs: 传递给screenshot方法的额外参数
+        keep_warm: 截图后保留页面的秒数, 期间相同参数的截图不再重新导航,
+            为 0 时截图后立即关闭页面
+        block_policy: 请求拦截策略, 默认使用配置项中的全局策略,
+            传入`BlockPolicy()`可禁用拦截
 
     Returns:
         bytes: 元素截图数据
     """
-    page_kwargs = page_kwargs or {}
-    goto_kwargs = goto_kwargs or {}
-    screenshot_kwargs = screenshot_kwargs or {}
+    images = await _capture_elements(
+        url,
+        [element],
+        page_kwargs or {},
+        goto_kwargs or {},
+        screenshot_kwargs or {},
+        keep_warm,
+        resolve_block_policy(block_policy),
+    )
+    return images[0]
 
-    async with get_new_page(**page_kwargs) as page:
-        page.on(
-            "console",
-            lambda msg: logger.opt(colors=True).debug(
-                f"<cyan>[Browser Console]</cyan> {msg.text}"
-            ),
+
+@render_metrics.timed("capture_elements")
+async def capture_elements(
+    url: str,
+    elements: Sequence[str],
+    page_kwargs: Optional[dict] = None,
+    goto_kwargs: Optional[dict] = None,
+    screenshot_kwargs: Optional[dict] = None,
+    keep_warm: float = 0,
+    block_policy: Optional[BlockPolicy] = None,
+) -> list[bytes]:
+    """只导航一次, 依次捕获网页中多个元素的截图。
+
+    Args:
+        url: 目标网页URL
+        elements: CSS选择器或XPath表达式列表
+        page_kwargs: 传递给get_new_page的参数
+        goto_kwargs: 传递给page.goto方法的额外参数
+        screenshot_kwargs: 传递给screenshot方法的额外参数
+        keep_warm: 截图后保留页面的秒数, 期间相同参数的截图不再重新导航,
+            为 0 时截图后立即关闭页面
+        block_policy: 请求拦截策略, 默认使用配置项中的全局策略,
+            传入`BlockPolicy()`可禁用拦截
+
+    Returns:
+        List[bytes]: 与`elements`顺序一致的元素截图数据
+    """
+    return await _capture_elements(
+        url,
+        elements,
+        page_kwargs or {},
+        goto_kwargs or {},
+        screenshot_kwargs or {},
+        keep_warm,
+        resolve_block_policy(block_policy),
+    )
+
+
+@retry_on_crash
+async def _capture_elements(
+    url: str,
+    elements: Sequence[str],
+    page_kwargs: dict,
+    goto_kwargs: dict,
+    screenshot_kwargs: dict,
+    keep_warm: float,
+    block_policy: BlockPolicy,
+) -> list[bytes]:
+    if keep_warm > 0:
+        return await _capture_warm(
+            url,
+            elements,
+            page_kwargs,
+            goto_kwargs,
+            screenshot_kwargs,
+            keep_warm,
+            block_policy,
         )
-        await page.goto(url, **goto_kwargs)
-        return await page.locator(element).screenshot(**screenshot_kwargs)
+
+    start = time.perf_counter()
+    async with get_new_page(**page_kwargs) as page:
+        render_metrics.observe("page", time.perf_counter() - start)
+        _log_console(page)
+        await block_policy.apply(page)
+        with render_metrics.timer("navigate"):
+            await page.goto(url, **goto_kwargs)
+        return await _screenshot_elements(page, elements, screenshot_kwargs)
+
+
+async def _capture_warm(
+    url: str,
+    elements: Sequence[str],
+    page_kwargs: dict,
+    goto_kwargs: dict,
+    screenshot_kwargs: dict,
+    keep_warm: float,
+    block_policy: BlockPolicy,
+) -> list[bytes]:
+    key = json.dumps(
+        [url, page_kwargs, goto_kwargs, block_policy.to_dict()],
+        sort_keys=True,
+        default=repr,
+    )
+    entry = _warm_pages.get(key)
+    async with (
+        render_limiter.slot(),
+        _lease_browser(entry.browser if entry is not None else None) as browser,
+    ):
+        entry = _warm_pages.get(key)
+        if entry is None or not entry.alive or entry.browser is not browser:
+            with render_metrics.timer("page"):
+                page = await browser.new_page(
+                    **{"device_scale_factor": 2, **page_kwargs}
+                )
+            _log_console(page)
+            entry = _warm_pages[key] = _WarmPage(browser=browser, page=page)
+
+        async with entry.lock:
+            if entry.timer is not None:
+                entry.timer.cancel()
+            guard = _crash_guard(entry.page, entry.browser)
+            try:
+                with render_metrics.track_page(), guard:
+                    # 在锁内检查, 并发调用只会由第一个调用导航
+                    if not entry.navigated:
+                        await block_policy.apply(entry.page)
+                        with render_metrics.timer("navigate"):
+                            await entry.page.goto(url, **goto_kwargs)
+                        entry.navigated = True
+                    return await _screenshot_elements(
+                        entry.page, elements, screenshot_kwargs
+                    )
+            except BrowserCrashedError:
+                if _warm_pages.get(key) is entry:
+                    del _warm_pages[key]
+                raise
+            except Exception:
+                # 导航失败的页面不能复用
+                if not entry.navigated and _warm_pages.get(key) is entry:
+                    del _warm_pages[key]
+                raise
+            finally:
+                entry.timer = asyncio.get_running_loop().call_later(
+                    keep_warm if _warm_pages.get(key) is entry else 0,
+                    _expire_warm_page,
+                    key,
+                    entry,
+                )
+
+
+def _expire_warm_page(key: str, entry: _WarmPage) -> None:
+    if _warm_pages.get(key) is entry:
+        del _warm_pages[key]
+    _spawn(_close_page(entry.page))
+
+
+async def _close_page(page: "Page") -> None:
+    if not page.is_closed():
+        with suppress_and_log():
+            await page.close()
+
+
+def _on_console(msg: "ConsoleMessage") -> None:
+    logger.opt(colors=True).debug(f"<cyan>[Browser Console]</cyan> {msg.text}")
+
+
+def _log_console(page: "Page") -> None:
+    page.on("console", _on_console)
+
+
+@contextmanager
+def _logging_console(page: "Page") -> Iterator[None]:
+    """在上下文中记录页面控制台输出, 退出时移除监听, 避免复用的页面重复记录。"""
+    page.on("console", _on_console)
+    try:
+        yield
+    finally:
+        page.remove_listener("console", _on_console)
+
+
+async def _screenshot_elements(
+    page: "Page", elements: Sequence[str], screenshot_kwargs: dict
+) -> list[bytes]:
+    with render_metrics.timer("screenshot"):
+        return [
+            await page.locator(element).screenshot(**screenshot_kwargs)
+            for element in elements
+        ]
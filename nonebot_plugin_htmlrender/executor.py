@@ -0,0 +1,101 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+import threading
+from typing import Callable, Optional, TypeVar
+
+from nonebot.log import logger
+
+from nonebot_plugin_htmlrender.config import plugin_config
+
+R = TypeVar("R")
+
+_thread_executor: Optional[ThreadPoolExecutor] = None
+_process_executor: Optional[ProcessPoolExecutor] = None
+_process_unavailable = False
+
+
+def _get_thread_executor() -> ThreadPoolExecutor:
+    global _thread_executor
+    if _thread_executor is None:
+        _thread_executor = ThreadPoolExecutor(
+            max_workers=plugin_config.htmlrender_offload_workers,
+            thread_name_prefix="htmlrender",
+        )
+    return _thread_executor
+
+
+def _get_process_executor() -> Executor:
+    global _process_executor, _process_unavailable
+    if _process_executor is not None:
+        return _process_executor
+    if _process_unavailable:
+        return _get_thread_executor()
+
+    # 子进程需要继承已导入的插件模块, 只有 fork 启动方式可以做到:
+    # spawn 与 forkserver 会在子进程中重新导入插件包, 而子进程中 nonebot 未初始化
+    if "fork" not in multiprocessing.get_all_start_methods():
+        reason = "requires the 'fork' start method"
+    # 多线程进程中 fork 会复制其他线程持有的锁, 子进程可能因此死锁
+    elif threading.active_count() > 1:
+        reason = "cannot fork safely while other threads are running"
+    else:
+        _process_executor = ProcessPoolExecutor(
+            max_workers=plugin_config.htmlrender_offload_workers,
+            mp_context=multiprocessing.get_context("fork"),
+        )
+        # fork 方式在首次提交任务时创建全部子进程, 立即提交以便在此刻完成 fork
+        _process_executor.submit(int)
+        return _process_executor
+
+    _process_unavailable = True
+    logger.warning(
+        f"Process offload {reason}, falling back to thread offload. "
+        "The process pool is created on startup, before the browser starts."
+    )
+    return _get_thread_executor()
+
+
+def start_executors() -> None:
+    """进程池模式下预先创建进程池。
+
+    应在启动浏览器等会创建线程的操作之前调用, 之后进程池无法安全地 fork。
+    """
+    if plugin_config.htmlrender_offload == "process":
+        _get_process_executor()
+
+
+async def run_offloaded(func: Callable[..., R], *args, picklable: bool = False) -> R:
+    """按配置在线程池或进程池中执行 CPU 密集的同步函数, 避免阻塞事件循环。
+
+    Args:
+        func (Callable[..., R]): 要执行的函数。
+        *args: 传递给函数的参数。
+        picklable (bool): 函数与参数是否可以序列化, 为 False 时进程池模式下
+            也会使用线程池执行。
+
+    Returns:
+        R: 函数返回值。
+    """
+    mode = plugin_config.htmlrender_offload
+    if mode == "none":
+        return func(*args)
+
+    executor = (
+        _get_process_executor()
+        if mode == "process" and picklable
+        else _get_thread_executor()
+    )
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+def shutdown_executors() -> None:
+    """关闭线程池与进程池。"""
+    global _thread_executor, _process_executor, _process_unavailable
+    _process_unavailable = False
+    if _thread_executor is not None:
+        _thread_executor.shutdown(wait=False)
+        _thread_executor = None
+    if _process_executor is not None:
+        _process_executor.shutdown(wait=False)
+        _process_executor = None
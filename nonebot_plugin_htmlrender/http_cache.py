@@ -0,0 +1,207 @@
+from dataclasses import dataclass
+from functools import partial
+import hashlib
+import json
+import os
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING, Optional
+
+import aiofiles
+from nonebot.log import logger
+
+from nonebot_plugin_htmlrender.cache import DiskPruner
+from nonebot_plugin_htmlrender.config import plugin_config
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Route
+
+    from nonebot_plugin_htmlrender.blocking import BlockPolicy
+
+# route.fetch 返回的是解码后的响应体, 这些头部不能原样写回
+_DROPPED_HEADERS = {
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+    "connection",
+    "keep-alive",
+    "set-cookie",
+}
+
+
+@dataclass
+class HttpCacheStats:
+    """远程资源磁盘缓存的统计信息。"""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+
+
+@dataclass
+class CachedResponse:
+    """缓存的 http 响应。"""
+
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+
+class HttpAssetCache:
+    """以 URL 为键的远程资源磁盘缓存。
+
+    通过页面路由拦截 http(s) GET 请求, 将成功的响应保存到磁盘,
+    之后的渲染直接从磁盘返回, 浏览器重启后依然有效。
+    每个条目保存为一个文件, 第一行为 JSON 格式的状态码与响应头, 其后为响应体。
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        path: Path,
+        ttl: float,
+        max_bytes: int,
+        max_item_bytes: int,
+    ) -> None:
+        """初始化远程资源缓存。
+
+        Args:
+            enabled (bool): 是否启用缓存。
+            path (Path): 缓存目录。
+            ttl (float): 缓存有效时间(秒)。
+            max_bytes (int): 缓存目录最大字节数。
+            max_item_bytes (int): 单个响应体最大字节数, 超过时不缓存。
+        """
+        self.enabled = enabled
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.stats = HttpCacheStats()
+        self._pruner = DiskPruner(path, ttl, max_bytes)
+
+    @staticmethod
+    def make_key(url: str) -> str:
+        """根据 URL 生成缓存文件名。"""
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    async def get(self, url: str) -> Optional[CachedResponse]:
+        """读取缓存的响应。
+
+        Args:
+            url (str): 资源 URL。
+
+        Returns:
+            Optional[CachedResponse]: 命中且未过期时返回响应, 否则返回 None。
+        """
+        path = self.path / self.make_key(url)
+        try:
+            if time.time() - os.stat(path).st_mtime > self.ttl:
+                os.remove(path)
+                return None
+            async with aiofiles.open(path, "rb") as f:
+                data = await f.read()
+            meta, body = data.split(b"\n", 1)
+            info = json.loads(meta)
+        except (OSError, ValueError):
+            return None
+        if info.get("url") != url:
+            return None
+        return CachedResponse(status=info["status"], headers=info["headers"], body=body)
+
+    async def set(self, url: str, response: CachedResponse) -> None:
+        """写入响应, 超过单项大小上限时忽略。
+
+        Args:
+            url (str): 资源 URL。
+            response (CachedResponse): 响应。
+        """
+        if len(response.body) > self.max_item_bytes:
+            return
+        meta = json.dumps(
+            {"url": url, "status": response.status, "headers": response.headers}
+        ).encode()
+        data = meta + b"\n" + response.body
+        key = self.make_key(url)
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path / f"{key}.tmp"
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(data)
+            os.replace(tmp_path, self.path / key)
+            await self._pruner.record_write(len(data))
+        except OSError as e:
+            logger.warning(f"Failed to write http cache to disk: {e}")
+            return
+        self.stats.stores += 1
+
+    async def apply(
+        self, page: "Page", block_policy: Optional["BlockPolicy"] = None
+    ) -> bool:
+        """在页面上注册缓存路由, 未启用时不注册。
+
+        Args:
+            page (Page): 页面对象。
+            block_policy (BlockPolicy, optional): 请求拦截策略,
+                由缓存路由检查其中的响应大小上限。
+
+        Returns:
+            bool: 是否注册了缓存路由。
+        """
+        if not self.enabled:
+            return False
+        await page.route("**/*", partial(self._handle, block_policy=block_policy))
+        return True
+
+    async def _handle(
+        self, route: "Route", block_policy: Optional["BlockPolicy"] = None
+    ) -> None:
+        request = route.request
+        url = request.url
+        if request.method != "GET" or not url.startswith(("http://", "https://")):
+            await route.fallback()
+            return
+
+        if (cached := await self.get(url)) is not None:
+            self.stats.hits += 1
+            if block_policy is not None and block_policy.exceeds(url, len(cached.body)):
+                await route.abort("blockedbyclient")
+                return
+            await route.fulfill(
+                status=cached.status, headers=cached.headers, body=cached.body
+            )
+            return
+
+        self.stats.misses += 1
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception as e:
+            # 未处理的路由会让页面一直等待到超时
+            logger.debug(f"Failed to fetch {url}: {e}")
+            await route.abort("failed")
+            return
+        if block_policy is not None and block_policy.exceeds(url, len(body)):
+            await route.abort("blockedbyclient")
+            return
+        if response.status == 200 and "no-store" not in response.headers.get(
+            "cache-control", ""
+        ):
+            headers = {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            }
+            await self.set(
+                url, CachedResponse(status=response.status, headers=headers, body=body)
+            )
+        await route.fulfill(response=response, body=body)
+
+
+http_cache = HttpAssetCache(
+    enabled=plugin_config.htmlrender_http_cache,
+    path=plugin_config.htmlrender_cache_path / "http",
+    ttl=plugin_config.htmlrender_http_cache_ttl,
+    max_bytes=plugin_config.htmlrender_http_cache_size,
+    max_item_bytes=plugin_config.htmlrender_http_cache_max_item_size,
+)
@@ -0,0 +1,104 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import time
+
+from nonebot_plugin_htmlrender.config import plugin_config
+
+
+class RenderOverloadError(RuntimeError):
+    """渲染排队已满或等待超时时抛出。"""
+
+
+@dataclass
+class RenderLimiterStats:
+    """渲染并发限制器的统计信息。"""
+
+    active: int = 0
+    waiting: int = 0
+    acquired: int = 0
+    rejected: int = 0
+    timeouts: int = 0
+    last_wait: float = 0
+    max_wait: float = 0
+    total_wait: float = 0
+
+
+class RenderLimiter:
+    """全局渲染并发限制器。
+
+    限制同时打开的页面数, 超出的请求进入有界等待队列,
+    队列已满或等待超时时抛出`RenderOverloadError`以便调用方降级处理。
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, timeout: float) -> None:
+        """初始化并发限制器。
+
+        Args:
+            max_concurrency (int): 最大同时渲染数, 为 0 时不限制。
+            max_queue (int): 最大排队数。
+            timeout (float): 排队最长等待时间(秒)。
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+        self._stats = RenderLimiterStats()
+
+    @property
+    def stats(self) -> RenderLimiterStats:
+        """当前的统计信息。"""
+        return self._stats
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """占用一个渲染名额, 退出时释放。
+
+        Raises:
+            RenderOverloadError: 排队已满或等待超时。
+        """
+        if self.max_concurrency <= 0:
+            self._stats.active += 1
+            try:
+                yield
+            finally:
+                self._stats.active -= 1
+            return
+
+        if self._semaphore.locked() and self._stats.waiting >= self.max_queue:
+            self._stats.rejected += 1
+            raise RenderOverloadError(
+                f"Render queue is full ({self._stats.waiting} waiting)"
+            )
+
+        start = time.monotonic()
+        self._stats.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._stats.timeouts += 1
+            raise RenderOverloadError(
+                f"Timed out after {self.timeout}s waiting for a render slot"
+            ) from None
+        finally:
+            self._stats.waiting -= 1
+
+        waited = time.monotonic() - start
+        self._stats.acquired += 1
+        self._stats.last_wait = waited
+        self._stats.max_wait = max(self._stats.max_wait, waited)
+        self._stats.total_wait += waited
+        self._stats.active += 1
+        try:
+            yield
+        finally:
+            self._stats.active -= 1
+            self._semaphore.release()
+
+
+render_limiter = RenderLimiter(
+    max_concurrency=plugin_config.htmlrender_max_concurrency,
+    max_queue=plugin_config.htmlrender_max_queue,
+    timeout=plugin_config.htmlrender_queue_timeout,
+)
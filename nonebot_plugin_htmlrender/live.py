@@ -0,0 +1,247 @@
+import asyncio
+import json
+import re
+from typing import TYPE_CHECKING, Any, Literal, Optional, Union
+from typing_extensions import Self
+
+from nonebot_plugin_htmlrender.browser import (
+    BrowserCrashedError,
+    _crash_guard,
+    _lease_browser,
+    retry_on_crash,
+)
+from nonebot_plugin_htmlrender.data_source import (
+    MEASURE_CLIP_JS,
+    _with_base_url,
+    get_template_env,
+    render_template,
+)
+from nonebot_plugin_htmlrender.limiter import render_limiter
+from nonebot_plugin_htmlrender.metrics import render_metrics
+from nonebot_plugin_htmlrender.utils import suppress_and_log
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Page
+
+_BODY_RE = re.compile(r"(<body[^>]*>)(.*)(</body>)", re.IGNORECASE | re.DOTALL)
+
+# 替换 body 内容后等待新图片与字体加载完成
+UPDATE_BODY_JS = """
+async (html) => {
+  document.body.innerHTML = html;
+  await Promise.all(
+    Array.from(document.images)
+      .filter((image) => !image.complete)
+      .map((image) => new Promise((resolve) => {
+        image.onload = image.onerror = resolve;
+      }))
+  );
+  await document.fonts.ready;
+}
+"""
+
+
+class LiveTemplate:
+    """常驻页面的模板渲染。
+
+    首次渲染时加载完整的 html, 之后只把重新渲染的 `<body>` 内容推送到页面,
+    样式表解析、字体加载等开销只发生一次。`<head>` 或 `<body>` 标签本身
+    发生变化时会重新加载完整页面。通过 innerHTML 替换的 `<script>` 不会执行,
+    需要脚本参与的模板可以在页面中定义更新函数并设置`update_function`,
+    之后的渲染会直接以模板参数(需可 JSON 序列化)调用该函数。
+
+    同一实例的渲染会依次进行, 不同模板请使用不同的实例。
+
+    Examples:
+        >>> async with LiveTemplate(template_path, "score.html") as live:
+        ...     pic = await live.render({"score": 1})
+        ...     pic = await live.render({"score": 2})
+    """
+
+    def __init__(
+        self,
+        template_path: str,
+        template_name: str,
+        filters: Optional[dict[str, Any]] = None,
+        pages: Optional[dict[str, Any]] = None,
+        device_scale_factor: float = 2,
+        update_function: Optional[str] = None,
+        selector: Optional[str] = None,
+    ) -> None:
+        """初始化常驻模板。
+
+        Args:
+            template_path (str): 模板路径
+            template_name (str): 模板名
+            filters (Optional[Dict[str, Any]]): 自定义过滤器
+            pages (Optional[Dict[str, Any]]): 网页参数, 默认为
+                {"viewport": {"width": 500, "height": 10}}
+            device_scale_factor (float): 缩放比例
+            update_function (Optional[str]): 页面中接收模板参数并更新页面的
+                全局函数名, 为 None 时推送重新渲染的 body 内容
+            selector (Optional[str]): 只截取匹配该 CSS 选择器的元素
+        """
+        self.template_path = template_path
+        self.template_name = template_name
+        self.filters = filters
+        self.pages = pages or {"viewport": {"width": 500, "height": 10}}
+        self.device_scale_factor = device_scale_factor
+        self.update_function = update_function
+        self.selector = selector
+        self.full_renders = 0
+        self._base_url = f"file://{template_path}"
+        self._browser: Optional["Browser"] = None
+        self._page: Optional["Page"] = None
+        self._shell: Optional[tuple[str, str]] = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def render(
+        self,
+        templates: dict[Any, Any],
+        wait: int = 0,
+        type: Literal["jpeg", "png"] = "png",
+        quality: Union[int, None] = None,
+        screenshot_timeout: Optional[float] = 30_000,
+    ) -> bytes:
+        """使用新的模板参数渲染图片
+
+        Args:
+            templates (Dict[Any, Any]): 模板内参数 如: {"name": "abc"}
+            wait (int, optional): 更新后的等待时间. Defaults to 0.
+            type (Literal["jpeg", "png"]): 图片类型, 默认 png
+            quality (int, optional): 图片质量 0-100 当为`png`时无效
+            screenshot_timeout (float, optional): 截图超时时间，默认30000ms
+
+        Returns:
+            bytes: 图片, 可直接发送
+        """
+        async with self._lock, render_limiter.slot():
+            return await self._render(
+                templates, wait, type, quality, screenshot_timeout
+            )
+
+    async def close(self) -> None:
+        """关闭常驻页面。"""
+        page, self._page = self._page, None
+        self._reset()
+        if page is not None and not page.is_closed():
+            with suppress_and_log():
+                await page.close()
+
+    @retry_on_crash
+    async def _render(
+        self,
+        templates: dict[Any, Any],
+        wait: int,
+        type: Literal["jpeg", "png"],
+        quality: Union[int, None],
+        screenshot_timeout: Optional[float],
+    ) -> bytes:
+        # 每次渲染都租用浏览器, 使分片负载与回收前的排空能计入常驻页面的渲染
+        async with _lease_browser(self._browser) as browser:
+            page = await self._ensure_page(browser)
+            try:
+                with render_metrics.track_page(), _crash_guard(page, browser):
+                    await self._update(page, templates)
+                    if wait:
+                        await page.wait_for_timeout(wait)
+                    return await self._screenshot(
+                        page, type, quality, screenshot_timeout
+                    )
+            except BrowserCrashedError:
+                self._page = None
+                raise
+            except Exception:
+                # 页面状态未知, 下次渲染重新加载完整页面
+                self._reset()
+                raise
+
+    def _reset(self) -> None:
+        self._shell = None
+        self._loaded = False
+
+    async def _ensure_page(self, browser: "Browser") -> "Page":
+        if (
+            self._page is not None
+            and not self._page.is_closed()
+            and self._browser is browser
+        ):
+            return self._page
+
+        # 原浏览器已断开或被回收替换时, 在租用到的浏览器上重新创建页面
+        await self.close()
+        with render_metrics.timer("page"):
+            self._browser = browser
+            self._page = await browser.new_page(
+                device_scale_factor=self.device_scale_factor, **self.pages
+            )
+        with render_metrics.timer("navigate"):
+            await self._page.goto(self._base_url)
+        return self._page
+
+    async def _update(self, page: "Page", templates: dict[Any, Any]) -> None:
+        if self.update_function and self._loaded:
+            with render_metrics.timer("update"):
+                await page.evaluate(
+                    f"(data) => window[{json.dumps(self.update_function)}](data)",
+                    templates,
+                )
+            return
+
+        with render_metrics.timer("jinja"):
+            template = get_template_env(self.template_path, self.filters).get_template(
+                self.template_name
+            )
+            html = await render_template(template, **templates)
+
+        match = _BODY_RE.search(html)
+        shell = (html[: match.start(2)], html[match.end(2) :]) if match else None
+        if self._loaded and match and shell == self._shell:
+            with render_metrics.timer("update"):
+                await page.evaluate(UPDATE_BODY_JS, match.group(2))
+            return
+
+        with render_metrics.timer("set_content"):
+            await page.set_content(
+                _with_base_url(html, self._base_url), wait_until="load"
+            )
+            await page.evaluate("document.fonts.ready.then(() => true)")
+        self._shell = shell
+        self._loaded = True
+        self.full_renders += 1
+
+    async def _screenshot(
+        self,
+        page: "Page",
+        type: Literal["jpeg", "png"],
+        quality: Union[int, None],
+        screenshot_timeout: Optional[float],
+    ) -> bytes:
+        clip = None
+        if self.selector:
+            with render_metrics.timer("measure"):
+                clip = await page.evaluate(MEASURE_CLIP_JS, self.selector)
+            if clip is None:
+                raise ValueError(
+                    f"No visible element matches selector: {self.selector}"
+                )
+        with render_metrics.timer("screenshot"):
+            if clip is not None:
+                # clip 需要与 full_page 一起使用, 否则会被裁剪到视口内
+                return await page.screenshot(
+                    full_page=True,
+                    clip=clip,
+                    type=type,
+                    quality=quality,
+                    timeout=screenshot_timeout,
+                )
+            return await page.screenshot(
+                full_page=True, type=type, quality=quality, timeout=screenshot_timeout
+            )
@@ -0,0 +1,195 @@
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+import time
+from typing import Callable, TypeVar
+from typing_extensions import ParamSpec
+
+from nonebot.log import logger
+
+P = ParamSpec("P")
+R = TypeVar("R")
+MetricsCallback = Callable[[str, float, bool], None]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+@dataclass
+class Histogram:
+    """固定分桶的耗时直方图。"""
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    sum: float = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """记录一次耗时。"""
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def quantile(self, q: float) -> float:
+        """根据分桶估算分位数, 返回对应分桶的上界。"""
+        if not self.count:
+            return 0
+        target = q * self.count
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            if bucket_count >= target:
+                return bound
+        return float("inf")
+
+
+class RenderMetrics:
+    """渲染各阶段耗时与计数的统计。
+
+    阶段包括 `jinja`、`markdown`、`page`、`navigate`、`set_content`、`ready`、
+    `screenshot` 以及各接口的总耗时, 可以通过回调接入其他监控系统,
+    或使用`to_prometheus`导出 Prometheus 文本格式。
+    """
+
+    def __init__(self) -> None:
+        self.histograms: dict[str, Histogram] = {}
+        self.errors: dict[str, int] = {}
+        self.active_pages = 0
+        self.browser_restarts = 0
+        self.browser_recycles = 0
+        self.coalesced_renders = 0
+        self.blocked_requests = 0
+        self._callbacks: list[MetricsCallback] = []
+
+    def add_callback(self, callback: MetricsCallback) -> None:
+        """注册回调, 每个阶段结束时以 (阶段名, 耗时秒数, 是否成功) 调用。"""
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: MetricsCallback) -> None:
+        """移除已注册的回调。"""
+        self._callbacks.remove(callback)
+
+    def observe(self, phase: str, seconds: float, ok: bool = True) -> None:
+        """记录一个阶段的耗时。
+
+        Args:
+            phase (str): 阶段名。
+            seconds (float): 耗时(秒)。
+            ok (bool): 阶段是否成功完成。
+        """
+        self.histograms.setdefault(phase, Histogram()).observe(seconds)
+        if not ok:
+            self.errors[phase] = self.errors.get(phase, 0) + 1
+        for callback in self._callbacks:
+            try:
+                callback(phase, seconds, ok)
+            except Exception as e:
+                logger.opt(exception=e).warning("Metrics callback failed")
+
+    @contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        """统计代码块耗时的上下文管理器, 代码块抛出异常时计为错误。
+
+        Examples:
+            >>> with render_metrics.timer("screenshot"):
+            ...     pass
+        """
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.observe(phase, time.perf_counter() - start, ok)
+
+    def timed(
+        self, phase: str
+    ) -> Callable[[Callable[P, Awaitable[R]]], Callable[P, Awaitable[R]]]:
+        """统计异步函数总耗时的装饰器。
+
+        Args:
+            phase (str): 阶段名。
+        """
+
+        def decorator(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+            @wraps(func)
+            async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                with self.timer(phase):
+                    return await func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    @contextmanager
+    def track_page(self) -> Iterator[None]:
+        """统计当前打开页面数的上下文管理器。"""
+        self.active_pages += 1
+        try:
+            yield
+        finally:
+            self.active_pages -= 1
+
+    def reset(self) -> None:
+        """清空所有统计数据, 保留已注册的回调。"""
+        self.histograms.clear()
+        self.errors.clear()
+        self.browser_restarts = 0
+        self.browser_recycles = 0
+        self.coalesced_renders = 0
+        self.blocked_requests = 0
+
+    def to_prometheus(self, prefix: str = "htmlrender") -> str:
+        """导出为 Prometheus 文本格式。
+
+        Args:
+            prefix (str): 指标名前缀。
+
+        Returns:
+            str: Prometheus 文本格式的指标。
+        """
+        lines = [
+            f"# TYPE {prefix}_phase_seconds histogram",
+        ]
+        for phase, histogram in sorted(self.histograms.items()):
+            for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                lines.append(
+                    f'{prefix}_phase_seconds_bucket{{phase="{phase}",le="{bound}"}}'
+                    f" {bucket_count}"
+                )
+            lines.extend(
+                (
+                    f'{prefix}_phase_seconds_bucket{{phase="{phase}",le="+Inf"}}'
+                    f" {histogram.count}",
+                    f'{prefix}_phase_seconds_sum{{phase="{phase}"}} {histogram.sum}',
+                    f'{prefix}_phase_seconds_count{{phase="{phase}"}} '
+                    f"{histogram.count}",
+                )
+            )
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        lines.extend(
+            f'{prefix}_errors_total{{phase="{phase}"}} {count}'
+            for phase, count in sorted(self.errors.items())
+        )
+        lines.extend(
+            (
+                f"# TYPE {prefix}_active_pages gauge",
+                f"{prefix}_active_pages {self.active_pages}",
+                f"# TYPE {prefix}_browser_restarts_total counter",
+                f"{prefix}_browser_restarts_total {self.browser_restarts}",
+                f"# TYPE {prefix}_browser_recycles_total counter",
+                f"{prefix}_browser_recycles_total {self.browser_recycles}",
+                f"# TYPE {prefix}_coalesced_renders_total counter",
+                f"{prefix}_coalesced_renders_total {self.coalesced_renders}",
+                f"# TYPE {prefix}_blocked_requests_total counter",
+                f"{prefix}_blocked_requests_total {self.blocked_requests}",
+            )
+        )
+        return "\n".join(lines) + "\n"
+
+
+render_metrics = RenderMetrics()
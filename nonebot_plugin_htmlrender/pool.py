@@ -0,0 +1,229 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+from nonebot.log import logger
+
+from nonebot_plugin_htmlrender.utils import suppress_and_log
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page
+
+# 归还页面时导航到的空白文档, 与模板处于同一 file:// 源
+BLANK_PAGE_URL = (Path(__file__).parent / "templates" / "blank.html").as_uri()
+
+
+@dataclass
+class _PooledPage:
+    """池中的页面条目，每个页面独占一个浏览器上下文。"""
+
+    browser: "Browser"
+    context: "BrowserContext"
+    page: "Page"
+    uses: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    crashed: bool = False
+
+
+class PagePool:
+    """可复用页面池。
+
+    按 `device_scale_factor` 与上下文参数分组缓存预先创建的页面，
+    避免每次渲染都创建并销毁浏览器上下文。
+    """
+
+    def __init__(self, size: int, max_uses: int, max_idle: float) -> None:
+        """初始化页面池。
+
+        Args:
+            size (int): 池中最多保留的空闲页面数, 为 0 时禁用页面池。
+            max_uses (int): 单个页面最多被复用的次数, 超过后回收。
+            max_idle (float): 空闲页面最长保留时间(秒)。
+        """
+        self.size = size
+        self.max_uses = max_uses
+        self.max_idle = max_idle
+        self._idle: dict[str, deque[_PooledPage]] = {}
+        self._resets: set[asyncio.Task] = set()
+
+    @property
+    def idle_count(self) -> int:
+        """当前空闲页面数。"""
+        return sum(len(queue) for queue in self._idle.values())
+
+    @staticmethod
+    def make_key(device_scale_factor: float, **kwargs: Any) -> str:
+        """根据缩放因子与上下文参数生成分组键。"""
+        return json.dumps([device_scale_factor, kwargs], sort_keys=True, default=repr)
+
+    @asynccontextmanager
+    async def acquire(
+        self, browser: "Browser", device_scale_factor: float = 2, **kwargs: Any
+    ) -> AsyncIterator["Page"]:
+        """从池中取出一个页面, 使用完毕后重置并放回池中。
+
+        Args:
+            browser (Browser): 用于创建新页面的浏览器实例。
+            device_scale_factor (float): 设备缩放因子。
+            **kwargs: 传递给`browser.new_context`的关键字参数。
+
+        Yields:
+            Page: 页面对象。
+        """
+        if self.size <= 0:
+            page = await browser.new_page(
+                device_scale_factor=device_scale_factor, **kwargs
+            )
+            async with page:
+                yield page
+            return
+
+        # 不同浏览器分片的页面互不复用
+        key = f"{id(browser)}:{self.make_key(device_scale_factor, **kwargs)}"
+        await self._prune()
+        entry = await self._take(key, browser)
+        if entry is None:
+            entry = await self._create(browser, device_scale_factor, **kwargs)
+
+        entry.uses += 1
+        try:
+            yield entry.page
+        except BaseException:
+            await self._discard(entry)
+            raise
+        await self._release(key, entry)
+
+    async def warmup(
+        self, browser: "Browser", count: int, device_scale_factor: float = 2, **kwargs
+    ) -> None:
+        """预先创建页面放入池中。
+
+        Args:
+            browser (Browser): 浏览器实例。
+            count (int): 预热页面数, 不会超过池大小。
+            device_scale_factor (float): 设备缩放因子。
+            **kwargs: 传递给`browser.new_context`的关键字参数。
+        """
+        key = f"{id(browser)}:{self.make_key(device_scale_factor, **kwargs)}"
+        for _ in range(min(count, self.size) - self.idle_count):
+            entry = await self._create(browser, device_scale_factor, **kwargs)
+            self._idle.setdefault(key, deque()).append(entry)
+        logger.debug(f"Page pool warmed up with {self.idle_count} page(s)")
+
+    async def wait_resets(self) -> None:
+        """等待后台进行中的页面重置完成。"""
+        if self._resets:
+            await asyncio.gather(*self._resets, return_exceptions=True)
+
+    async def close(self) -> None:
+        """关闭池中所有空闲页面, 取消进行中的页面重置。"""
+        resets, self._resets = self._resets, set()
+        for task in resets:
+            task.cancel()
+        await asyncio.gather(*resets, return_exceptions=True)
+        idle, self._idle = self._idle, {}
+        for queue in idle.values():
+            for entry in queue:
+                await self._discard(entry)
+
+    async def evict(self, browser: "Browser") -> None:
+        """关闭池中属于指定浏览器的空闲页面。"""
+        await self.wait_resets()
+        for key, queue in list(self._idle.items()):
+            for entry in [entry for entry in queue if entry.browser is browser]:
+                queue.remove(entry)
+                await self._discard(entry)
+            if not queue:
+                del self._idle[key]
+
+    async def _create(
+        self, browser: "Browser", device_scale_factor: float, **kwargs: Any
+    ) -> _PooledPage:
+        context = await browser.new_context(
+            device_scale_factor=device_scale_factor, **kwargs
+        )
+        page = await context.new_page()
+        entry = _PooledPage(browser=browser, context=context, page=page)
+
+        def _on_crash(_: "Page") -> None:
+            entry.crashed = True
+            logger.warning("Pooled page crashed, it will be recycled.")
+
+        page.on("crash", _on_crash)
+        return entry
+
+    async def _take(self, key: str, browser: "Browser") -> Optional[_PooledPage]:
+        queue = self._idle.get(key)
+        while queue:
+            entry = queue.pop()
+            if self._is_reusable(entry, browser):
+                return entry
+            await self._discard(entry)
+        return None
+
+    async def _release(self, key: str, entry: _PooledPage) -> None:
+        if (
+            entry.uses >= self.max_uses
+            or not self._is_reusable(entry, entry.browser)
+            or self.idle_count + len(self._resets) >= self.size
+        ):
+            await self._discard(entry)
+            return
+
+        # 重置需要一次导航, 在后台进行, 不占用本次渲染的时间与并发名额;
+        # 重置完成后页面才会放回空闲队列
+        task = asyncio.ensure_future(self._reset_and_return(key, entry))
+        self._resets.add(task)
+        task.add_done_callback(self._resets.discard)
+
+    async def _reset_and_return(self, key: str, entry: _PooledPage) -> None:
+        try:
+            await self._reset(entry.page)
+        except asyncio.CancelledError:
+            await self._discard(entry)
+            raise
+        except Exception as e:
+            logger.debug(f"Failed to reset pooled page: {e}")
+            await self._discard(entry)
+            return
+
+        if not self._is_reusable(entry, entry.browser):
+            await self._discard(entry)
+            return
+        entry.last_used = time.monotonic()
+        self._idle.setdefault(key, deque()).append(entry)
+
+    async def _prune(self) -> None:
+        deadline = time.monotonic() - self.max_idle
+        for key, queue in list(self._idle.items()):
+            while queue and queue[0].last_used < deadline:
+                await self._discard(queue.popleft())
+            if not queue:
+                del self._idle[key]
+
+    @staticmethod
+    def _is_reusable(entry: _PooledPage, browser: "Browser") -> bool:
+        return (
+            entry.browser is browser
+            and browser.is_connected()
+            and not entry.crashed
+            and not entry.page.is_closed()
+        )
+
+    @staticmethod
+    async def _reset(page: "Page") -> None:
+        await page.unroute_all(behavior="ignoreErrors")
+        # set_content 会沿用同一个 window, 上次渲染的全局变量、定时器等会残留,
+        # 因此导航到新的空白文档; 该文档处于 file:// 源, 下次渲染可以跳过导航
+        await page.goto(BLANK_PAGE_URL)
+
+    @staticmethod
+    async def _discard(entry: _PooledPage) -> None:
+        with suppress_and_log():
+            await entry.context.close()
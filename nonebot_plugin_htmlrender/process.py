@@ -1,5 +1,6 @@
 import asyncio
 from collections.abc import Coroutine
+import contextlib
 from contextlib import nullcontext
 from functools import wraps
 import os
@@ -191,3 +192,83 @@ async def terminate_process(process: asyncio.subprocess.Process) -> None:
             else:
                 process.kill()
             await process.wait()
+
+
+def _read_parent_pids() -> dict[int, int]:
+    """读取 /proc 中所有进程的父进程号, 不支持 /proc 的平台返回空字典。"""
+    parents: dict[int, int] = {}
+    with contextlib.suppress(OSError):
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry.name}/stat", "rb") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # 进程名可能包含空格与括号, 从最后一个右括号之后开始解析
+            fields = stat[stat.rfind(b")") + 2 :].split()
+            parents[int(entry.name)] = int(fields[1])
+    return parents
+
+
+def get_descendant_pids(pid: int) -> set[int]:
+    """
+    获取进程的所有子孙进程号(仅支持提供 /proc 的平台)。
+
+    Args:
+        pid: 根进程号。
+
+    Returns:
+        Set[int]: 子孙进程号, 不包含根进程本身。
+    """
+    children: dict[int, list[int]] = {}
+    for child, parent in _read_parent_pids().items():
+        children.setdefault(parent, []).append(child)
+
+    descendants: set[int] = set()
+    stack = [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            if child not in descendants:
+                descendants.add(child)
+                stack.append(child)
+    return descendants
+
+
+def find_new_root_pid(before: set[int]) -> Optional[int]:
+    """
+    找出当前进程在`before`之后新创建的子进程树的根进程。
+
+    Args:
+        before: 之前的子孙进程号快照。
+
+    Returns:
+        Optional[int]: 唯一的新进程树根进程号, 无法确定时返回 None。
+    """
+    parents = _read_parent_pids()
+    new = get_descendant_pids(os.getpid()) - before
+    roots = [pid for pid in new if parents.get(pid) not in new]
+    return roots[0] if len(roots) == 1 else None
+
+
+def get_process_tree_rss(pid: int) -> Optional[int]:
+    """
+    统计进程及其所有子孙进程的常驻内存(仅支持提供 /proc 的平台)。
+
+    Args:
+        pid: 根进程号。
+
+    Returns:
+        Optional[int]: 常驻内存字节数, 根进程不存在时返回 None。
+    """
+    if not os.path.exists(f"/proc/{pid}/statm"):
+        return None
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    for child in (pid, *get_descendant_pids(pid)):
+        with contextlib.suppress(OSError):
+            with open(f"/proc/{child}/statm", "rb") as f:
+                total += int(f.read().split()[1]) * page_size
+    return total
@@ -0,0 +1,149 @@
+from functools import lru_cache
+from io import BytesIO
+from typing import TYPE_CHECKING, Literal, Optional, Union
+
+from nonebot.log import logger
+
+from nonebot_plugin_htmlrender.config import plugin_config
+
+if TYPE_CHECKING:
+    from PIL.ImageFont import FreeTypeFont
+
+# 与 templates/text.html 及 text.css 在 Chromium 中的默认排版保持一致(CSS 像素)
+BODY_MARGIN = 8
+BOX_PADDING = 5
+TEXT_MARGIN_TOP = 5
+FONT_SIZE = 16
+TAB_SIZE = 8
+
+# 未配置字体时依次尝试的系统字体, 仅包含支持中文的字体
+FONT_CANDIDATES = (
+    "NotoSansCJK-Regular.ttc",
+    "NotoSansSC-Regular.otf",
+    "SourceHanSansSC-Regular.otf",
+    "wqy-microhei.ttc",
+    "wqy-zenhei.ttc",
+    "msyh.ttc",
+    "PingFang.ttc",
+)
+
+
+def can_rasterize(text: str) -> bool:
+    """文本是否可以不经过浏览器直接绘制, 包含 html 标签或实体时需要浏览器渲染。"""
+    return "<" not in text and "&" not in text
+
+
+def _open_font(path: str, size: int) -> "FreeTypeFont":
+    from PIL import ImageFont
+
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=8)
+def get_font(size: int) -> Optional["FreeTypeFont"]:
+    """加载指定字号的字体, Pillow 未安装或找不到字体时返回 None。"""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        logger.warning("Pillow is not installed, text_to_pic will use the browser.")
+        return None
+
+    paths = (
+        [plugin_config.htmlrender_text_font]
+        if plugin_config.htmlrender_text_font
+        else FONT_CANDIDATES
+    )
+    for path in paths:
+        try:
+            return _open_font(path, size)
+        except OSError:
+            continue
+    logger.warning(
+        f"No usable font found in {paths}, text_to_pic will use the browser. "
+        "Set `htmlrender_text_font` to a font file path."
+    )
+    return None
+
+
+def wrap_text(text: str, font: "FreeTypeFont", max_width: float) -> list[str]:
+    """按`white-space: pre-wrap; word-break: break-all`的规则折行。
+
+    Args:
+        text (str): 纯文本。
+        font (FreeTypeFont): 字体。
+        max_width (float): 最大行宽(像素)。
+
+    Returns:
+        List[str]: 折行后的每一行。
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    # 块末尾的换行符不会产生新的空行
+    if text.endswith("\n"):
+        text = text[:-1]
+    if not text:
+        return []
+
+    widths: dict[str, float] = {}
+    lines: list[str] = []
+    for paragraph in text.split("\n"):
+        line: list[str] = []
+        line_width = 0.0
+        for char in paragraph.expandtabs(TAB_SIZE):
+            if (char_width := widths.get(char)) is None:
+                char_width = widths[char] = font.getlength(char)
+            # 行尾空白悬挂在行外, 不触发折行
+            if line and char != " " and line_width + char_width > max_width:
+                lines.append("".join(line))
+                line, line_width = [], 0.0
+            line.append(char)
+            line_width += char_width
+        lines.append("".join(line))
+    return lines
+
+
+def rasterize_text(
+    text: str,
+    width: int = 500,
+    type: Literal["jpeg", "png"] = "png",
+    quality: Union[int, None] = None,
+    device_scale_factor: float = 2,
+) -> Optional[bytes]:
+    """使用 Pillow 按默认文本模板的排版绘制纯文本图片。
+
+    Args:
+        text (str): 纯文本, 可多行
+        width (int, optional): 图片宽度，默认为 500
+        type (Literal["jpeg", "png"]): 图片类型, 默认 png
+        quality (int, optional): 图片质量 0-100 当为`png`时无效
+        device_scale_factor (float): 缩放比例
+
+    Returns:
+        Optional[bytes]: 图片, Pillow 或字体不可用时返回 None
+    """
+    if (font := get_font(round(FONT_SIZE * device_scale_factor))) is None:
+        return None
+
+    from PIL import Image, ImageDraw
+
+    scale = device_scale_factor
+    inset = (BODY_MARGIN + BOX_PADDING) * scale
+    ascent, descent = font.getmetrics()
+    line_height = ascent + descent
+    lines = wrap_text(text, font, width * scale - 2 * inset)
+
+    top = inset + TEXT_MARGIN_TOP * scale
+    image = Image.new(
+        "RGB",
+        (round(width * scale), round(top + line_height * len(lines) + inset)),
+        "white",
+    )
+    draw = ImageDraw.Draw(image)
+    for index, line in enumerate(lines):
+        draw.text((inset, top + index * line_height), line, fill="black", font=font)
+
+    output = BytesIO()
+    if type == "jpeg":
+        image.save(output, "JPEG", quality=quality or 80)
+    else:
+        image.save(output, "PNG", compress_level=1)
+    return output.getvalue()
@@ -1,7 +1,9 @@
+import asyncio
 from asyncio import Lock
 from collections.abc import Awaitable
 from contextlib import contextmanager
 from functools import wraps
+import json
 import os
 from pathlib import Path
 import platform
@@ -10,6 +12,7 @@ import shutil
 from typing import (
     Any,
     Callable,
+    Generic,
     Optional,
     TypeVar,
     Union,
@@ -165,6 +168,54 @@ def with_lock(func: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
     return wrapper
 
 
+class SingleFlight(Generic[R]):
+    """合并相同键的并发调用, 同一时刻每个键只执行一次, 所有调用方共享结果。
+
+    执行在独立的任务中进行, 某个调用方被取消不会影响其他调用方。
+
+    Examples:
+        >>> flight = SingleFlight()
+        >>> await flight.do("key", lambda: render())
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Future[R]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[R]],
+        on_shared: Optional[Callable[[], None]] = None,
+    ) -> R:
+        """执行或等待相同键正在进行的调用。
+
+        Args:
+            key (str): 调用的键。
+            func (Callable[[], Awaitable[R]]): 没有进行中的调用时执行的函数。
+            on_shared (Optional[Callable[[], None]]): 复用进行中的调用时的回调。
+
+        Returns:
+            R: 调用结果。
+        """
+        if (future := self._calls.get(key)) is None:
+            future = asyncio.ensure_future(func())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        elif on_shared is not None:
+            on_shared()
+        return await asyncio.shield(future)
+
+    def _finish(self, key: str, future: "asyncio.Future[R]") -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        # 所有调用方都已取消时避免 "exception was never retrieved" 警告
+        if not future.cancelled():
+            future.exception()
+
+
 def _prepare_playwright_env_vars() -> None:
     """
     准备启动浏览器所需的环境变量。
@@ -220,3 +271,83 @@ def clean_playwright_cache() -> None:
             logger.info("Playwright was cleaned successfully.")
         except Exception as e:
             logger.error(f"Failed to delete Playwright: {e}")
+
+
+VERIFIED_ENV_FILE = "verified_env.json"
+
+
+def _verified_env_path() -> Path:
+    return Path(plugin_config.htmlrender_storage_path).expanduser() / VERIFIED_ENV_FILE
+
+
+def _env_fingerprint(executable_path: str) -> dict[str, Any]:
+    from importlib.metadata import PackageNotFoundError
+    from importlib.metadata import version as package_version
+
+    try:
+        playwright_version = package_version("playwright")
+    except PackageNotFoundError:
+        playwright_version = None
+    return {
+        "playwright": playwright_version,
+        "browser": plugin_config.htmlrender_browser,
+        "channel": plugin_config.htmlrender_browser_channel,
+        "executable_path": executable_path,
+    }
+
+
+def is_env_verified(executable_path: str) -> bool:
+    """
+    检查浏览器环境是否已经验证过, 可以跳过环境检查与安装直接启动。
+
+    标记记录了 Playwright 版本、浏览器类型、通道与可执行文件路径,
+    任意一项变化或可执行文件不存在时标记失效。
+
+    Args:
+        executable_path (str): Playwright 解析出的浏览器可执行文件路径。
+
+    Returns:
+        bool: 标记有效时返回 True。
+    """
+    try:
+        marker = json.loads(_verified_env_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+
+    if not isinstance(marker, dict):
+        return False
+    fingerprint = _env_fingerprint(executable_path)
+    if any(marker.get(key) != value for key, value in fingerprint.items()):
+        return False
+    # 使用通道时浏览器由系统管理, 不检查 Playwright 自带浏览器的可执行文件
+    return bool(plugin_config.htmlrender_browser_channel) or os.path.isfile(
+        executable_path
+    )
+
+
+def mark_env_verified(executable_path: str, browser_version: str) -> None:
+    """
+    记录浏览器环境已验证, 下次启动时跳过环境检查与安装。
+
+    Args:
+        executable_path (str): Playwright 解析出的浏览器可执行文件路径。
+        browser_version (str): 启动成功的浏览器版本。
+    """
+    path = _verified_env_path()
+    marker = {
+        **_env_fingerprint(executable_path),
+        "browser_version": browser_version,
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(marker, indent=2), encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Failed to write verified environment marker: {e}")
+        return
+    logger.debug(f"Browser environment verified, marker written to {path}")
+
+
+def clear_env_verified() -> None:
+    """删除浏览器环境已验证的标记。"""
+    with suppress_and_log():
+        _verified_env_path().unlink(missing_ok=True)
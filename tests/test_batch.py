@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.mark.asyncio
+async def test_html_to_pics_order_and_errors(mocker: MockerFixture) -> None:
+    """测试批量渲染保持输入顺序并单独返回失败任务的异常"""
+    from nonebot_plugin_htmlrender import html_to_pics
+
+    async def _html_to_pic(html: str, **kwargs) -> bytes:
+        if html == "bad":
+            raise RuntimeError("render failed")
+        await asyncio.sleep(0.01 if html == "a" else 0)
+        return html.encode()
+
+    mock_render = mocker.patch(
+        "nonebot_plugin_htmlrender.batch.html_to_pic", side_effect=_html_to_pic
+    )
+
+    results = await html_to_pics(
+        ["a", "bad", {"html": "c", "type": "jpeg"}], concurrency=2, type="png"
+    )
+
+    assert results[0] == b"a"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == b"c"
+    mock_render.assert_any_call(html="c", type="jpeg")
+    mock_render.assert_any_call(html="a", type="png")
+
+
+@pytest.mark.asyncio
+async def test_html_to_pics_concurrency(mocker: MockerFixture) -> None:
+    """测试批量渲染同时进行的任务数不超过并发数"""
+    from nonebot_plugin_htmlrender import html_to_pics
+
+    running = 0
+    peak = 0
+
+    async def _html_to_pic(html: str, **kwargs) -> bytes:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return html.encode()
+
+    mocker.patch(
+        "nonebot_plugin_htmlrender.batch.html_to_pic", side_effect=_html_to_pic
+    )
+
+    results = await html_to_pics([str(i) for i in range(10)], concurrency=3)
+
+    assert results == [str(i).encode() for i in range(10)]
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_html_to_pics_invalid_concurrency() -> None:
+    """测试并发数小于 1 时报错"""
+    from nonebot_plugin_htmlrender import html_to_pics
+
+    with pytest.raises(ValueError, match="concurrency"):
+        await html_to_pics(["a"], concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_md_to_pics(mocker: MockerFixture) -> None:
+    """测试批量 markdown 转图片"""
+    from nonebot_plugin_htmlrender import md_to_pics
+
+    mock_render = mocker.patch(
+        "nonebot_plugin_htmlrender.batch.md_to_pic", return_value=b"image"
+    )
+
+    results = await md_to_pics(["# a", "# b"], width=300)
+
+    assert results == [b"image", b"image"]
+    mock_render.assert_any_call(md="# a", width=300)
+    mock_render.assert_any_call(md="# b", width=300)
+
+
+@pytest.mark.asyncio
+async def test_template_to_pics(mocker: MockerFixture) -> None:
+    """测试批量模板转图片"""
+    from nonebot_plugin_htmlrender import template_to_pics
+
+    mock_render = mocker.patch(
+        "nonebot_plugin_htmlrender.batch.template_to_pic", return_value=b"image"
+    )
+
+    results = await template_to_pics(
+        "/templates", "card.html", [{"name": "a"}, {"name": "b"}], wait=10
+    )
+
+    assert results == [b"image", b"image"]
+    mock_render.assert_any_call(
+        template_path="/templates",
+        template_name="card.html",
+        templates={"name": "b"},
+        wait=10,
+    )
@@ -0,0 +1,68 @@
+import pytest
+
+
+def test_percentile() -> None:
+    """测试最近秩法分位数"""
+    from benchmarks.bench import percentile
+
+    samples = [float(i) for i in range(1, 101)]
+    assert percentile(samples, 0.5) == 50
+    assert percentile(samples, 0.95) == 95
+    assert percentile(samples, 0.99) == 99
+    assert percentile([3.0], 0.99) == 3
+    assert percentile([], 0.5) == 0
+
+
+def test_compare_flags_regressions() -> None:
+    """测试 p95 变慢或吞吐降低超过阈值时判定为回退"""
+    from benchmarks.bench import BenchResult, compare
+
+    def _result(name: str, p95: float, ips: float) -> BenchResult:
+        return BenchResult(name, 4, 10, 0, p95, p95, p95, ips, None)
+
+    baseline = [_result("text", 0.1, 10), _result("md_math", 0.2, 5)]
+    results = [
+        _result("text", 0.11, 9.5),
+        _result("md_math", 0.3, 3),
+        _result("template", 1, 1),
+    ]
+
+    regressions = compare(results, baseline, threshold=0.2)
+
+    assert len(regressions) == 2
+    assert all(line.startswith("md_math@4") for line in regressions)
+
+
+def test_results_roundtrip(tmp_path) -> None:
+    """测试基线 JSON 的保存与读取"""
+    from benchmarks.bench import BenchResult, load_results, save_results
+
+    results = [BenchResult("text", 1, 5, 0, 0.1, 0.2, 0.3, 8.5, 1024)]
+    save_results(tmp_path / "baseline.json", results)
+
+    assert load_results(tmp_path / "baseline.json") == results
+
+
+@pytest.mark.asyncio
+async def test_run_scenario() -> None:
+    """测试按并发数运行场景并统计错误"""
+    import asyncio
+
+    from benchmarks.bench import run_scenario
+
+    calls = 0
+
+    async def _render() -> bytes:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        if calls == 3:
+            raise RuntimeError("render failed")
+        return b"image"
+
+    result = await run_scenario("fake", _render, concurrency=2, iterations=6)
+
+    assert calls == 6
+    assert result.errors == 1
+    assert result.images_per_sec > 0
+    assert 0 < result.p50 <= result.p99
@@ -0,0 +1,135 @@
+from typing import Any
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+def _route(
+    mocker: MockerFixture,
+    url: str,
+    resource_type: str = "image",
+    navigation: bool = False,
+    body: bytes = b"",
+    headers: Any = None,
+) -> Any:
+    request = mocker.MagicMock(url=url, resource_type=resource_type)
+    request.is_navigation_request.return_value = navigation
+    request.frame.parent_frame = None
+
+    response = mocker.MagicMock(headers=headers or {})
+    response.body = mocker.AsyncMock(return_value=body)
+
+    route = mocker.AsyncMock(request=request)
+    route.fetch.return_value = response
+    return route
+
+
+def test_block_policy_rejects_unknown_resource_type() -> None:
+    """测试未知的资源类型会被拒绝"""
+    from nonebot_plugin_htmlrender.blocking import BlockPolicy
+
+    with pytest.raises(ValueError, match="Invalid resource types"):
+        BlockPolicy(resource_types=("video",))
+
+
+def test_block_policy_from_config(mocker: MockerFixture) -> None:
+    """测试从逗号分隔的配置项创建全局策略"""
+    from nonebot_plugin_htmlrender import blocking
+
+    mocker.patch.multiple(
+        blocking.plugin_config,
+        htmlrender_block_resource_types="media, font,",
+        htmlrender_block_urls="*.mp4,*://ads.example.com/*",
+        htmlrender_max_response_size=1024,
+    )
+
+    policy = blocking.resolve_block_policy(None)
+    assert policy == blocking.BlockPolicy(
+        resource_types=("media", "font"),
+        url_patterns=("*.mp4", "*://ads.example.com/*"),
+        max_response_size=1024,
+    )
+    assert policy.enabled
+
+    override = blocking.BlockPolicy()
+    assert blocking.resolve_block_policy(override) is override
+    assert not override.enabled
+
+
+@pytest.mark.asyncio
+async def test_block_policy_blocks_requests(mocker: MockerFixture) -> None:
+    """测试按资源类型与 URL 拦截请求, 主框架导航不受影响"""
+    from nonebot_plugin_htmlrender.blocking import BlockPolicy
+    from nonebot_plugin_htmlrender.metrics import render_metrics
+
+    render_metrics.reset()
+    policy = BlockPolicy(
+        resource_types=("font", "document"),
+        url_patterns=("*://tracker.example.com/*",),
+    )
+
+    font = _route(mocker, "https://example.com/a.woff2", resource_type="font")
+    tracker = _route(mocker, "https://tracker.example.com/t.js", "script")
+    image = _route(mocker, "https://example.com/a.png")
+    navigation = _route(mocker, "https://example.com/", "document", navigation=True)
+
+    for route in (font, tracker, image, navigation):
+        await policy._handle(route)
+
+    font.abort.assert_awaited_once_with("blockedbyclient")
+    tracker.abort.assert_awaited_once_with("blockedbyclient")
+    image.fallback.assert_awaited_once()
+    navigation.fallback.assert_awaited_once()
+    assert render_metrics.blocked_requests == 2
+
+
+@pytest.mark.asyncio
+async def test_block_policy_max_response_size(mocker: MockerFixture) -> None:
+    """测试超过大小上限的响应会被丢弃"""
+    from nonebot_plugin_htmlrender.blocking import BlockPolicy
+
+    policy = BlockPolicy(max_response_size=4)
+
+    small = _route(mocker, "https://example.com/small", body=b"1234")
+    large = _route(mocker, "https://example.com/large", body=b"12345")
+    declared = _route(
+        mocker, "https://example.com/declared", headers={"content-length": "100"}
+    )
+    local = _route(mocker, "file:///tmp/a.png")
+
+    for route in (small, large, declared, local):
+        await policy._handle(route)
+
+    small.fulfill.assert_awaited_once_with(response=small.fetch.return_value)
+    large.abort.assert_awaited_once_with("blockedbyclient")
+    declared.abort.assert_awaited_once_with("blockedbyclient")
+    local.fetch.assert_not_awaited()
+    local.fallback.assert_awaited_once()
+
+    failed = _route(mocker, "https://example.com/down")
+    failed.fetch.side_effect = Exception("net::ERR_CONNECTION_REFUSED")
+    await policy._handle(failed)
+    failed.abort.assert_awaited_once_with("failed")
+    failed.fulfill.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_block_policy_apply(mocker: MockerFixture) -> None:
+    """测试只有策略非空时才注册路由"""
+    from nonebot_plugin_htmlrender.blocking import BlockPolicy
+
+    page = mocker.AsyncMock()
+    await BlockPolicy().apply(page)
+    page.route.assert_not_awaited()
+
+    policy = BlockPolicy(resource_types=("media",))
+    await policy.apply(page)
+    page.route.assert_awaited_once_with("**/*", policy._handle)
+
+    # 已注册缓存路由时由其检查大小, 拦截路由只过滤请求
+    page.route.reset_mock()
+    await BlockPolicy(max_response_size=4).apply(page, check_size=False)
+    page.route.assert_not_awaited()
+
+    await policy.apply(page, check_size=False)
+    page.route.assert_awaited_once_with("**/*", policy._filter)
@@ -78,6 +78,37 @@ async def test_launch(mocker: MockerFixture, browser_config: dict[str, str]) ->
     mock_browser_type.launch.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_launch_serialized(mocker: MockerFixture) -> None:
+    """测试并发启动依次进行, 无法确定进程号时记录警告"""
+    import asyncio
+
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    running = 0
+    overlapped = False
+
+    async def _launch(**kwargs) -> Browser:
+        nonlocal running, overlapped
+        running += 1
+        overlapped = overlapped or running > 1
+        await asyncio.sleep(0.01)
+        running -= 1
+        return mocker.MagicMock(spec=Browser)
+
+    mock_playwright = mocker.MagicMock()
+    mock_playwright.chromium.launch = mocker.AsyncMock(side_effect=_launch)
+    mocker.patch.object(browser_module, "_playwright", mock_playwright)
+    mocker.patch.object(browser_module, "find_new_root_pid", return_value=None)
+    mocker.patch.object(browser_module.plugin_config, "htmlrender_recycle_rss", 1)
+    mock_logger = mocker.patch.object(browser_module, "logger")
+
+    await asyncio.gather(*(browser_module._launch("chromium") for _ in range(3)))
+
+    assert not overlapped
+    assert mock_logger.warning.call_count == 3
+
+
 @pytest.mark.asyncio
 async def test_init_browser_success(
     mocker: MockerFixture, mock_browser: Browser
@@ -135,6 +166,319 @@ async def test_get_browser_connected(
     assert browser == mock_browser
 
 
+@pytest.mark.asyncio
+async def test_get_browser_connected_skips_lock(
+    mocker: MockerFixture, mock_browser: Browser, mock_browser_context: None
+) -> None:
+    """测试浏览器已连接时不会等待重启锁"""
+    from nonebot_plugin_htmlrender.browser import _relaunch_lock, get_browser
+
+    mock_startup = mocker.patch("nonebot_plugin_htmlrender.browser.startup_htmlrender")
+
+    async with _relaunch_lock:
+        browser = await get_browser()
+
+    assert browser == mock_browser
+    mock_startup.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_browser_relaunch_single_flight(
+    mocker: MockerFixture, mock_browser: Browser
+) -> None:
+    """测试浏览器断开时并发调用只会重启一次"""
+    import asyncio
+
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    mocker.patch.object(browser_module, "_browser", None)
+
+    async def _startup(**kwargs) -> Browser:
+        await asyncio.sleep(0.01)
+        browser_module._browser = mock_browser
+        return mock_browser
+
+    mock_startup = mocker.patch.object(
+        browser_module, "startup_htmlrender", side_effect=_startup
+    )
+
+    browsers = await asyncio.gather(*(browser_module.get_browser() for _ in range(5)))
+
+    assert all(browser == mock_browser for browser in browsers)
+    mock_startup.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_lease_browser_least_loaded(
+    mocker: MockerFixture, mock_browser: Browser, mock_browser_context: None
+) -> None:
+    """测试多个浏览器分片时分派到打开页面最少的分片"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    shard = mocker.MagicMock(spec=Browser)
+    shard.is_connected.return_value = True
+    mocker.patch.object(browser_module.plugin_config, "htmlrender_browser_count", 2)
+    mocker.patch.dict(browser_module._shards, {1: shard})
+
+    async with browser_module._lease_browser() as first:
+        async with browser_module._lease_browser() as second:
+            assert {first, second} == {mock_browser, shard}
+        async with browser_module._lease_browser() as third:
+            assert third == second
+
+    assert not any(browser_module._shard_load.values())
+
+
+@pytest.mark.asyncio
+async def test_lease_browser_prefer(
+    mocker: MockerFixture, mock_browser: Browser, mock_browser_context: None
+) -> None:
+    """测试优先使用仍在分片中的指定浏览器, 已被替换时按负载选择"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    shard = mocker.MagicMock(spec=Browser)
+    shard.is_connected.return_value = True
+    mocker.patch.object(browser_module.plugin_config, "htmlrender_browser_count", 2)
+    mocker.patch.dict(browser_module._shards, {1: shard})
+
+    async with browser_module._lease_browser() as first:
+        async with browser_module._lease_browser(prefer=first) as second:
+            assert second is first
+
+    replaced = mocker.MagicMock(spec=Browser)
+    async with browser_module._lease_browser(prefer=replaced) as leased:
+        assert leased in (mock_browser, shard)
+
+
+@pytest.mark.asyncio
+async def test_get_shard_relaunch_only_crashed(
+    mocker: MockerFixture, mock_browser: Browser, mock_browser_context: None
+) -> None:
+    """测试分片断开时只重启该分片"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    crashed = mocker.MagicMock(spec=Browser)
+    crashed.is_connected.return_value = False
+    fresh = mocker.MagicMock(spec=Browser)
+    mocker.patch.object(browser_module, "_playwright", mocker.MagicMock())
+    mocker.patch.dict(browser_module._shards, {1: crashed})
+    mock_launch = mocker.patch.object(browser_module, "_launch", return_value=fresh)
+    mock_startup = mocker.patch.object(browser_module, "startup_htmlrender")
+
+    assert await browser_module._get_shard(1) == fresh
+    assert await browser_module._get_shard(0) == mock_browser
+    mock_launch.assert_called_once()
+    mock_startup.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_shard_cold_start(mocker: MockerFixture) -> None:
+    """测试冷启动时复用启动流程已启动的分片, 不重复启动"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    shard = mocker.MagicMock(spec=Browser)
+    shard.is_connected.return_value = True
+
+    async def _get_browser() -> Browser:
+        browser_module._shards[1] = shard
+        return mocker.MagicMock(spec=Browser)
+
+    mocker.patch.object(browser_module, "_playwright", None)
+    mocker.patch.dict(browser_module._shards, {})
+    mocker.patch.object(browser_module, "get_browser", side_effect=_get_browser)
+    mock_start = mocker.patch.object(browser_module, "_start_shard")
+
+    assert await browser_module._get_shard(1) is shard
+    mock_start.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_start_browser_with_shards(
+    mocker: MockerFixture, mock_browser: Browser
+) -> None:
+    """测试启动时按配置的数量启动额外的浏览器分片"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    mocker.patch.object(
+        browser_module, "check_playwright_env", return_value=mock_browser
+    )
+    mocker.patch.object(browser_module.plugin_config, "htmlrender_browser_count", 3)
+    mocker.patch.dict(browser_module._shards, {})
+    mock_launch = mocker.patch.object(
+        browser_module, "_launch", return_value=mock_browser
+    )
+
+    await browser_module.startup_htmlrender()
+
+    assert mock_launch.call_count == 2
+    assert set(browser_module._shards) == {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_connect_multiple_endpoints(
+    mocker: MockerFixture, mock_browser: Browser
+) -> None:
+    """测试逗号分隔的多个端点各连接一个分片"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    mocker.patch.object(browser_module.plugin_config, "htmlrender_browser", "firefox")
+    mocker.patch.object(
+        browser_module.plugin_config,
+        "htmlrender_connect",
+        "ws://a:3000, ws://b:3000",
+    )
+    mocker.patch.dict(browser_module._shards, {})
+    mock_connect = mocker.patch.object(
+        browser_module, "_connect", return_value=mock_browser
+    )
+
+    await browser_module.startup_htmlrender()
+
+    assert mock_connect.call_args_list == [
+        mocker.call("firefox"),
+        mocker.call("firefox", endpoint="ws://b:3000"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_crash_guard_fails_fast(mocker: MockerFixture) -> None:
+    """测试页面崩溃时关闭页面并抛出 BrowserCrashedError"""
+    import asyncio
+
+    from nonebot_plugin_htmlrender.browser import BrowserCrashedError, _crash_guard
+
+    page = mocker.MagicMock(spec=Page)
+    page.close = mocker.AsyncMock()
+    browser = mocker.MagicMock(spec=Browser)
+    browser.is_connected.return_value = True
+
+    async def _render() -> None:
+        with _crash_guard(page, browser):
+            page.on.call_args.args[1](page)
+            await asyncio.sleep(0)
+            raise RuntimeError("Target page, context or browser has been closed")
+
+    with pytest.raises(BrowserCrashedError):
+        await _render()
+
+    on_crash = page.on.call_args.args[1]
+    page.close.assert_awaited_once()
+    page.remove_listener.assert_called_once_with("crash", on_crash)
+
+
+def test_crash_guard_passes_other_errors(mocker: MockerFixture) -> None:
+    """测试与崩溃无关的异常原样抛出"""
+    from nonebot_plugin_htmlrender.browser import _crash_guard
+
+    browser = mocker.MagicMock(spec=Browser)
+    browser.is_connected.return_value = True
+
+    with pytest.raises(ValueError, match="boom"):
+        with _crash_guard(mocker.MagicMock(spec=Page), browser):
+            raise ValueError("boom")
+
+
+@pytest.mark.asyncio
+async def test_disconnected_relaunches_in_background(
+    mocker: MockerFixture, mock_browser: Browser
+) -> None:
+    """测试浏览器断开后在后台重启, 失败时退避重试"""
+    import asyncio
+
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    mocker.patch.object(browser_module, "_browser", mock_browser)
+    mocker.patch("asyncio.sleep", mocker.AsyncMock())
+    mock_get_shard = mocker.patch.object(
+        browser_module,
+        "_get_shard",
+        side_effect=[RuntimeError("launch failed"), mock_browser],
+    )
+
+    browser_module._on_disconnected(mock_browser)
+    await asyncio.gather(*browser_module._background_tasks)
+
+    assert mock_get_shard.call_args_list == [mocker.call(0), mocker.call(0)]
+
+
+def test_disconnected_ignored_on_shutdown(
+    mocker: MockerFixture, mock_browser: Browser
+) -> None:
+    """测试主动关闭浏览器时不会触发重启"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    mocker.patch.object(browser_module, "_browser", mock_browser)
+    mocker.patch.object(browser_module, "_closing", True)
+    mock_spawn = mocker.patch.object(browser_module, "_spawn")
+
+    browser_module._on_disconnected(mock_browser)
+    browser_module._on_disconnected(mocker.MagicMock(spec=Browser))
+
+    mock_spawn.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_recycle_browser_zero_downtime(
+    mocker: MockerFixture, mock_browser: Browser, mock_browser_context: None
+) -> None:
+    """测试回收时新的渲染使用替代浏览器, 旧浏览器在渲染完成后关闭"""
+    import asyncio
+
+    from nonebot_plugin_htmlrender import browser as browser_module
+    from nonebot_plugin_htmlrender.metrics import render_metrics
+
+    new_browser = mocker.MagicMock(spec=Browser)
+    new_browser.is_connected.return_value = True
+    mock_browser.close = mocker.AsyncMock()
+    browser_module._browser_stats[mock_browser] = browser_module._BrowserStats()
+    mocker.patch.object(browser_module.plugin_config, "htmlrender_recycle_renders", 1)
+    mock_launch = mocker.patch.object(
+        browser_module, "_launch", return_value=new_browser
+    )
+    render_metrics.reset()
+
+    async with browser_module._lease_browser() as in_flight:
+        async with browser_module._lease_browser() as first:
+            assert first == mock_browser
+        await asyncio.sleep(0)
+
+        async with browser_module._lease_browser() as second:
+            assert second == new_browser
+        assert in_flight == mock_browser
+        mock_browser.close.assert_not_called()
+
+    await asyncio.gather(*browser_module._background_tasks)
+
+    mock_launch.assert_called_once()
+    mock_browser.close.assert_awaited_once()
+    assert render_metrics.browser_recycles == 1
+
+
+@pytest.mark.asyncio
+async def test_recycle_browser_on_rss(
+    mocker: MockerFixture, mock_browser: Browser, mock_browser_context: None
+) -> None:
+    """测试进程树常驻内存超过阈值时回收浏览器"""
+    import asyncio
+    import os
+
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    browser_module._browser_stats[mock_browser] = browser_module._BrowserStats(
+        pid=os.getpid()
+    )
+    mocker.patch.object(browser_module.plugin_config, "htmlrender_recycle_rss", 1)
+    mocker.patch.object(browser_module, "get_process_tree_rss", return_value=2)
+    mock_recycle = mocker.patch.object(browser_module, "_recycle_browser")
+
+    for _ in range(2):
+        async with browser_module._lease_browser():
+            pass
+    await asyncio.gather(*browser_module._background_tasks)
+
+    mock_recycle.assert_called_once_with(0, mock_browser, "RSS reached 2 bytes")
+
+
 @pytest.mark.asyncio
 async def test_shutdown_browser(
     mock_browser: Browser,
@@ -248,7 +592,10 @@ async def test_start_browser_with_cdp(
         "nonebot_plugin_htmlrender.browser._connect_via_cdp",
         return_value=mocker.MagicMock(spec=Browser),
     )
-    mocker.patch("playwright.async_api.async_playwright")
+    mocker.patch(
+        "playwright.async_api.async_playwright",
+        return_value=mocker.MagicMock(start=mocker.AsyncMock()),
+    )
     mocker.patch(
         "nonebot_plugin_htmlrender.browser.plugin_config.htmlrender_browser",
         browser_config["browser"],
@@ -271,7 +618,10 @@ async def test_start_browser_with_config(mocker: MockerFixture) -> None:
         "nonebot_plugin_htmlrender.browser._launch",
         return_value=mocker.MagicMock(spec=Browser),
     )
-    mocker.patch("playwright.async_api.async_playwright")
+    mocker.patch(
+        "playwright.async_api.async_playwright",
+        return_value=mocker.MagicMock(start=mocker.AsyncMock()),
+    )
     mocker.patch(
         "nonebot_plugin_htmlrender.browser.plugin_config.htmlrender_browser_channel",
         "chrome-canary",
@@ -329,3 +679,119 @@ def test_clean_playwright_cache_with_error(mocker: MockerFixture) -> None:
     clean_playwright_cache()
 
     mock_logger_error.assert_called_once()
+
+
+@pytest.fixture
+def verified_env(mocker: MockerFixture, tmp_path: Path) -> Path:
+    """使用临时存储路径与伪造的浏览器可执行文件"""
+    from nonebot_plugin_htmlrender import utils
+
+    mocker.patch.object(utils.plugin_config, "htmlrender_storage_path", tmp_path)
+    executable = tmp_path / "chromium-1000" / "chrome"
+    executable.parent.mkdir()
+    executable.write_bytes(b"")
+    return executable
+
+
+def test_verified_env_marker(mocker: MockerFixture, verified_env: Path) -> None:
+    """测试环境验证标记在浏览器或可执行文件变化时失效"""
+    from nonebot_plugin_htmlrender import utils
+
+    assert not utils.is_env_verified(str(verified_env))
+
+    utils.mark_env_verified(str(verified_env), "130.0.0.0")
+    assert utils.is_env_verified(str(verified_env))
+    assert not utils.is_env_verified(str(verified_env.parent / "other"))
+
+    mocker.patch.object(utils.plugin_config, "htmlrender_browser", "firefox")
+    assert not utils.is_env_verified(str(verified_env))
+    mocker.patch.object(utils.plugin_config, "htmlrender_browser", "chromium")
+
+    verified_env.unlink()
+    assert not utils.is_env_verified(str(verified_env))
+
+    utils.clear_env_verified()
+    assert not (verified_env.parent.parent / utils.VERIFIED_ENV_FILE).exists()
+
+
+@pytest.fixture
+def local_startup(
+    mocker: MockerFixture, mock_browser: Browser, verified_env: Path
+) -> dict[str, AsyncMock]:
+    """在非 CI 模式下启动本地浏览器, 模拟环境检查与安装"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    mock_browser.version = "130.0.0.0"
+    playwright = mocker.MagicMock()
+    playwright.chromium.executable_path = str(verified_env)
+    mocker.patch(
+        "playwright.async_api.async_playwright",
+        return_value=mocker.MagicMock(start=mocker.AsyncMock(return_value=playwright)),
+    )
+    mocker.patch.object(browser_module.plugin_config, "htmlrender_ci_mode", False)
+    mocker.patch.object(browser_module, "_prepare_playwright_env_vars")
+    return {
+        "launch": mocker.patch.object(
+            browser_module, "_launch", return_value=mock_browser
+        ),
+        "check": mocker.patch.object(
+            browser_module, "_check_env_with_install_retry", return_value=mock_browser
+        ),
+        "clean": mocker.patch.object(browser_module, "clean_playwright_cache"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_startup_verifies_env_once(
+    local_startup: dict[str, AsyncMock], verified_env: Path
+) -> None:
+    """测试首次启动检查环境并写入标记, 之后的启动直接启动浏览器"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+    from nonebot_plugin_htmlrender.utils import is_env_verified
+
+    await browser_module.startup_htmlrender()
+    local_startup["check"].assert_called_once()
+    local_startup["clean"].assert_called_once()
+    local_startup["launch"].assert_not_called()
+    assert is_env_verified(str(verified_env))
+
+    await browser_module.startup_htmlrender()
+    local_startup["check"].assert_called_once()
+    local_startup["clean"].assert_called_once()
+    local_startup["launch"].assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_startup_rechecks_stale_marker(
+    local_startup: dict[str, AsyncMock], verified_env: Path
+) -> None:
+    """测试已验证的浏览器启动失败时删除标记并重新检查环境"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+    from nonebot_plugin_htmlrender.utils import is_env_verified, mark_env_verified
+
+    mark_env_verified(str(verified_env), "129.0.0.0")
+    local_startup["launch"].side_effect = RuntimeError("missing dependency")
+
+    await browser_module.startup_htmlrender()
+
+    local_startup["launch"].assert_called_once()
+    local_startup["check"].assert_called_once()
+    assert is_env_verified(str(verified_env))
+
+
+def test_get_browser_pids(mocker: MockerFixture) -> None:
+    """测试只返回已知进程号的本地浏览器"""
+    from nonebot_plugin_htmlrender import browser as browser_module
+
+    known = mocker.MagicMock(spec=Browser)
+    unknown = mocker.MagicMock(spec=Browser)
+    mocker.patch.object(
+        browser_module,
+        "_browser_stats",
+        {
+            known: browser_module._BrowserStats(pid=42),
+            unknown: browser_module._BrowserStats(),
+        },
+    )
+
+    assert browser_module.get_browser_pids() == [42]
@@ -0,0 +1,181 @@
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.mark.asyncio
+async def test_render_cache_hit_and_miss() -> None:
+    """测试内存缓存命中与未命中统计"""
+    from nonebot_plugin_htmlrender.cache import RenderCache
+
+    cache = RenderCache(enabled=True, ttl=60, max_memory_bytes=1024)
+    key = cache.make_key(html="<p>1</p>", type="png")
+
+    assert await cache.get(key) is None
+    await cache.set(key, b"image")
+    assert await cache.get(key) == b"image"
+
+    stats = cache.stats
+    assert stats.hits == 1
+    assert stats.memory_hits == 1
+    assert stats.misses == 1
+    assert stats.memory_items == 1
+    assert stats.memory_bytes == len(b"image")
+
+
+def test_render_cache_key_depends_on_options() -> None:
+    """测试缓存键包含截图参数"""
+    from nonebot_plugin_htmlrender.cache import RenderCache
+
+    assert RenderCache.make_key(html="a", type="png") == RenderCache.make_key(
+        type="png", html="a"
+    )
+    assert RenderCache.make_key(html="a", type="png") != RenderCache.make_key(
+        html="a", type="jpeg"
+    )
+
+
+@pytest.mark.asyncio
+async def test_render_cache_ttl(mocker: MockerFixture) -> None:
+    """测试缓存过期"""
+    from nonebot_plugin_htmlrender.cache import RenderCache
+
+    now = mocker.patch("nonebot_plugin_htmlrender.cache.time.time", return_value=0)
+    cache = RenderCache(enabled=True, ttl=60, max_memory_bytes=1024)
+    await cache.set("key", b"image")
+
+    now.return_value = 61
+    assert await cache.get("key") is None
+    assert cache.stats.memory_items == 0
+
+
+@pytest.mark.asyncio
+async def test_render_cache_memory_limit() -> None:
+    """测试内存层按字节数淘汰最久未使用的条目"""
+    from nonebot_plugin_htmlrender.cache import RenderCache
+
+    cache = RenderCache(enabled=True, ttl=60, max_memory_bytes=10)
+    await cache.set("a", b"aaaa")
+    await cache.set("b", b"bbbb")
+    assert await cache.get("a") == b"aaaa"
+    await cache.set("c", b"cccc")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == b"aaaa"
+    assert cache.stats.memory_bytes <= 10
+
+
+@pytest.mark.asyncio
+async def test_render_cache_disk(tmp_path: Path) -> None:
+    """测试磁盘层在新实例中依然可用"""
+    from nonebot_plugin_htmlrender.cache import RenderCache
+
+    cache = RenderCache(
+        enabled=True,
+        ttl=60,
+        max_memory_bytes=1024,
+        disk_path=tmp_path,
+        max_disk_bytes=1024,
+    )
+    await cache.set("key", b"image")
+
+    restarted = RenderCache(
+        enabled=True,
+        ttl=60,
+        max_memory_bytes=1024,
+        disk_path=tmp_path,
+        max_disk_bytes=1024,
+    )
+    assert await restarted.get("key") == b"image"
+    assert restarted.stats.disk_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_render_cache_disk_promotion_keeps_ttl(
+    mocker: MockerFixture, tmp_path: Path
+) -> None:
+    """测试磁盘条目提升到内存层后不会延长有效期"""
+    from nonebot_plugin_htmlrender.cache import RenderCache
+
+    cache = RenderCache(
+        enabled=True,
+        ttl=60,
+        max_memory_bytes=1024,
+        disk_path=tmp_path,
+        max_disk_bytes=1024,
+    )
+    await cache.set("key", b"image")
+    cache.clear()
+    created = os.stat(tmp_path / "key").st_mtime
+
+    now = mocker.patch("nonebot_plugin_htmlrender.cache.time.time")
+    now.return_value = created + 50
+    assert await cache.get("key") == b"image"
+    assert cache.stats.disk_hits == 1
+
+    now.return_value = created + 70
+    assert await cache.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_render_cache_disk_limit(tmp_path: Path) -> None:
+    """测试磁盘层总大小受限制"""
+    from nonebot_plugin_htmlrender.cache import RenderCache
+
+    cache = RenderCache(
+        enabled=True,
+        ttl=60,
+        max_memory_bytes=0,
+        disk_path=tmp_path,
+        max_disk_bytes=10,
+    )
+    for key in ("a", "b", "c"):
+        await cache.set(key, key.encode() * 4)
+
+    assert sum(entry.stat().st_size for entry in os.scandir(tmp_path)) <= 10
+
+
+@pytest.mark.asyncio
+async def test_disk_pruner_scans_lazily(mocker: MockerFixture, tmp_path: Path) -> None:
+    """测试只有首次写入、估计大小超过上限或写入次数达到间隔时才扫描目录"""
+    from nonebot_plugin_htmlrender import cache as cache_module
+
+    mocker.patch.object(cache_module, "PRUNE_INTERVAL", 5)
+    pruner = cache_module.DiskPruner(tmp_path, ttl=60, max_bytes=100)
+    prune = mocker.spy(pruner, "prune")
+
+    await pruner.record_write(10)
+    assert prune.call_count == 1
+
+    for _ in range(3):
+        await pruner.record_write(10)
+    assert prune.call_count == 1
+
+    await pruner.record_write(80)
+    assert prune.call_count == 2
+
+    for _ in range(5):
+        await pruner.record_write(0)
+    assert prune.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_html_to_pic_uses_render_cache(mocker: MockerFixture) -> None:
+    """测试启用缓存后相同的渲染请求不再使用浏览器"""
+    from nonebot_plugin_htmlrender import html_to_pic
+    from nonebot_plugin_htmlrender.cache import RenderCache
+
+    cache = RenderCache(enabled=True, ttl=60, max_memory_bytes=1024)
+    mocker.patch("nonebot_plugin_htmlrender.data_source.render_cache", cache)
+    mock_render = mocker.patch(
+        "nonebot_plugin_htmlrender.data_source._render_html", return_value=b"image"
+    )
+
+    assert await html_to_pic("<p>1</p>") == b"image"
+    assert await html_to_pic("<p>1</p>") == b"image"
+    assert await html_to_pic("<p>1</p>", type="jpeg") == b"image"
+
+    assert mock_render.call_count == 2
+    assert cache.stats.hits == 1
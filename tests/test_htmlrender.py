@@ -211,3 +211,525 @@ async def test_capture_element_exceptions_propagate(mocker: MockerFixture) -> No
         await capture_element("https://example.com", "#element")
 
     assert "Browser error" in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_capture_elements_single_navigation(mocker: MockerFixture) -> None:
+    """测试多个元素只导航一次并按顺序返回截图"""
+    from nonebot_plugin_htmlrender.data_source import capture_elements
+
+    locators = {
+        selector: mocker.AsyncMock(screenshot=mocker.AsyncMock(return_value=image))
+        for selector, image in (("#a", b"a"), ("#b", b"b"), ("#c", b"c"))
+    }
+
+    mock_page = mocker.AsyncMock()
+    mock_page.on = mocker.MagicMock()
+    mock_page.locator = mocker.MagicMock(side_effect=locators.__getitem__)
+
+    mock_cm = mocker.MagicMock()
+    mock_cm.__aenter__ = mocker.AsyncMock(return_value=mock_page)
+    mock_cm.__aexit__ = mocker.AsyncMock(return_value=None)
+    mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.get_new_page", return_value=mock_cm
+    )
+
+    result = await capture_elements(
+        "https://example.com",
+        ["#a", "#b", "#c"],
+        screenshot_kwargs={"type": "png"},
+    )
+
+    assert result == [b"a", b"b", b"c"]
+    mock_page.goto.assert_called_once_with("https://example.com")
+    for locator in locators.values():
+        locator.screenshot.assert_called_once_with(type="png")
+
+
+@pytest.mark.asyncio
+async def test_capture_element_keep_warm(mocker: MockerFixture) -> None:
+    """测试保温期内复用已导航的页面, 过期后关闭"""
+    import asyncio
+
+    from nonebot_plugin_htmlrender import data_source
+    from nonebot_plugin_htmlrender.data_source import capture_element
+
+    mock_locator = mocker.AsyncMock()
+    mock_locator.screenshot.return_value = b"image"
+
+    mock_page = mocker.AsyncMock()
+    mock_page.on = mocker.MagicMock()
+    mock_page.off = mocker.MagicMock()
+    mock_page.is_closed = mocker.MagicMock(return_value=False)
+    mock_page.locator = mocker.MagicMock(return_value=mock_locator)
+
+    mock_browser = mocker.AsyncMock()
+    mock_browser.is_connected = mocker.MagicMock(return_value=True)
+    mock_browser.new_page.return_value = mock_page
+    mocker.patch(
+        "nonebot_plugin_htmlrender.browser.get_browser", return_value=mock_browser
+    )
+
+    # 并发调用只会导航一次
+    results = await asyncio.gather(
+        *(
+            capture_element("https://example.com", selector, keep_warm=0.05)
+            for selector in ("#a", "#b")
+        )
+    )
+    assert results == [b"image", b"image"]
+
+    mock_browser.new_page.assert_called_once_with(device_scale_factor=2)
+    mock_page.goto.assert_called_once_with("https://example.com")
+    assert mock_locator.screenshot.call_count == 2
+    assert len(data_source._warm_pages) == 1
+
+    await asyncio.sleep(0.1)
+
+    assert not data_source._warm_pages
+    mock_page.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_template_env_reused(
+    template_resources: tuple[str, str, list[str]],
+) -> None:
+    """测试相同模板路径与过滤器复用同一个 jinja2 环境"""
+    from nonebot_plugin_htmlrender.data_source import get_template_env
+
+    template_path, _, _ = template_resources
+
+    def _upper(value: str) -> str:
+        return value.upper()
+
+    assert get_template_env(template_path) is get_template_env(template_path)
+    assert get_template_env(template_path, {"upper": _upper}) is get_template_env(
+        template_path, {"upper": _upper}
+    )
+    assert get_template_env(template_path) is not get_template_env(
+        template_path, {"upper": _upper}
+    )
+
+
+@pytest.mark.asyncio
+async def test_template_env_lru(mocker: MockerFixture, tmp_path: Path) -> None:
+    """测试 jinja2 环境缓存数量受上限约束"""
+    from nonebot_plugin_htmlrender.data_source import _template_envs, get_template_env
+
+    mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.plugin_config.htmlrender_template_env_cache_size",
+        2,
+    )
+
+    first = get_template_env(str(tmp_path / "a"))
+    get_template_env(str(tmp_path / "b"))
+    get_template_env(str(tmp_path / "c"))
+
+    assert len(_template_envs) <= 2
+    assert get_template_env(str(tmp_path / "a")) is not first
+
+
+@pytest.mark.asyncio
+async def test_template_to_html_auto_reload(tmp_path: Path) -> None:
+    """测试模板文件修改后会被重新加载"""
+    import os
+
+    from nonebot_plugin_htmlrender import template_to_html
+
+    template_file = tmp_path / "card.html"
+    template_file.write_text("<p>{{ name }}</p>", encoding="utf-8")
+
+    html = await template_to_html(str(tmp_path), "card.html", name="a")
+    assert html == "<p>a</p>"
+
+    template_file.write_text("<div>{{ name }}</div>", encoding="utf-8")
+    stat = template_file.stat()
+    os.utime(template_file, (stat.st_atime, stat.st_mtime + 10))
+
+    html = await template_to_html(str(tmp_path), "card.html", name="b")
+    assert html == "<div>b</div>"
+
+
+@pytest.mark.asyncio
+async def test_md_to_pic_links_katex(mocker: MockerFixture) -> None:
+    """测试数学公式渲染时 KaTeX 资源以链接形式引入而不是内联"""
+    from nonebot_plugin_htmlrender import md_to_pic
+    from nonebot_plugin_htmlrender.data_source import KATEX_URL
+
+    mock_html_to_pic = mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.html_to_pic", return_value=b"image"
+    )
+
+    assert await md_to_pic("$$114514$$") == b"image"
+    html = mock_html_to_pic.call_args.kwargs["html"]
+    assert f"{KATEX_URL}/katex.min.b64_fonts.css" in html
+    assert f"{KATEX_URL}/katex.min.js" in html
+    assert len(html) < 100_000
+
+    await md_to_pic("114514")
+    assert KATEX_URL not in mock_html_to_pic.call_args.kwargs["html"]
+
+
+@pytest.mark.asyncio
+async def test_read_tpl_cached(mocker: MockerFixture) -> None:
+    """测试内置模板资源只从磁盘读取一次"""
+    from nonebot_plugin_htmlrender import data_source
+
+    read_file = mocker.spy(data_source, "read_file")
+    mocker.patch.dict(data_source._tpl_cache, clear=True)
+
+    first = await data_source.read_tpl("text.css")
+    second = await data_source.read_tpl("text.css")
+
+    assert first == second
+    assert read_file.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_read_css_cached_by_mtime(mocker: MockerFixture, tmp_path: Path) -> None:
+    """测试用户 css 文件按修改时间缓存"""
+    import os
+
+    from nonebot_plugin_htmlrender import data_source
+
+    read_file = mocker.spy(data_source, "read_file")
+    css_file = tmp_path / "style.css"
+    css_file.write_text("p { color: red; }", encoding="utf-8")
+
+    assert await data_source.read_css(str(css_file)) == "p { color: red; }"
+    assert await data_source.read_css(str(css_file)) == "p { color: red; }"
+    assert read_file.call_count == 1
+
+    css_file.write_text("p { color: blue; }", encoding="utf-8")
+    stat = css_file.stat()
+    os.utime(css_file, (stat.st_atime, stat.st_mtime + 10))
+
+    assert await data_source.read_css(str(css_file)) == "p { color: blue; }"
+    assert read_file.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_read_css_cache_size_limit(mocker: MockerFixture, tmp_path: Path) -> None:
+    """测试 css 缓存总大小不超过配置上限"""
+    from nonebot_plugin_htmlrender import data_source
+
+    mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.plugin_config.htmlrender_asset_cache_size",
+        10,
+    )
+    mocker.patch.object(data_source, "_css_cache", data_source.OrderedDict())
+    mocker.patch.object(data_source, "_css_cache_size", 0)
+
+    for name in ("a", "b", "c"):
+        css_file = tmp_path / f"{name}.css"
+        css_file.write_text(name * 4, encoding="utf-8")
+        await data_source.read_css(str(css_file))
+
+    assert data_source._css_cache_size <= 10
+    assert list(data_source._css_cache) == [
+        str(tmp_path / "b.css"),
+        str(tmp_path / "c.css"),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("html", "expected"),
+    [
+        (
+            "<!DOCTYPE html><html><head><title>t</title></head></html>",
+            '<!DOCTYPE html><html><head><base href="file:///tpl/a.css"><title>',
+        ),
+        ("<html><body>1</body></html>", '<html><base href="file:///tpl/a.css"><body>'),
+        ("<p>1</p>", '<base href="file:///tpl/a.css"><p>1</p>'),
+        ('<head><base href="x/"></head>', '<head><base href="x/"></head>'),
+    ],
+    ids=["head", "html", "fragment", "existing_base"],
+)
+def test_with_base_url(html: str, expected: str) -> None:
+    """测试 <base> 插入位置"""
+    from nonebot_plugin_htmlrender.data_source import _with_base_url
+
+    assert _with_base_url(html, "file:///tpl/a.css").startswith(expected)
+
+
+def test_with_base_url_directory(tmp_path: Path) -> None:
+    """测试模板路径为目录时补全结尾的斜杠"""
+    from nonebot_plugin_htmlrender.data_source import _with_base_url
+
+    html = _with_base_url("<p>1</p>", tmp_path.as_uri())
+    assert html.startswith(f'<base href="{tmp_path.as_uri()}/">')
+
+
+@pytest.fixture
+def mock_pooled_page(mocker: MockerFixture) -> Any:
+    """模拟页面池返回的页面"""
+    mock_page = mocker.AsyncMock()
+    mock_page.on = mocker.MagicMock()
+    mock_page.remove_listener = mocker.MagicMock()
+    mock_page.url = "about:blank"
+    mock_page.screenshot.return_value = b"image"
+
+    mock_cm = mocker.MagicMock()
+    mock_cm.__aenter__ = mocker.AsyncMock(return_value=mock_page)
+    mock_cm.__aexit__ = mocker.AsyncMock(return_value=None)
+    mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.get_pooled_page", return_value=mock_cm
+    )
+    return mock_page
+
+
+@pytest.mark.asyncio
+async def test_html_to_pic_skips_goto_on_file_page(mock_pooled_page: Any) -> None:
+    """测试页面已处于页面池的空白文档时不再导航"""
+    from nonebot_plugin_htmlrender import html_to_pic
+    from nonebot_plugin_htmlrender.pool import BLANK_PAGE_URL
+
+    assert await html_to_pic("<p>1</p>", template_path="file:///tpl") == b"image"
+    mock_pooled_page.goto.assert_called_once_with("file:///tpl")
+
+    # 其他 file:// 页面的 window 可能残留脚本状态, 仍需导航
+    mock_pooled_page.goto.reset_mock()
+    mock_pooled_page.url = "file:///other/"
+    await html_to_pic("<p>2</p>", template_path="file:///tpl")
+    mock_pooled_page.goto.assert_called_once_with("file:///tpl")
+
+    mock_pooled_page.goto.reset_mock()
+    mock_pooled_page.url = BLANK_PAGE_URL
+    await html_to_pic("<p>1</p>", template_path="file:///tpl", wait_until="load")
+
+    mock_pooled_page.goto.assert_not_called()
+    html = mock_pooled_page.set_content.call_args.args[0]
+    assert html.startswith('<base href="file:///tpl">')
+    assert mock_pooled_page.set_content.call_args.kwargs == {"wait_until": "load"}
+
+
+@pytest.mark.asyncio
+async def test_html_to_pic_removes_console_listener(mock_pooled_page: Any) -> None:
+    """测试渲染结束后移除控制台监听, 复用的页面不会重复记录"""
+    from nonebot_plugin_htmlrender import html_to_pic
+
+    await html_to_pic("<p>1</p>")
+
+    mock_pooled_page.on.assert_called_once()
+    event, handler = mock_pooled_page.on.call_args.args
+    assert event == "console"
+    mock_pooled_page.remove_listener.assert_called_once_with("console", handler)
+
+
+@pytest.mark.asyncio
+async def test_html_to_pic_ready_strategies(mock_pooled_page: Any) -> None:
+    """测试字体就绪与自定义就绪条件"""
+    from nonebot_plugin_htmlrender import html_to_pic
+
+    await html_to_pic(
+        "<p>1</p>", wait_until="fonts", ready_predicate="() => window.ready"
+    )
+
+    assert mock_pooled_page.set_content.call_args.kwargs == {"wait_until": "load"}
+    mock_pooled_page.evaluate.assert_called_once_with(
+        "document.fonts.ready.then(() => true)"
+    )
+    mock_pooled_page.wait_for_function.assert_called_once_with("() => window.ready")
+
+
+@pytest.mark.asyncio
+async def test_html_to_pic_retries_after_crash(mock_pooled_page: Any) -> None:
+    """测试渲染因浏览器崩溃失败时在新页面上重试一次"""
+    from nonebot_plugin_htmlrender import BrowserCrashedError, html_to_pic
+
+    mock_pooled_page.screenshot.side_effect = [
+        BrowserCrashedError("crashed"),
+        b"image",
+    ]
+
+    assert await html_to_pic("<p>1</p>") == b"image"
+    assert mock_pooled_page.screenshot.call_count == 2
+
+    mock_pooled_page.screenshot.side_effect = BrowserCrashedError("crashed")
+    with pytest.raises(BrowserCrashedError):
+        await html_to_pic("<p>1</p>")
+
+
+@pytest.mark.asyncio
+async def test_html_to_pic_coalesces_identical_renders(
+    mocker: MockerFixture, mock_pooled_page: Any
+) -> None:
+    """测试相同参数的并发渲染只打开一个页面"""
+    import asyncio
+
+    from nonebot_plugin_htmlrender import html_to_pic, render_metrics
+
+    async def _screenshot(**kwargs) -> bytes:
+        await asyncio.sleep(0.01)
+        return b"image"
+
+    mock_pooled_page.screenshot.side_effect = _screenshot
+    render_metrics.reset()
+
+    results = await asyncio.gather(
+        *(html_to_pic("<p>same</p>") for _ in range(5)),
+        html_to_pic("<p>other</p>"),
+    )
+
+    assert results == [b"image"] * 6
+    assert mock_pooled_page.screenshot.call_count == 2
+    assert render_metrics.coalesced_renders == 4
+
+    mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.plugin_config.htmlrender_coalesce",
+        False,
+    )
+    await asyncio.gather(*(html_to_pic("<p>same</p>") for _ in range(3)))
+    assert mock_pooled_page.screenshot.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_html_to_pic_clip(mock_pooled_page: Any) -> None:
+    """测试按选择器或自动测量的区域截图"""
+    from nonebot_plugin_htmlrender import html_to_pic
+    from nonebot_plugin_htmlrender.data_source import MEASURE_CLIP_JS
+
+    rect = {"x": 8, "y": 8, "width": 484, "height": 120}
+    mock_pooled_page.evaluate.return_value = rect
+
+    await html_to_pic("<div id='main'>1</div>", selector="#main")
+    mock_pooled_page.evaluate.assert_called_once_with(MEASURE_CLIP_JS, "#main")
+    assert mock_pooled_page.screenshot.call_args.kwargs["clip"] == rect
+    # clip 只有与 full_page 一起使用时才不会被裁剪到视口内
+    assert mock_pooled_page.screenshot.call_args.kwargs["full_page"] is True
+
+    mock_pooled_page.evaluate.reset_mock()
+    await html_to_pic("<div>2</div>", auto_clip=True)
+    mock_pooled_page.evaluate.assert_called_once_with(MEASURE_CLIP_JS, None)
+
+    mock_pooled_page.evaluate.return_value = None
+    await html_to_pic("<div>3</div>", auto_clip=True)
+    assert mock_pooled_page.screenshot.call_args.kwargs["full_page"] is True
+
+    with pytest.raises(ValueError, match="#missing"):
+        await html_to_pic("<div>4</div>", selector="#missing")
+
+
+@pytest.mark.asyncio
+async def test_md_to_pic_selector(mocker: MockerFixture) -> None:
+    """测试 md_to_pic 将选择器传递给 html_to_pic"""
+    from nonebot_plugin_htmlrender import md_to_pic
+
+    mock_html_to_pic = mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.html_to_pic", return_value=b"image"
+    )
+
+    await md_to_pic("# title", selector=".markdown-body")
+
+    assert mock_html_to_pic.call_args.kwargs["selector"] == ".markdown-body"
+
+
+@pytest.mark.asyncio
+async def test_html_to_pic_default_wait_until(
+    mocker: MockerFixture, mock_pooled_page: Any
+) -> None:
+    """测试默认就绪策略来自配置"""
+    from nonebot_plugin_htmlrender import html_to_pic
+
+    mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.plugin_config.htmlrender_wait_until",
+        "domcontentloaded",
+    )
+
+    await html_to_pic("<p>1</p>")
+
+    assert mock_pooled_page.set_content.call_args.kwargs == {
+        "wait_until": "domcontentloaded"
+    }
+
+
+@pytest.mark.asyncio
+async def test_convert_markdown_reuses_converter(mocker: MockerFixture) -> None:
+    """测试 markdown 转换器被复用且转换结果被缓存"""
+    import markdown
+
+    from nonebot_plugin_htmlrender import data_source
+
+    mocker.patch.object(data_source, "_md_cache", data_source.OrderedDict())
+    convert = mocker.spy(markdown.Markdown, "convert")
+
+    first = await data_source.convert_markdown("# title\n\n- [x] done")
+    second = await data_source.convert_markdown("# title\n\n- [x] done")
+    third = await data_source.convert_markdown("~~deleted~~")
+
+    assert first == second
+    assert "<h1>title</h1>" in first
+    assert "<del>deleted</del>" in third
+    assert convert.call_count == 2
+    assert (
+        data_source._get_markdown_converter() is data_source._get_markdown_converter()
+    )
+
+
+@pytest.mark.asyncio
+async def test_convert_markdown_cache_size(mocker: MockerFixture) -> None:
+    """测试 markdown 转换缓存数量受上限约束"""
+    from nonebot_plugin_htmlrender import data_source
+
+    mocker.patch.object(data_source, "_md_cache", data_source.OrderedDict())
+    mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.plugin_config.htmlrender_markdown_cache_size",
+        2,
+    )
+
+    for text in ("a", "b", "c"):
+        await data_source.convert_markdown(text)
+
+    assert len(data_source._md_cache) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["thread", "process"])
+async def test_offload_html_generation(
+    mocker: MockerFixture, tmp_path: Path, mode: str
+) -> None:
+    """测试在线程池或进程池中生成 html"""
+    from nonebot_plugin_htmlrender import data_source, template_to_html
+    from nonebot_plugin_htmlrender.executor import shutdown_executors
+
+    mocker.patch(
+        "nonebot_plugin_htmlrender.executor.plugin_config.htmlrender_offload", mode
+    )
+    mocker.patch.object(data_source, "_md_cache", data_source.OrderedDict())
+    (tmp_path / "card.html").write_text("<p>{{ name | upper }}</p>", encoding="utf-8")
+
+    try:
+        html = await data_source.convert_markdown("# offload")
+        assert "<h1>offload</h1>" in html
+        assert await template_to_html(str(tmp_path), "card.html", name="a") == (
+            "<p>A</p>"
+        )
+    finally:
+        shutdown_executors()
+
+
+@pytest.mark.asyncio
+async def test_process_offload_falls_back_with_threads(mocker: MockerFixture) -> None:
+    """测试有其他线程运行时进程池模式改用线程池并给出警告"""
+    import threading
+
+    from nonebot_plugin_htmlrender import executor
+
+    mocker.patch.object(executor.plugin_config, "htmlrender_offload", "process")
+    mock_logger = mocker.patch.object(executor, "logger")
+    mock_pool = mocker.patch.object(executor, "ProcessPoolExecutor")
+
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        executor.start_executors()
+        assert await executor.run_offloaded(len, "abc", picklable=True) == 3
+        assert await executor.run_offloaded(len, "ab", picklable=True) == 2
+    finally:
+        stop.set()
+        thread.join()
+        executor.shutdown_executors()
+
+    mock_pool.assert_not_called()
+    mock_logger.warning.assert_called_once()
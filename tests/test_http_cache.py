@@ -0,0 +1,202 @@
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+from pathlib import Path
+import threading
+from typing import Any
+import urllib.request
+
+import pytest
+from pytest_mock import MockerFixture
+
+
+class _AssetServer(ThreadingHTTPServer):
+    requests: int = 0
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    server: _AssetServer
+
+    def do_GET(self) -> None:
+        self.server.requests += 1
+        body = b"avatar-bytes" if self.path != "/large" else b"x" * 64
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/private":
+            self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def asset_server() -> Iterator[_AssetServer]:
+    """本地 http 资源服务器"""
+    server = _AssetServer(("127.0.0.1", 0), _AssetHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _route(mocker: MockerFixture, url: str, method: str = "GET") -> Any:
+    """模拟 Playwright 路由, fetch 时真正请求本地服务器"""
+
+    async def _fetch() -> Any:
+        with urllib.request.urlopen(url) as resp:  # noqa: ASYNC210
+            body = resp.read()
+            response = mocker.MagicMock(status=resp.status)
+            response.headers = {k.lower(): v for k, v in resp.headers.items()}
+        response.body = mocker.AsyncMock(return_value=body)
+        return response
+
+    route = mocker.AsyncMock()
+    route.request = mocker.MagicMock(url=url, method=method)
+    route.fetch.side_effect = _fetch
+    return route
+
+
+def _make_cache(path: Path, **kwargs: Any) -> Any:
+    from nonebot_plugin_htmlrender.http_cache import HttpAssetCache
+
+    options = {"ttl": 60, "max_bytes": 1024, "max_item_bytes": 32, **kwargs}
+    return HttpAssetCache(enabled=True, path=path, **options)
+
+
+@pytest.mark.asyncio
+async def test_http_cache_serves_from_disk(
+    mocker: MockerFixture, tmp_path: Path, asset_server: _AssetServer
+) -> None:
+    """测试远程资源在新的缓存实例中直接从磁盘返回"""
+    url = f"http://127.0.0.1:{asset_server.server_port}/avatar.png"
+
+    first = _route(mocker, url)
+    cache = _make_cache(tmp_path)
+    await cache._handle(first)
+
+    first.fulfill.assert_awaited_once()
+    assert first.fulfill.call_args.kwargs["body"] == b"avatar-bytes"
+    assert cache.stats.misses == 1
+    assert cache.stats.stores == 1
+
+    # 模拟浏览器或进程重启后的新实例
+    restarted = _make_cache(tmp_path)
+    second = _route(mocker, url)
+    await restarted._handle(second)
+
+    second.fetch.assert_not_awaited()
+    second.fulfill.assert_awaited_once()
+    kwargs = second.fulfill.call_args.kwargs
+    assert kwargs["status"] == 200
+    assert kwargs["body"] == b"avatar-bytes"
+    assert kwargs["headers"]["content-type"] == "image/png"
+    assert "content-length" not in kwargs["headers"]
+    assert restarted.stats.hits == 1
+    assert asset_server.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_http_cache_skips_uncacheable(
+    mocker: MockerFixture, tmp_path: Path, asset_server: _AssetServer
+) -> None:
+    """测试超过大小上限、no-store 与非 GET、非 http 请求不会被缓存"""
+    base = f"http://127.0.0.1:{asset_server.server_port}"
+    cache = _make_cache(tmp_path)
+
+    for path in ("/large", "/private"):
+        for _ in range(2):
+            await cache._handle(_route(mocker, base + path))
+    assert asset_server.requests == 4
+    assert cache.stats.stores == 0
+
+    post = _route(mocker, f"{base}/avatar.png", method="POST")
+    local = _route(mocker, "file:///tmp/avatar.png")
+    for route in (post, local):
+        await cache._handle(route)
+        route.fallback.assert_awaited_once()
+        route.fetch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_http_cache_origin_down(mocker: MockerFixture, tmp_path: Path) -> None:
+    """测试源站不可用时中止请求而不是让路由悬挂"""
+    server = _AssetServer(("127.0.0.1", 0), _AssetHandler)
+    url = f"http://127.0.0.1:{server.server_port}/avatar.png"
+    server.server_close()
+
+    route = _route(mocker, url)
+    cache = _make_cache(tmp_path)
+    await cache._handle(route)
+
+    route.abort.assert_awaited_once_with("failed")
+    route.fulfill.assert_not_awaited()
+    assert cache.stats.stores == 0
+
+
+@pytest.mark.asyncio
+async def test_http_cache_max_response_size(
+    mocker: MockerFixture, tmp_path: Path, asset_server: _AssetServer
+) -> None:
+    """测试缓存路由按拦截策略检查响应大小, 命中缓存时同样生效"""
+    from nonebot_plugin_htmlrender.blocking import BlockPolicy
+
+    url = f"http://127.0.0.1:{asset_server.server_port}/avatar.png"
+    cache = _make_cache(tmp_path)
+    await cache._handle(_route(mocker, url))
+    assert cache.stats.stores == 1
+
+    policy = BlockPolicy(max_response_size=4)
+    cached = _route(mocker, url)
+    await cache._handle(cached, block_policy=policy)
+    cached.abort.assert_awaited_once_with("blockedbyclient")
+    cached.fetch.assert_not_awaited()
+
+    fetched = _route(mocker, f"http://127.0.0.1:{asset_server.server_port}/large")
+    await cache._handle(fetched, block_policy=policy)
+    fetched.abort.assert_awaited_once_with("blockedbyclient")
+    fetched.fulfill.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_http_cache_ttl_and_size(tmp_path: Path) -> None:
+    """测试缓存过期与按总大小淘汰最旧的条目"""
+    from nonebot_plugin_htmlrender.http_cache import CachedResponse
+
+    cache = _make_cache(tmp_path, max_bytes=200)
+    response = CachedResponse(status=200, headers={}, body=b"1" * 30)
+
+    await cache.set("http://a/1", response)
+    path = os.path.join(tmp_path, cache.make_key("http://a/1"))
+    os.utime(path, (0, 0))
+    assert await cache.get("http://a/1") is None
+    assert not any(entry.path == path for entry in os.scandir(tmp_path))
+
+    for index in range(5):
+        await cache.set(f"http://a/{index}", response)
+    entries = list(os.scandir(tmp_path))
+    assert sum(entry.stat().st_size for entry in entries) <= 200
+    assert len(entries) < 5
+
+
+@pytest.mark.asyncio
+async def test_http_cache_apply(mocker: MockerFixture, tmp_path: Path) -> None:
+    """测试只有启用时才注册路由"""
+    from nonebot_plugin_htmlrender.http_cache import HttpAssetCache
+
+    page = mocker.AsyncMock()
+    disabled = HttpAssetCache(
+        enabled=False, path=tmp_path, ttl=60, max_bytes=1024, max_item_bytes=32
+    )
+    assert not await disabled.apply(page)
+    page.route.assert_not_awaited()
+
+    cache = _make_cache(tmp_path)
+    assert await cache.apply(page)
+    page.route.assert_awaited_once()
+    handler = page.route.call_args.args[1]
+    assert handler.func == cache._handle
+    assert handler.keywords == {"block_policy": None}
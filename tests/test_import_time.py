@@ -0,0 +1,50 @@
+import json
+import subprocess
+import sys
+
+# 插件自身(不含 nonebot 与 localstore)的导入耗时上限, 单位微秒
+# 本机测量约 0.1~0.2s, 留出足够余量以免在较慢的 CI 机器上误报,
+# 主要的回归保护是下面对重量级模块的检查
+IMPORT_TIME_BUDGET = 1_000_000
+# 只应在首次使用时导入的重量级模块
+LAZY_MODULES = ("playwright", "jinja2", "markdown", "pymdownx", "pygments", "PIL")
+
+IMPORT_SCRIPT = f"""
+import json
+import sys
+
+import nonebot
+
+nonebot.init()
+nonebot.require("nonebot_plugin_localstore")
+nonebot.require("nonebot_plugin_htmlrender")
+print(json.dumps([name for name in {LAZY_MODULES!r} if name in sys.modules]))
+"""
+
+
+def _import_plugin() -> tuple[list[str], int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+    # nonebot 直接执行插件的 __init__, 因此累加其直接导入的各子模块的累计耗时
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        # import time: self [us] | cumulative | imported package
+        _, total, name = line.split("|")
+        if name.startswith(" nonebot_plugin_htmlrender."):
+            cumulative += int(total)
+    return json.loads(result.stdout.strip().splitlines()[-1]), cumulative
+
+
+def test_import_does_not_load_heavy_modules() -> None:
+    """测试导入插件时不会加载浏览器、模板与 markdown 相关的重量级模块"""
+    loaded, cumulative = _import_plugin()
+
+    assert loaded == []
+    assert 0 < cumulative < IMPORT_TIME_BUDGET
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_limiter_caps_concurrency() -> None:
+    """测试同时占用的名额不超过上限"""
+    from nonebot_plugin_htmlrender.limiter import RenderLimiter
+
+    limiter = RenderLimiter(max_concurrency=2, max_queue=10, timeout=5)
+    peak = 0
+
+    async def _render() -> None:
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.stats.active)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(_render() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.stats.active == 0
+    assert limiter.stats.waiting == 0
+    assert limiter.stats.acquired == 6
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_when_queue_full() -> None:
+    """测试排队已满时立即抛出过载异常"""
+    from nonebot_plugin_htmlrender.limiter import RenderLimiter, RenderOverloadError
+
+    limiter = RenderLimiter(max_concurrency=1, max_queue=1, timeout=5)
+    release = asyncio.Event()
+
+    async def _hold() -> None:
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(_hold())
+    waiter = asyncio.create_task(_hold())
+    await asyncio.sleep(0)
+    assert limiter.stats.waiting == 1
+
+    with pytest.raises(RenderOverloadError, match="full"):
+        async with limiter.slot():
+            pass
+    assert limiter.stats.rejected == 1
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+
+
+@pytest.mark.asyncio
+async def test_limiter_queue_timeout() -> None:
+    """测试排队超时时抛出过载异常"""
+    from nonebot_plugin_htmlrender.limiter import RenderLimiter, RenderOverloadError
+
+    limiter = RenderLimiter(max_concurrency=1, max_queue=10, timeout=0.01)
+
+    async with limiter.slot():
+        with pytest.raises(RenderOverloadError, match="Timed out"):
+            async with limiter.slot():
+                pass
+
+    assert limiter.stats.timeouts == 1
+    assert limiter.stats.waiting == 0
+    async with limiter.slot():
+        assert limiter.stats.active == 1
+
+
+@pytest.mark.asyncio
+async def test_limiter_unlimited() -> None:
+    """测试上限为 0 时不限制并发"""
+    from nonebot_plugin_htmlrender.limiter import RenderLimiter
+
+    limiter = RenderLimiter(max_concurrency=0, max_queue=0, timeout=0)
+
+    async with limiter.slot(), limiter.slot():
+        assert limiter.stats.active == 2
@@ -0,0 +1,127 @@
+from pathlib import Path
+from typing import Any
+
+from playwright.async_api import Browser, Page
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def live_browser(mocker: MockerFixture) -> Any:
+    """每次 new_page 都返回新页面的模拟浏览器"""
+    browser = mocker.MagicMock(spec=Browser)
+    browser.is_connected.return_value = True
+
+    async def _new_page(**kwargs) -> Any:
+        page = mocker.AsyncMock(spec=Page)
+        page.on = mocker.MagicMock()
+        page.remove_listener = mocker.MagicMock()
+        page.is_closed = mocker.MagicMock(return_value=False)
+        page.screenshot.return_value = b"image"
+        return page
+
+    browser.new_page = mocker.AsyncMock(side_effect=_new_page)
+    mocker.patch("nonebot_plugin_htmlrender.browser.get_browser", return_value=browser)
+    return browser
+
+
+@pytest.fixture
+def template_dir(tmp_path: Path) -> Path:
+    (tmp_path / "card.html").write_text(
+        "<html><head><title>{{ title }}</title></head>"
+        "<body><p>{{ score }}</p></body></html>"
+    )
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_live_template_pushes_body(live_browser: Any, template_dir: Path) -> None:
+    """测试只有 body 变化时推送 body 内容而不重新加载页面"""
+    from nonebot_plugin_htmlrender import LiveTemplate
+    from nonebot_plugin_htmlrender.live import UPDATE_BODY_JS
+
+    async with LiveTemplate(str(template_dir), "card.html") as live:
+        assert await live.render({"title": "a", "score": 1}) == b"image"
+        assert await live.render({"title": "a", "score": 2}) == b"image"
+
+        page = live._page
+        assert page is not None
+        assert live_browser.new_page.call_count == 1
+        page.goto.assert_called_once_with(f"file://{template_dir}")
+        assert page.set_content.call_count == 1
+        page.evaluate.assert_called_with(UPDATE_BODY_JS, "<p>2</p>")
+
+        await live.render({"title": "b", "score": 3})
+        assert page.set_content.call_count == 2
+        assert live.full_renders == 2
+
+    page.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_live_template_update_function(
+    live_browser: Any, template_dir: Path
+) -> None:
+    """测试设置更新函数时直接推送模板参数"""
+    from nonebot_plugin_htmlrender import LiveTemplate
+
+    live = LiveTemplate(str(template_dir), "card.html", update_function="update")
+    await live.render({"title": "a", "score": 1})
+    await live.render({"title": "a", "score": 2})
+
+    page = live._page
+    assert page is not None
+    assert page.set_content.call_count == 1
+    page.evaluate.assert_called_with(
+        '(data) => window["update"](data)', {"title": "a", "score": 2}
+    )
+    await live.close()
+
+
+@pytest.mark.asyncio
+async def test_live_template_recovers_from_crash(
+    live_browser: Any, template_dir: Path
+) -> None:
+    """测试页面崩溃后在新页面上重新加载并重试"""
+    from nonebot_plugin_htmlrender import LiveTemplate
+
+    live = LiveTemplate(str(template_dir), "card.html")
+    await live.render({"title": "a", "score": 1})
+    crashed = live._page
+    assert crashed is not None
+
+    async def _crash(*args, **kwargs) -> None:
+        crashed.on.call_args.args[1](crashed)
+        raise RuntimeError("Target crashed")
+
+    crashed.evaluate.side_effect = _crash
+
+    assert await live.render({"title": "a", "score": 2}) == b"image"
+    assert live._page is not crashed
+    assert live_browser.new_page.call_count == 2
+    assert live.full_renders == 2
+    await live.close()
+
+
+@pytest.mark.asyncio
+async def test_live_template_follows_leased_browser(
+    mocker: MockerFixture, live_browser: Any, template_dir: Path
+) -> None:
+    """测试租用到的浏览器被替换后在新浏览器上重新创建页面"""
+    from nonebot_plugin_htmlrender import LiveTemplate, browser
+
+    live = LiveTemplate(str(template_dir), "card.html")
+    await live.render({"title": "a", "score": 1})
+    old_page = live._page
+    assert old_page is not None
+
+    replacement = mocker.MagicMock(spec=Browser)
+    replacement.is_connected.return_value = True
+    replacement.new_page = live_browser.new_page
+    mocker.patch.object(browser, "get_browser", return_value=replacement)
+
+    await live.render({"title": "a", "score": 2})
+    assert live._browser is replacement
+    assert live._page is not old_page
+    old_page.close.assert_called_once()
+    await live.close()
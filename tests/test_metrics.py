@@ -0,0 +1,97 @@
+import pytest
+from pytest_mock import MockerFixture
+
+
+def test_timer_records_phase() -> None:
+    """测试计时器记录耗时与错误"""
+    from nonebot_plugin_htmlrender.metrics import RenderMetrics
+
+    metrics = RenderMetrics()
+
+    with metrics.timer("jinja"):
+        pass
+    with pytest.raises(ValueError, match="boom"), metrics.timer("jinja"):
+        raise ValueError("boom")
+
+    assert metrics.histograms["jinja"].count == 2
+    assert metrics.errors == {"jinja": 1}
+
+
+def test_metrics_callback() -> None:
+    """测试回调收到阶段耗时, 回调出错不影响统计"""
+    from nonebot_plugin_htmlrender.metrics import RenderMetrics
+
+    metrics = RenderMetrics()
+    received: list[tuple[str, float, bool]] = []
+
+    def _broken(phase: str, seconds: float, ok: bool) -> None:
+        raise RuntimeError("callback failed")
+
+    metrics.add_callback(_broken)
+    metrics.add_callback(lambda *args: received.append(args))
+    metrics.observe("screenshot", 0.2)
+    metrics.observe("screenshot", 0.3, ok=False)
+    metrics.remove_callback(_broken)
+
+    assert received == [("screenshot", 0.2, True), ("screenshot", 0.3, False)]
+    assert metrics.histograms["screenshot"].count == 2
+
+
+def test_histogram_quantile() -> None:
+    """测试直方图分位数估算"""
+    from nonebot_plugin_htmlrender.metrics import Histogram
+
+    histogram = Histogram(buckets=(0.1, 1, 10))
+    for value in (0.05, 0.05, 0.5, 5):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.75) == 1
+    assert histogram.quantile(0.99) == 10
+
+
+def test_to_prometheus() -> None:
+    """测试 Prometheus 文本格式导出"""
+    from nonebot_plugin_htmlrender.metrics import RenderMetrics
+
+    metrics = RenderMetrics()
+    metrics.observe("page", 0.02)
+    metrics.observe("page", 2, ok=False)
+    metrics.browser_restarts = 1
+
+    text = metrics.to_prometheus()
+
+    assert 'htmlrender_phase_seconds_bucket{phase="page",le="0.025"} 1' in text
+    assert 'htmlrender_phase_seconds_bucket{phase="page",le="+Inf"} 2' in text
+    assert 'htmlrender_phase_seconds_count{phase="page"} 2' in text
+    assert 'htmlrender_errors_total{phase="page"} 1' in text
+    assert "htmlrender_active_pages 0" in text
+    assert "htmlrender_browser_restarts_total 1" in text
+
+
+@pytest.mark.asyncio
+async def test_html_to_pic_phases(mocker: MockerFixture) -> None:
+    """测试 html_to_pic 记录各阶段耗时"""
+    from nonebot_plugin_htmlrender import html_to_pic
+    from nonebot_plugin_htmlrender.metrics import RenderMetrics
+
+    metrics = RenderMetrics()
+    mocker.patch("nonebot_plugin_htmlrender.data_source.render_metrics", metrics)
+
+    mock_page = mocker.AsyncMock()
+    mock_page.on = mocker.MagicMock()
+    mock_page.remove_listener = mocker.MagicMock()
+    mock_page.url = "about:blank"
+    mock_page.screenshot.return_value = b"image"
+    mock_cm = mocker.MagicMock()
+    mock_cm.__aenter__ = mocker.AsyncMock(return_value=mock_page)
+    mock_cm.__aexit__ = mocker.AsyncMock(return_value=None)
+    mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.get_pooled_page", return_value=mock_cm
+    )
+
+    await html_to_pic("<p>1</p>")
+
+    assert {"page", "navigate", "set_content", "ready", "screenshot"} <= set(
+        metrics.histograms
+    )
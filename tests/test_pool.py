@@ -0,0 +1,214 @@
+from unittest.mock import AsyncMock, MagicMock
+
+from playwright.async_api import Browser, BrowserContext, Page
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def mock_browser(mocker: MockerFixture) -> AsyncMock:
+    """每次 new_context 都返回新上下文的模拟浏览器"""
+    browser = mocker.AsyncMock(spec=Browser)
+    browser.is_connected = mocker.MagicMock(return_value=True)
+
+    async def _new_context(**kwargs) -> AsyncMock:
+        page = mocker.AsyncMock(spec=Page)
+        page.on = mocker.MagicMock()
+        page.is_closed = mocker.MagicMock(return_value=False)
+        context = mocker.AsyncMock(spec=BrowserContext)
+        context.new_page.return_value = page
+        return context
+
+    browser.new_context = mocker.AsyncMock(side_effect=_new_context)
+    return browser
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_page(mock_browser: AsyncMock) -> None:
+    """测试同一参数下页面被复用并在归还时重置"""
+    from nonebot_plugin_htmlrender.pool import BLANK_PAGE_URL, PagePool
+
+    pool = PagePool(size=2, max_uses=10, max_idle=60)
+
+    async with pool.acquire(mock_browser, 2, viewport={"width": 500}) as first:
+        pass
+    await pool.wait_resets()
+    async with pool.acquire(mock_browser, 2, viewport={"width": 500}) as second:
+        pass
+
+    await pool.wait_resets()
+    assert first is second
+    assert mock_browser.new_context.call_count == 1
+    first.goto.assert_called_with(BLANK_PAGE_URL)
+    first.set_content.assert_not_called()
+    first.unroute_all.assert_called()
+    assert pool.idle_count == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_keyed_by_context_kwargs(mock_browser: AsyncMock) -> None:
+    """测试不同缩放因子或上下文参数使用不同页面"""
+    from nonebot_plugin_htmlrender.pool import PagePool
+
+    pool = PagePool(size=4, max_uses=10, max_idle=60)
+
+    async with pool.acquire(mock_browser, 2) as first:
+        pass
+    async with pool.acquire(mock_browser, 1) as second:
+        pass
+    async with pool.acquire(mock_browser, 2, viewport={"width": 300}) as third:
+        pass
+    await pool.wait_resets()
+
+    assert len({id(first), id(second), id(third)}) == 3
+    assert pool.idle_count == 3
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_after_max_uses(mock_browser: AsyncMock) -> None:
+    """测试页面达到最大复用次数后被回收"""
+    from nonebot_plugin_htmlrender.pool import PagePool
+
+    pool = PagePool(size=2, max_uses=2, max_idle=60)
+
+    for _ in range(3):
+        async with pool.acquire(mock_browser):
+            pass
+        await pool.wait_resets()
+
+    assert mock_browser.new_context.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_discards_page_on_error(mock_browser: AsyncMock) -> None:
+    """测试渲染出错时页面被丢弃而不是放回池中"""
+    from nonebot_plugin_htmlrender.pool import PagePool
+
+    pool = PagePool(size=2, max_uses=10, max_idle=60)
+
+    with pytest.raises(RuntimeError):
+        async with pool.acquire(mock_browser):
+            raise RuntimeError("render failed")
+
+    assert pool.idle_count == 0
+    async with pool.acquire(mock_browser):
+        pass
+    assert mock_browser.new_context.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_discards_crashed_page(mock_browser: AsyncMock) -> None:
+    """测试崩溃的页面不会被放回池中"""
+    from nonebot_plugin_htmlrender.pool import PagePool
+
+    pool = PagePool(size=2, max_uses=10, max_idle=60)
+
+    async with pool.acquire(mock_browser) as page:
+        crash_handler = page.on.call_args_list[0].args[1]
+        crash_handler(page)
+
+    await pool.wait_resets()
+    assert pool.idle_count == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_prunes_idle_pages(
+    mocker: MockerFixture, mock_browser: AsyncMock
+) -> None:
+    """测试空闲超时的页面被回收"""
+    from nonebot_plugin_htmlrender.pool import PagePool
+
+    pool = PagePool(size=2, max_uses=10, max_idle=60)
+    monotonic = mocker.patch(
+        "nonebot_plugin_htmlrender.pool.time.monotonic", return_value=0
+    )
+
+    async with pool.acquire(mock_browser) as first:
+        pass
+    await pool.wait_resets()
+    monotonic.return_value = 120
+    async with pool.acquire(mock_browser) as second:
+        pass
+
+    assert first is not second
+
+
+@pytest.mark.asyncio
+async def test_pool_disabled(mock_browser: AsyncMock) -> None:
+    """测试池大小为 0 时每次创建新页面"""
+    from nonebot_plugin_htmlrender.pool import PagePool
+
+    page = MagicMock()
+    page.__aenter__ = AsyncMock(return_value=page)
+    page.__aexit__ = AsyncMock(return_value=None)
+    mock_browser.new_page.return_value = page
+
+    pool = PagePool(size=0, max_uses=10, max_idle=60)
+    async with pool.acquire(mock_browser, 2) as acquired:
+        assert acquired is page
+
+    mock_browser.new_page.assert_called_once_with(device_scale_factor=2)
+    mock_browser.new_context.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pool_warmup(mock_browser: AsyncMock) -> None:
+    """测试预热页面数不超过池大小"""
+    from nonebot_plugin_htmlrender.pool import PagePool
+
+    pool = PagePool(size=2, max_uses=10, max_idle=60)
+    await pool.warmup(mock_browser, 5)
+
+    assert pool.idle_count == 2
+    await pool.close()
+    assert pool.idle_count == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_evict_browser(
+    mock_browser: AsyncMock, mocker: MockerFixture
+) -> None:
+    """测试只关闭指定浏览器的空闲页面"""
+    from nonebot_plugin_htmlrender.pool import PagePool
+
+    other = mocker.AsyncMock(spec=Browser)
+    other.is_connected = mocker.MagicMock(return_value=True)
+    other.new_context = mock_browser.new_context
+
+    pool = PagePool(size=4, max_uses=10, max_idle=60)
+    await pool.warmup(mock_browser, 1)
+    await pool.warmup(other, 2)
+
+    await pool.evict(mock_browser)
+
+    assert pool.idle_count == 1
+    async with pool.acquire(other, 2):
+        pass
+    assert mock_browser.new_context.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_resets_in_background(
+    mocker: MockerFixture, mock_browser: AsyncMock
+) -> None:
+    """测试归还页面时不等待重置导航, 重置完成前页面不会被再次取出"""
+    import asyncio
+
+    from nonebot_plugin_htmlrender.pool import PagePool
+
+    pool = PagePool(size=2, max_uses=10, max_idle=60)
+    navigating = asyncio.Event()
+
+    async def _goto(url: str) -> None:
+        await navigating.wait()
+
+    async with pool.acquire(mock_browser) as first:
+        first.goto = mocker.AsyncMock(side_effect=_goto)
+
+    assert pool.idle_count == 0
+    async with pool.acquire(mock_browser) as second:
+        assert second is not first
+
+    navigating.set()
+    await pool.wait_resets()
+    assert pool.idle_count == 2
@@ -170,3 +170,24 @@ async def test_ensure_process_terminated_decorator():
 
     await asyncio.sleep(0.5)
     assert proc.returncode is not None, "Process did not terminate as expected."
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not Path("/proc/self/statm").exists(), reason="requires /proc")
+async def test_process_tree_rss():
+    from nonebot_plugin_htmlrender.process import (
+        get_descendant_pids,
+        get_process_tree_rss,
+    )
+
+    proc = await asyncio.create_subprocess_exec("sleep", "15")
+    try:
+        assert proc.pid in get_descendant_pids(os.getpid())
+        child_rss = get_process_tree_rss(proc.pid)
+        assert child_rss is not None
+        assert child_rss > 0
+        assert get_process_tree_rss(os.getpid()) > child_rss
+        assert get_process_tree_rss(2**22 + 1) is None
+    finally:
+        proc.kill()
+        await proc.wait()
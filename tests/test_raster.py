@@ -0,0 +1,102 @@
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+from PIL import Image, ImageFont
+import pytest
+from pytest_mock import MockerFixture
+
+
+@pytest.fixture
+def default_font(mocker: MockerFixture) -> Any:
+    """使用 Pillow 自带字体代替系统字体"""
+    from nonebot_plugin_htmlrender import raster
+
+    raster.get_font.cache_clear()
+    mocker.patch.object(
+        raster,
+        "_open_font",
+        side_effect=lambda path, size: ImageFont.load_default(size),
+    )
+    yield
+    raster.get_font.cache_clear()
+
+
+def test_can_rasterize() -> None:
+    """测试包含 html 的文本需要浏览器渲染"""
+    from nonebot_plugin_htmlrender.raster import can_rasterize
+
+    assert can_rasterize("hello\nworld")
+    assert not can_rasterize('<img src="a.png">')
+    assert not can_rasterize("&nbsp;")
+
+
+def test_wrap_text(default_font: None) -> None:
+    """测试按 pre-wrap 与 break-all 规则折行"""
+    from nonebot_plugin_htmlrender.raster import get_font, wrap_text
+
+    font = get_font(16)
+    assert font is not None
+    char_width = font.getlength("a")
+
+    assert wrap_text("a" * 10, font, char_width * 4) == ["aaaa", "aaaa", "aa"]
+    assert wrap_text("ab\n\ncd\n", font, 1000) == ["ab", "", "cd"]
+    assert wrap_text("aaaa  b", font, char_width * 4) == ["aaaa  ", "b"]
+    assert wrap_text("", font, 1000) == []
+
+
+def test_rasterize_text_size(default_font: None) -> None:
+    """测试图片尺寸按宽度与缩放因子计算"""
+    from nonebot_plugin_htmlrender.raster import rasterize_text
+
+    one_line = rasterize_text("hello", width=300, device_scale_factor=2)
+    two_lines = rasterize_text("hello\nworld", width=300, device_scale_factor=2)
+    assert one_line is not None
+    assert two_lines is not None
+
+    first = Image.open(BytesIO(one_line))
+    second = Image.open(BytesIO(two_lines))
+    assert first.format == "PNG"
+    assert first.width == second.width == 600
+    assert second.height > first.height
+
+    jpeg = rasterize_text("hello", type="jpeg", quality=50)
+    assert jpeg is not None
+    assert Image.open(BytesIO(jpeg)).format == "JPEG"
+
+
+def test_rasterize_text_without_font(mocker: MockerFixture) -> None:
+    """测试找不到字体时返回 None"""
+    from nonebot_plugin_htmlrender import raster
+
+    raster.get_font.cache_clear()
+    mocker.patch.object(raster, "_open_font", side_effect=OSError)
+    try:
+        assert raster.rasterize_text("hello") is None
+    finally:
+        raster.get_font.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_text_to_pic_pillow_engine(
+    mocker: MockerFixture, default_font: None, tmp_path: Path
+) -> None:
+    """测试启用 pillow 引擎时纯文本不经过浏览器, 其余情况回退到浏览器"""
+    from nonebot_plugin_htmlrender import text_to_pic
+
+    mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.plugin_config.htmlrender_text_engine",
+        "pillow",
+    )
+    mock_html_to_pic = mocker.patch(
+        "nonebot_plugin_htmlrender.data_source.html_to_pic", return_value=b"browser"
+    )
+
+    image = await text_to_pic("hello")
+    assert Image.open(BytesIO(image)).format == "PNG"
+    mock_html_to_pic.assert_not_called()
+
+    assert await text_to_pic("<b>hello</b>") == b"browser"
+    css_path = tmp_path / "custom.css"
+    css_path.write_text(".text { color: red; }")
+    assert await text_to_pic("hello", css_path=str(css_path)) == b"browser"
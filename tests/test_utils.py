@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_result() -> None:
+    """测试相同键的并发调用只执行一次"""
+    from nonebot_plugin_htmlrender.utils import SingleFlight
+
+    flight: SingleFlight[int] = SingleFlight()
+    calls = 0
+    shared = 0
+
+    async def _work() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    def _on_shared() -> None:
+        nonlocal shared
+        shared += 1
+
+    results = await asyncio.gather(
+        *(flight.do("a", _work, on_shared=_on_shared) for _ in range(5)),
+        flight.do("b", _work),
+    )
+
+    assert results[:5] == [results[0]] * 5
+    assert calls == 2
+    assert shared == 4
+    assert len(flight) == 0
+    assert await flight.do("a", _work) == 3
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_exception() -> None:
+    """测试执行失败时所有调用方都收到异常"""
+    from nonebot_plugin_htmlrender.utils import SingleFlight
+
+    flight: SingleFlight[int] = SingleFlight()
+
+    async def _fail() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("a", _fail), flight.do("a", _fail), return_exceptions=True
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancel_one_caller() -> None:
+    """测试取消一个调用方不影响其他调用方"""
+    from nonebot_plugin_htmlrender.utils import SingleFlight
+
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def _work() -> str:
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.create_task(flight.do("a", _work))
+    second = asyncio.create_task(flight.do("a", _work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first